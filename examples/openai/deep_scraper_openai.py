@@ -43,5 +43,5 @@ print(result)
 # ************************************************
 
 graph_exec_info = deep_scraper_graph.get_execution_info()
-print(deep_scraper_graph.get_state("relevant_links"))
+print(deep_scraper_graph.get_state("visited_urls"))
 print(prettify_exec_info(graph_exec_info))
\ No newline at end of file
@@ -2,12 +2,14 @@
 Chromium module
 """
 import asyncio
-from typing import Any, AsyncIterator, Iterator, List, Optional
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
 
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 
 from ..utils import Proxy, dynamic_import, get_logger, parse_or_search_proxy
+from ..utils.proxy_pool import get_proxy_pool
 
 
 logger = get_logger("web-loader")
@@ -22,6 +24,9 @@ class ChromiumLoader(BaseLoader):
         browser_config: A dictionary containing additional browser kwargs.
         headless: whether to run browser in headless mode.
         proxy: A dictionary containing proxy settings; None disables protection.
+        proxy_pool: The pool of the broker proxies, every URL being scraped through the
+            healthiest one, None for a fixed proxy.
+        proxy_retries: The number of other proxies tried when a proxy of the pool fails.
         urls: A list of URLs to scrape content from.
     """
 
@@ -57,7 +62,14 @@ class ChromiumLoader(BaseLoader):
         self.backend = backend
         self.browser_config = kwargs
         self.headless = headless
-        self.proxy = parse_or_search_proxy(proxy) if proxy else None
+        # the broker proxies are searched in the background and rotated per URL
+        if proxy and proxy.get("server") == "broker":
+            self.proxy_pool = get_proxy_pool(proxy)
+            self.proxy = None
+        else:
+            self.proxy_pool = None
+            self.proxy = parse_or_search_proxy(proxy) if proxy else None
+        self.proxy_retries = (proxy or {}).get("retries", 2)
         self.urls = urls
         self.load_state = load_state
 
@@ -72,14 +84,48 @@ class ChromiumLoader(BaseLoader):
             str: The scraped HTML content or an error message if an exception occurs.
 
         """
+        if self.proxy_pool is None:
+            results, error = await self._ascrape_playwright(url, self.proxy)
+            return results if error is None else f"Error: {error}"
+
+        # a failing proxy is reported to the pool and the next healthiest one is tried
+        failed = []
+        for _ in range(self.proxy_retries + 1):
+            try:
+                proxy = await asyncio.to_thread(self.proxy_pool.acquire, None, failed)
+            except Exception as e:
+                return f"Error: {e}"
+            start = time.perf_counter()
+            try:
+                results, error = await self._ascrape_playwright(url, proxy)
+            except BaseException:
+                self.proxy_pool.release(proxy["server"])
+                raise
+            if error is None:
+                self.proxy_pool.report(proxy["server"], True, time.perf_counter() - start)
+                return results
+            self.proxy_pool.report(proxy["server"], False)
+            failed.append(proxy["server"])
+            logger.warning(f"proxy {proxy['server']} failed on {url}: {error}")
+        return f"Error: {error}"
+
+    async def _ascrape_playwright(self, url: str,
+                                  proxy: Optional[dict]) -> Tuple[str, Optional[Exception]]:
+        """
+        Scrapes a URL through a proxy.
+
+        Returns:
+            Tuple[str, Optional[Exception]]: The HTML content, and the error of the page
+            if it could not be loaded.
+        """
         from playwright.async_api import async_playwright
         from undetected_playwright import Malenia
 
         logger.info("Starting scraping...")
-        results = ""
+        results, error = "", None
         async with async_playwright() as p:
             browser = await p.chromium.launch(
-                headless=self.headless, proxy=self.proxy, **self.browser_config
+                headless=self.headless, proxy=proxy, **self.browser_config
             )
             try:
                 context = await browser.new_context()
@@ -90,9 +136,9 @@ class ChromiumLoader(BaseLoader):
                 results = await page.content()  # Simply get the HTML content
                 logger.info("Content scraped")
             except Exception as e:
-                results = f"Error: {e}"
+                error = e
             await browser.close()
-        return results
+        return results, error
 
     def lazy_load(self) -> Iterator[Document]:
         """
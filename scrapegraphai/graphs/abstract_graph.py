@@ -3,21 +3,25 @@ AbstractGraph Module
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, AsyncIterator, Iterator, Optional
+import copy
+import time
 import uuid
 import warnings
 from pydantic import BaseModel
 
-from langchain_community.chat_models import ErnieBotChat
-from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain.chat_models import init_chat_model
 
 from ..helpers import models_tokens
-from ..models import (
-    OneApi,
-    DeepSeek
-)
 from ..utils.logging import set_verbosity_warning, set_verbosity_info
+from ..utils.batch_job import get_batch_job
+from ..utils.client_registry import get_shared_client, make_client_key, private_copy
+from ..utils.estimator import estimate_graph
+from ..utils.llm_cache import get_llm_cache
+from ..utils.model_cascade import get_tier_name
+from ..utils.providers import get_provider_class
+from ..utils.resilience import ResiliencePolicy
+from ..utils.streaming import stream_graph, astream_graph
 
 
 
@@ -57,7 +61,24 @@ class AbstractGraph(ABC):
         self.source = source
         self.config = config
         self.schema = schema
-        self.llm_model = self._create_llm(config["llm"])
+        self.llm_cascade = None
+        llm_params = {"llm": config["llm"], "resilience": config.get("resilience")}
+        self.llm_model, self.model_token, self.llm_cascade = get_shared_client(
+            "llm", llm_params,
+            lambda: (self._create_llm(config["llm"]), self.model_token, self.llm_cascade),
+        )
+        if make_client_key("llm", llm_params) is not None:
+            self._use_private_models()
+        self.llm_cache = get_llm_cache(config.get("llm_cache"))
+        if self.llm_cache is not None:
+            self.llm_model.cache = self.llm_cache
+            for _, tier_model in self.llm_cascade or []:
+                tier_model.cache = self.llm_cache
+        self.batch_job = get_batch_job(config.get("batch"), self.llm_model)
+        if self.batch_job is not None:
+            if self.llm_cascade:
+                raise ValueError("The batch mode does not support a cascade of models")
+            self.llm_model.cache = self.batch_job
         self.verbose = False if config is None else config.get(
             "verbose", False)
         self.headless = True if self.config is None else config.get(
@@ -85,7 +106,17 @@ class AbstractGraph(ABC):
             "verbose": self.verbose,
             "loader_kwargs": self.loader_kwargs,
             "llm_model": self.llm_model,
+            "llm_config": self.config["llm"],
+            "model_token": self.model_token,
             "cache_path": self.cache_path,
+            "prompt_caching": self.config.get("prompt_caching", False),
+            "early_exit": self.config.get("early_exit", False),
+            "llm_resilience": ResiliencePolicy.from_config(self.config.get("resilience")) or False,
+            "llm_cascade": self.llm_cascade,
+            "process_pool": self.config.get("process_pool", False),
+            "adaptive_concurrency": self.config.get("adaptive_concurrency", False),
+            "politeness": self.config.get("politeness", False),
+            "crawl_store": self.config.get("crawl_store", False),
             }
 
         self.set_common_params(common_params, overwrite=True)
@@ -125,6 +156,9 @@ class AbstractGraph(ABC):
             KeyError: If the model is not supported.
         """
 
+        if "cascade" in llm_config:
+            return self._create_cascade(llm_config)
+
         llm_defaults = {"temperature": 0, "streaming": False}
         llm_params = {**llm_defaults, **llm_config}
 
@@ -145,6 +179,11 @@ class AbstractGraph(ABC):
                 self.model_token = default_token
             llm_params["model_provider"] = provider
             llm_params["model"] = model_name
+            # the resilience policy retries in place of the client
+            policy = ResiliencePolicy.from_config(self.config.get("resilience"))
+            if policy is not None:
+                for key, value in policy.provider_params(provider).items():
+                    llm_params.setdefault(key, value)
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
                 return init_chat_model(**llm_params)
@@ -203,7 +242,7 @@ class AbstractGraph(ABC):
             except KeyError:
                 print("model not found, using default token size (8192)")
                 self.model_token = 8192
-            return DeepSeek(llm_params)
+            return get_provider_class("DeepSeek")(llm_params)
 
         if "ernie" in llm_params["model"]:
             try:
@@ -211,7 +250,7 @@ class AbstractGraph(ABC):
             except KeyError:
                 print("model not found, using default token size (8192)")
                 self.model_token = 8192
-            return ErnieBotChat(llm_params)
+            return get_provider_class("ErnieBotChat")(llm_params)
         
         if "oneapi" in llm_params["model"]:
             # take the model after the last dash
@@ -220,7 +259,7 @@ class AbstractGraph(ABC):
                 self.model_token = models_tokens["oneapi"][llm_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return OneApi(llm_params)
+            return get_provider_class("OneApi")(llm_params)
         
         if "nvidia" in llm_params["model"]:
             try:
@@ -228,11 +267,60 @@ class AbstractGraph(ABC):
                 llm_params["model"] = "/".join(llm_params["model"].split("/")[1:])
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return ChatNVIDIA(llm_params)
+            return get_provider_class("ChatNVIDIA")(llm_params)
 
         # Raise an error if the model did not match any of the previous cases
         raise ValueError("Model provided by the configuration not supported")
 
+    def _use_private_models(self) -> None:
+        """
+        Replaces the shared language models with copies of this graph, so that the cache
+        and the output format the graph and its nodes set do not affect the other graphs.
+        The copies share the HTTP clients of the shared models.
+        """
+
+        copies = {}
+        for model in [self.llm_model] + [model for _, model in self.llm_cascade or []]:
+            if id(model) not in copies:
+                copies[id(model)] = private_copy(model)
+
+        self.llm_model = copies[id(self.llm_model)]
+        if self.llm_cascade:
+            self.llm_cascade = [(tier, copies[id(model)]) for tier, model in self.llm_cascade]
+
+    def _create_cascade(self, llm_config: dict) -> object:
+        """
+        Create the language models of a cascade, from the cheapest to the most capable.
+        Every tier is either a model name or a full model configuration, the other keys
+        of the configuration are shared by all the tiers.
+
+        Args:
+            llm_config (dict): Configuration parameters with the "cascade" list of models.
+
+        Returns:
+            object: The first model of the cascade, used as the model of the graph.
+
+        Example:
+            >>> {"llm": {"cascade": ["ollama/llama3", "gpt-4o-mini", "gpt-4o"]}}
+        """
+
+        shared_params = {key: value for key, value in llm_config.items() if key != "cascade"}
+
+        tiers = []
+        model_tokens = []
+        for index, tier_config in enumerate(llm_config["cascade"]):
+            tier_params = {"model": tier_config} if isinstance(tier_config, str) else tier_config
+            tier_model = self._create_llm({**shared_params, **tier_params})
+            tiers.append((get_tier_name(tier_config, index), tier_model))
+            model_tokens.append(self.model_token)
+
+        if not tiers:
+            raise ValueError("The cascade needs at least one model")
+
+        # the chunks must fit the context window of every tier
+        self.model_token = min(model_tokens)
+        self.llm_cascade = tiers
+        return tiers[0][1]
 
     def get_state(self, key=None) -> dict:
         """ ""
@@ -259,6 +347,27 @@ class AbstractGraph(ABC):
 
         self.graph.append_node(node)
 
+    def clone(self) -> "AbstractGraph":
+        """
+        Creates an instance of the graph that can run concurrently with this one: it has
+        its own nodes and state, while the configuration, the schema and the model clients
+        are shared instead of being created again.
+
+        Returns:
+            AbstractGraph: The new instance, of the same class.
+
+        Example:
+            >>> instance = smart_scraper_graph.clone()
+            >>> instance.source = "https://example.com/other-page"
+            >>> result = instance.run()
+        """
+
+        instance = copy.copy(self)
+        instance.graph = self.graph.clone()
+        instance.final_state = None
+        instance.execution_info = None
+        return instance
+
     def get_execution_info(self):
         """
         Returns the execution information of the graph.
@@ -269,6 +378,96 @@ class AbstractGraph(ABC):
 
         return self.execution_info
 
+    def stream(self) -> Iterator[dict]:
+        """
+        Executes the graph yielding its progress while it runs: an event when every node
+        starts and ends, the partial answers of the final node as they are generated
+        and finally the complete answer.
+
+        Yields:
+            dict: The events, e.g. {"event": "node_start", "node": "Fetch"},
+            {"event": "partial_answer", "node": "GenerateAnswer", "data": {...}}
+            and {"event": "end", "answer": {...}, "exec_info": [...]}.
+
+        Example:
+            >>> for event in smart_scraper_graph.stream():
+            ...     if event["event"] == "partial_answer":
+            ...         print(event["data"])
+        """
+
+        return stream_graph(self)
+
+    def astream(self) -> AsyncIterator[dict]:
+        """
+        Asynchronous version of stream, yielding the same events without blocking the event loop.
+
+        Yields:
+            dict: The events of the graph execution.
+        """
+
+        return astream_graph(self)
+
+    def estimate(self, expected_output_tokens: int = 256, pricing: Optional[dict] = None,
+                 first_token_latency: float = 1.0, tokens_per_second: float = 50.0) -> dict:
+        """
+        Estimates the language model calls, tokens, cost and latency of the graph without
+        calling the language model. The content is fetched and parsed for real, and the
+        prompts of every planned call are counted with the tokenizer of the model.
+
+        Args:
+            expected_output_tokens (int): The expected number of tokens of every answer.
+            pricing (Optional[dict]): The prices in USD per million tokens, as
+                {"input": ..., "output": ...} or by model name; OpenAI prices are known.
+            first_token_latency (float): The expected seconds before the first token of an answer.
+            tokens_per_second (float): The expected generation speed of the model.
+
+        Returns:
+            dict: The estimate, e.g. {"llm_calls": 5, "prompt_tokens": 31200,
+            "completion_tokens": 1280, "total_tokens": 32480, "max_prompt_tokens": 7900,
+            "cost_USD": 0.0054, "latency": 14.2, "calls": [...]}.
+
+        Example:
+            >>> estimate = smart_scraper_graph.estimate()
+            >>> if estimate["cost_USD"] < 0.10:
+            ...     result = smart_scraper_graph.run()
+        """
+
+        return estimate_graph(self, expected_output_tokens, pricing,
+                              first_token_latency, tokens_per_second)
+
+    def run_batch(self, wait: bool = False, poll_interval: float = 60) -> Optional[Any]:
+        """
+        Executes the graph offline through the batch job set in the "batch" configuration.
+        The prompts of the map phase are submitted as a first batch, and every reduce level
+        as a following one once the previous results are collected. The job state is kept
+        in its folder: calling this method again, even from a new process, resumes the job.
+
+        Args:
+            wait (bool): If True, blocks until the job is completed.
+            poll_interval (float): The number of seconds between two checks of the backend.
+
+        Returns:
+            Optional[Any]: The answer, or None if the job is still being processed.
+
+        Example:
+            >>> graph = SmartScraperMultiGraph(prompt, urls, {
+            ...     "llm": {"model": "gpt-4o-mini"},
+            ...     "batch": {"job_dir": "jobs/nightly", "backend": "openai"},
+            ... })
+            >>> graph.run_batch()  # submits the map phase and returns None
+            >>> graph.run_batch()  # later on, returns the answer once every round is done
+        """
+
+        if self.batch_job is None:
+            raise ValueError("The batch mode requires a \"batch\" configuration")
+
+        while not self.batch_job.advance(self.run):
+            if not wait:
+                return None
+            time.sleep(poll_interval)
+
+        return self.batch_job.state["answer"]
+
     @abstractmethod
     def _create_graph(self):
         """
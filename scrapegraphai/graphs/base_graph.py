@@ -1,11 +1,17 @@
 """
 base_graph module
 """
+import copy
 import time
 import warnings
 from typing import Tuple
-from langchain_community.callbacks import get_openai_callback
 from ..integrations import BurrBridge
+from ..utils.batch_job import BatchJob
+from ..utils.concurrency import concurrency_stats
+from ..utils.llm_cache import llm_cache_stats
+from ..utils.model_cascade import cascade_stats
+from ..utils.usage_callback import get_usage_callback
+from ..utils.streaming import node_scope
 
 # Import telemetry functions
 from ..telemetry import log_graph_execution, log_event
@@ -101,9 +107,14 @@ class BaseGraph:
         cb_total = {
             "total_tokens": 0,
             "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
             "completion_tokens": 0,
             "successful_requests": 0,
             "total_cost_USD": 0.0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "answered_by": {},
+            "concurrency": {},
         }
 
         start_time = time.time()
@@ -115,6 +126,11 @@ class BaseGraph:
         prompt = None
         schema = None
 
+        # the nodes of a graph running as a batch job replay their persisted outputs
+        batch_job = next((node.llm_model.cache for node in self.nodes
+                          if isinstance(getattr(getattr(node, "llm_model", None), "cache", None),
+                                        BatchJob)), None)
+
         while current_node_name:
             curr_time = time.time()
             current_node = next(node for node in self.nodes if node.node_name == current_node_name)
@@ -166,9 +182,14 @@ class BaseGraph:
                             except Exception as e:
                                 schema = None
 
-            with get_openai_callback() as cb:
+            with get_usage_callback() as cb, \
+                    llm_cache_stats() as cache_stats, cascade_stats() as tier_stats, \
+                    concurrency_stats() as limiter_stats, node_scope(self, current_node):
                 try:
-                    result = current_node.execute(state)
+                    if batch_job is not None:
+                        result = batch_job.run_node(current_node, state)
+                    else:
+                        result = current_node.execute(state)
                 except Exception as e:
                     error_node = current_node.node_name
                     graph_execution_time = time.time() - start_time
@@ -192,9 +213,14 @@ class BaseGraph:
                     "node_name": current_node.node_name,
                     "total_tokens": cb.total_tokens,
                     "prompt_tokens": cb.prompt_tokens,
+                    "cached_prompt_tokens": cb.cached_prompt_tokens,
                     "completion_tokens": cb.completion_tokens,
                     "successful_requests": cb.successful_requests,
                     "total_cost_USD": cb.total_cost,
+                    "cache_hits": cache_stats["cache_hits"],
+                    "cache_misses": cache_stats["cache_misses"],
+                    "answered_by": dict(tier_stats),
+                    "concurrency": dict(limiter_stats),
                     "exec_time": node_exec_time,
                 }
 
@@ -202,9 +228,20 @@ class BaseGraph:
 
                 cb_total["total_tokens"] += cb_data["total_tokens"]
                 cb_total["prompt_tokens"] += cb_data["prompt_tokens"]
+                cb_total["cached_prompt_tokens"] += cb_data["cached_prompt_tokens"]
                 cb_total["completion_tokens"] += cb_data["completion_tokens"]
                 cb_total["successful_requests"] += cb_data["successful_requests"]
                 cb_total["total_cost_USD"] += cb_data["total_cost_USD"]
+                cb_total["cache_hits"] += cb_data["cache_hits"]
+                cb_total["cache_misses"] += cb_data["cache_misses"]
+                for tier, answers in cb_data["answered_by"].items():
+                    cb_total["answered_by"][tier] = cb_total["answered_by"].get(tier, 0) + answers
+                if cb_data["concurrency"]:
+                    # the highest limit reached by a node, the decreases and errors of all of them
+                    total = cb_total["concurrency"]
+                    total["peak"] = max(total.get("peak", 0), cb_data["concurrency"]["peak"])
+                    for key in ("decreases", "errors"):
+                        total[key] = total.get(key, 0) + cb_data["concurrency"][key]
 
             if current_node.node_type == "conditional_node":
                 current_node_name = result
@@ -217,9 +254,14 @@ class BaseGraph:
             "node_name": "TOTAL RESULT",
             "total_tokens": cb_total["total_tokens"],
             "prompt_tokens": cb_total["prompt_tokens"],
+            "cached_prompt_tokens": cb_total["cached_prompt_tokens"],
             "completion_tokens": cb_total["completion_tokens"],
             "successful_requests": cb_total["successful_requests"],
             "total_cost_USD": cb_total["total_cost_USD"],
+            "cache_hits": cb_total["cache_hits"],
+            "cache_misses": cb_total["cache_misses"],
+            "answered_by": cb_total["answered_by"],
+            "concurrency": cb_total["concurrency"],
             "exec_time": total_exec_time,
         })
 
@@ -284,3 +326,22 @@ class BaseGraph:
         self.nodes.append(node)
         # update the edges connecting the last node to the new node
         self.edges = self._create_edges({e for e in self.raw_edges})
+
+    def clone(self) -> "BaseGraph":
+        """
+        Creates a graph with the same topology and a shallow copy of every node, so that
+        the attributes the nodes set while running are not shared with this graph.
+        The node configurations and the model clients are shared, not copied.
+
+        Returns:
+            BaseGraph: The new graph.
+        """
+
+        nodes = {id(node): copy.copy(node) for node in self.nodes}
+
+        graph = copy.copy(self)
+        graph.nodes = [nodes[id(node)] for node in self.nodes]
+        graph.raw_edges = [(nodes.get(id(from_node), from_node), nodes.get(id(to_node), to_node))
+                           for from_node, to_node in self.raw_edges]
+        graph.initial_state = {}
+        return graph
@@ -2,19 +2,16 @@
 DeepScraperGraph Module
 """
 
+from copy import copy, deepcopy
 from typing import Optional
 from pydantic import BaseModel
 
 from .base_graph import BaseGraph
 from .abstract_graph import AbstractGraph
+from .smart_scraper_graph import SmartScraperGraph
 
 from ..nodes import (
-    FetchNode,
-    SearchLinkNode,
-    ParseNode,
-    RAGNode,
-    GenerateAnswerNode,
-    GraphIteratorNode,
+    CrawlNode,
     MergeAnswersNode
 )
 
@@ -29,7 +26,12 @@ class DeepScraperGraph(AbstractGraph):
 
     Unlike SmartScraper, DeepScraper can navigate to the links within,
     the input webpage to fuflfil the task within the prompt.
-    
+
+    The links are crawled from a frontier: every page is visited once, up to
+    "max_depth" links away from the source and "max_pages" pages, the most relevant
+    links to the prompt first. The pages are scraped "batchsize" at a time (default 4)
+    and their answers are merged.
+
     Attributes:
         prompt (str): The prompt for the graph.
         source (str): The source of the graph.
@@ -58,61 +60,48 @@ class DeepScraperGraph(AbstractGraph):
     """
 
     def __init__(self, prompt: str, source: str, config: dict, schema: Optional[BaseModel] = None):
-    
+
+        if all(isinstance(value, str) for value in config.values()):
+            self.copy_config = copy(config)
+        else:
+            self.copy_config = deepcopy(config)
+
+        self.copy_schema = deepcopy(schema)
+
         super().__init__(prompt, config, source, schema)
 
         self.input_key = "url" if source.startswith("http") else "local_dir"
 
-    def _create_repeated_graph(self) -> BaseGraph:
+    def _create_graph(self) -> BaseGraph:
         """
-        Creates the graph that can be repeatedly executed to conduct search on
-        hyperlinks within the webpage.
+        Creates the graph of nodes representing the workflow for web scraping
+        n-levels deep.
 
         Returns:
             BaseGraph: A graph instance representing the web scraping workflow.
         """
-        fetch_node = FetchNode(
-            input="url | local_dir",
-            output=["doc", "link_urls", "img_urls"]
-        )
-        parse_node = ParseNode(
-            input="doc",
-            output=["parsed_doc"],
-            node_config={
-                "chunk_size": self.model_token
-            }
-        )
-        rag_node = RAGNode(
-            input="user_prompt & (parsed_doc | doc)",
-            output=["relevant_chunks"],
-            node_config={
-                "llm_model": self.llm_model,
-                "embedder_model": self.embedder_model
-            }
-        )
-        generate_answer_node = GenerateAnswerNode(
-            input="user_prompt & (relevant_chunks | parsed_doc | doc)",
-            output=["answer"],
-            node_config={
-                "llm_model": self.llm_model,
-                "additional_info": self.config.get("additional_info"),
-                "schema": self.schema
-            }
-        )
-        search_node = SearchLinkNode(
-            input="user_prompt & relevant_chunks",
-            output=["relevant_links"],
-            node_config={
-                "llm_model": self.llm_model,
-                "embedder_model": self.embedder_model
-            }
+
+        # the same SmartScraperGraph is run on every page of the crawl
+        smart_scraper_instance = SmartScraperGraph(
+            prompt="",
+            source="",
+            config=self.copy_config,
+            schema=self.copy_schema
         )
-        graph_iterator_node = GraphIteratorNode(
-            input="user_prompt & relevant_links",
+
+        crawl_node = CrawlNode(
+            input="user_prompt & (url | local_dir)",
             output=["results"],
             node_config={
-                "graph_instance": None,
-                "batchsize": 1
+                "graph_instance": smart_scraper_instance,
+                "batchsize": self.config.get("batchsize", 4),
+                "max_depth": self.config.get("max_depth", 1),
+                "max_pages": self.config.get("max_pages", 20),
+                "same_domain": self.config.get("same_domain", True),
+                "include_patterns": self.config.get("include_patterns", []),
+                "exclude_patterns": self.config.get("exclude_patterns", []),
+                "visited_set": self.config.get("visited_set"),
+                "links_per_page": self.config.get("links_per_page"),
             }
         )
         merge_answers_node = MergeAnswersNode(
@@ -126,51 +115,24 @@ class DeepScraperGraph(AbstractGraph):
 
         return BaseGraph(
             nodes=[
-                fetch_node,
-                parse_node,
-                rag_node,
-                generate_answer_node,
-                search_node,
-                graph_iterator_node,
+                crawl_node,
                 merge_answers_node
             ],
             edges=[
-                (fetch_node, parse_node),
-                (parse_node, rag_node),
-                (rag_node, generate_answer_node),
-                (rag_node, search_node),
-                (search_node, graph_iterator_node),
-                (graph_iterator_node, merge_answers_node)
+                (crawl_node, merge_answers_node)
             ],
-            entry_point=fetch_node,
+            entry_point=crawl_node,
             graph_name=self.__class__.__name__
         )
 
-
-
-    def _create_graph(self) -> BaseGraph:
-        """
-        Creates the graph of nodes representing the workflow for web scraping
-        n-levels deep.
-
-        Returns:
-            BaseGraph: A graph instance representing the web scraping workflow.
-        """
-
-        base_graph = self._create_repeated_graph()
-        graph_iterator_node = list(filter(lambda x: x.node_name == "GraphIterator", base_graph.nodes))[0]
-        # Graph iterator will repeat the same graph for multiple hyperlinks found within input webpage
-        graph_iterator_node.node_config["graph_instance"] = self
-        return base_graph
-
-    def run(self) -> str:
+    def run(self, resume: bool = False) -> str:
         """
         Executes the scraping process and returns the answer to the prompt.
         Returns:
             str: The answer to the prompt.
         """
 
-        inputs = {"user_prompt": self.prompt, self.input_key: self.source}
+        inputs = {"user_prompt": self.prompt, self.input_key: self.source, "resume": resume}
         self.final_state, self.execution_info = self.graph.execute(inputs)
 
         return self.final_state.get("answer", "No answer found.")
@@ -15,7 +15,7 @@ from ..nodes import (
     GenerateAnswerOmniNode
 )
 
-from ..models import OpenAIImageToText
+from ..utils.providers import get_provider_class
 
 class OmniScraperGraph(AbstractGraph):
     """
@@ -84,7 +84,7 @@ class OmniScraperGraph(AbstractGraph):
             input="img_urls",
             output=["img_desc"],
             node_config={
-                "llm_model": OpenAIImageToText(self.config["llm"]),
+                "llm_model": get_provider_class("OpenAIImageToText")(self.config["llm"]),
                 "max_images": self.max_images
             }
         )
@@ -10,6 +10,7 @@ from .base_graph import BaseGraph
 from .abstract_graph import AbstractGraph
 from .smart_scraper_graph import SmartScraperGraph
 
+from ..utils.research_web import DEFAULT_SEARCH_TIMEOUT
 from ..nodes import (
     SearchInternetNode,
     GraphIteratorNode,
@@ -80,7 +81,10 @@ class SearchGraph(AbstractGraph):
             output=["urls"],
             node_config={
                 "llm_model": self.llm_model,
-                "max_results": self.max_results
+                "max_results": self.max_results,
+                "search_engine": self.config.get("search_engine", "google"),
+                "search_timeout": self.config.get("search_timeout", DEFAULT_SEARCH_TIMEOUT),
+                "query_rewrite": self.config.get("query_rewrite"),
             }
         )
         graph_iterator_node = GraphIteratorNode(
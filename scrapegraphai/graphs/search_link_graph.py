@@ -67,12 +67,17 @@ class SearchLinkGraph(AbstractGraph):
                 "chunk_size": self.model_token
             }
         )
+        link_ranking = self.config.get("link_ranking", {})
         search_link_node = SearchLinkNode(
             input="doc",
             output=["parsed_doc"],
             node_config={
                 "llm_model": self.llm_model,
-                "chunk_size": self.model_token
+                "embedder_model": link_ranking.get("embedder_model"),
+                "chunk_size": self.model_token,
+                "ranking": link_ranking.get("method", "bm25"),
+                "top_k": link_ranking.get("top_k"),
+                "threshold": link_ranking.get("threshold", 0.0),
             }
         )
 
@@ -2,8 +2,11 @@
 SmartScraperMultiGraph Module
 """
 
+import queue
+import threading
+from contextvars import copy_context
 from copy import copy, deepcopy
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from pydantic import BaseModel
 
 from .base_graph import BaseGraph
@@ -14,6 +17,15 @@ from ..nodes import (
     GraphIteratorNode,
     MergeAnswersNode
 )
+from ..nodes.graph_iterator_node import SourceResult
+
+_DONE = object()
+
+
+class _RunStopped(Exception):
+    """
+    Raised to abort the run when the results are no longer consumed.
+    """
 
 
 class SmartScraperMultiGraph(AbstractGraph):
@@ -50,7 +62,9 @@ class SmartScraperMultiGraph(AbstractGraph):
         if all(isinstance(value, str) for value in config.values()):
             self.copy_config = copy(config)
         else:
-            self.copy_config = deepcopy(config)
+            # the callbacks, e.g. a bound method of the caller, are shared instead of copied
+            callbacks = {id(value): value for value in config.values() if callable(value)}
+            self.copy_config = deepcopy(config, callbacks)
         
         self.copy_schema = deepcopy(schema)
 
@@ -84,6 +98,9 @@ class SmartScraperMultiGraph(AbstractGraph):
             output=["results"],
             node_config={
                 "graph_instance": smart_scraper_instance,
+                "as_completed": self.config.get("as_completed", False),
+                "on_result": self.config.get("on_result"),
+                "visited_set": self.config.get("visited_set"),
             }
         )
 
@@ -108,14 +125,72 @@ class SmartScraperMultiGraph(AbstractGraph):
             graph_name=self.__class__.__name__
         )
 
-    def run(self) -> str:
+    def run(self, resume: bool = False) -> str:
         """
         Executes the web scraping and searching process.
 
         Returns:
             str: The answer to the prompt.
         """
-        inputs = {"user_prompt": self.prompt, "urls": self.source}
+        inputs = {"user_prompt": self.prompt, "urls": self.source, "resume": resume}
         self.final_state, self.execution_info = self.graph.execute(inputs)
 
         return self.final_state.get("answer", "No answer found.")
+
+    def run_iter(self) -> Iterator[SourceResult]:
+        """
+        Executes the web scraping yielding the result of every URL as soon as it is
+        scraped, in completion order. A failed URL is yielded with its error instead
+        of stopping the other ones.
+
+        Once every result has been consumed the answers are merged, and the merged answer
+        is available in final_state["answer"]. Stopping the iteration early cancels the
+        URLs not started yet and abandons the run before the merge.
+
+        Yields:
+            SourceResult: The source, answer, execution info and error of every URL.
+
+        Example:
+            >>> for result in smart_scraper_multi_graph.run_iter():
+            ...     if result.error is None:
+            ...         save(result.source, result.answer)
+        """
+
+        results = queue.Queue()
+        stopped = threading.Event()
+
+        def on_result(result):
+            if stopped.is_set():
+                raise _RunStopped()
+            results.put(result)
+
+        # the run uses its own nodes, the callback is not left on the nodes of the graph
+        graph = self.graph.clone()
+        for node in graph.nodes:
+            if isinstance(node, GraphIteratorNode):
+                node.as_completed, node.on_result = True, on_result
+
+        def _run():
+            try:
+                inputs = {"user_prompt": self.prompt, "urls": self.source}
+                self.final_state, self.execution_info = graph.execute(inputs)
+            except _RunStopped:
+                pass
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(_DONE)
+
+        thread = threading.Thread(target=copy_context().run, args=(_run,), daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                result = results.get()
+                if result is _DONE:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            stopped.set()
@@ -16,7 +16,7 @@ from ..nodes import (
 )
 
 from ..utils.save_audio_from_bytes import save_audio_from_bytes
-from ..models import OpenAITextToSpeech
+from ..utils.providers import get_provider_class
 
 
 class SpeechGraph(AbstractGraph):
@@ -84,7 +84,7 @@ class SpeechGraph(AbstractGraph):
             input="answer",
             output=["audio"],
             node_config={
-                "tts_model": OpenAITextToSpeech(self.config["tts_model"])
+                "tts_model": get_provider_class("OpenAITextToSpeech")(self.config["tts_model"])
             }
         )
 
@@ -1,7 +1,24 @@
 """
     __init__.py file for models folder
+
+    The models are imported on first access, so that their provider SDKs are only
+    imported when a model is used.
 """
-from .openai_itt import OpenAIImageToText
-from .openai_tts import OpenAITextToSpeech
-from .deepseek import DeepSeek
-from .oneapi import OneApi
+from typing import TYPE_CHECKING
+
+from ..utils.providers import get_provider_class
+
+if TYPE_CHECKING:
+    # the names of __all__ for the type checkers and linters, resolved by __getattr__
+    from .deepseek import DeepSeek
+    from .oneapi import OneApi
+    from .openai_itt import OpenAIImageToText
+    from .openai_tts import OpenAITextToSpeech
+
+__all__ = ["OpenAIImageToText", "OpenAITextToSpeech", "DeepSeek", "OneApi"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return get_provider_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
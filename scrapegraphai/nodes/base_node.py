@@ -7,6 +7,10 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 
 from ..utils import get_logger
+from ..utils.model_cascade import CascadeRunnable
+from ..utils.process_pool import run_in_process_pool
+from ..utils.resilience import ResiliencePolicy
+from ..utils.schema_merge import is_schema_satisfied
 
 
 class BaseNode(ABC):
@@ -80,6 +84,77 @@ class BaseNode(ABC):
 
         pass
 
+    def get_llm_runnable(self, llm_model=None):
+        """
+        Returns the language model of the node wrapped with the retry, timeout and
+        hedging policy of the graph, to be used in place of the model in chains.
+
+        Args:
+            llm_model (Runnable, optional): The model to wrap, defaults to the model of the node.
+
+        Returns:
+            Runnable: The language model invoked according to the policy.
+        """
+
+        llm_model = self.llm_model if llm_model is None else llm_model
+
+        policy = getattr(self, "llm_resilience", None)
+        if policy is None:
+            policy = ResiliencePolicy.from_config(
+                (self.node_config or {}).get("resilience")) or False
+            self.llm_resilience = policy
+
+        if not policy:
+            return llm_model
+        return policy.wrap(llm_model)
+
+    def build_chain(self, prompt, output_parser):
+        """
+        Composes the chain prompting the language model and parsing its answer. When the
+        graph defines a cascade of models, the cheapest one is tried first and the next
+        ones only if the answer cannot be parsed or does not fill the required fields
+        of the schema.
+
+        Args:
+            prompt (Runnable): The prompt template.
+            output_parser (Runnable): The parser of the answer.
+
+        Returns:
+            Runnable: The chain.
+        """
+
+        cascade = getattr(self, "llm_cascade", None) or (self.node_config or {}).get("llm_cascade")
+        if not cascade:
+            return prompt | self.get_llm_runnable() | output_parser
+
+        schema = (self.node_config or {}).get("schema")
+        validator = None
+        if schema is not None:
+            validator = lambda answer: is_schema_satisfied(answer, schema)
+
+        tiers = [(name, self.get_llm_runnable(llm_model) | output_parser)
+                 for name, llm_model in cascade]
+        return prompt | CascadeRunnable(tiers, validator)
+
+    def run_cpu_bound(self, fn, *args):
+        """
+        Runs a CPU-bound step of the node, in the process pool of the graph when the
+        "process_pool" option is set, so that concurrent graphs use several cores.
+
+        Args:
+            fn (Callable): A function defined at the top level of a module.
+            *args: Its arguments, which must be picklable.
+
+        Returns:
+            Any: The result of the function.
+        """
+
+        pool_config = getattr(self, "process_pool", None)
+        if pool_config is None:
+            pool_config = (self.node_config or {}).get("process_pool", False)
+
+        return run_in_process_pool(pool_config, fn, *args)
+
     def update_config(self, params: dict, overwrite: bool = False):
         """
         Updates the node_config dictionary as well as attributes with same key.
@@ -0,0 +1,243 @@
+"""
+CrawlNode Module
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, List, Optional, Tuple
+from ..utils.concurrency import AIMDLimiter
+from ..utils.crawl_frontier import CrawlFrontier
+from ..utils.crawl_store import DONE, FAILED, SQLiteCrawlFrontier, SQLiteCrawlStore
+from ..utils.graph_pool import GraphPool
+from ..utils.link_ranking import collect_links, rank_links
+from ..utils.politeness import HostScheduler, fetch_scope
+from ..utils.visited_set import create_visited_set, load_visited_set
+from .graph_iterator_node import GraphIteratorNode
+
+DEFAULT_CRAWL_BATCHSIZE = 4
+
+
+class CrawlNode(GraphIteratorNode):
+    """
+    A node crawling a website from a seed URL: the graph instance is run on every page
+    concurrently, and the links of the fetched pages are added to a frontier, which
+    deduplicates them, applies the crawl rules and returns the most relevant ones first.
+    With "crawl_store", the frontier and the answers are persisted, and a crawl run with
+    the "resume" state key set continues the previous one.
+
+    Attributes:
+        max_depth (int): The maximum number of links followed from the seed.
+        max_pages (int): The maximum number of pages crawled.
+        same_domain (bool): Whether to only follow the links to the domain of the seed.
+        include_patterns (List[str]): Regular expressions, one of which the followed
+            links must match.
+        exclude_patterns (List[str]): Regular expressions the followed links must not match.
+        visited_set (Union[str, dict, None]): The configuration of the set of the URLs
+            already seen, see create_visited_set.
+        links_per_page (Optional[int]): The number of most relevant links followed from
+            every page, None to follow all of them. The links are ranked with BM25, whose
+            score is also their priority in the frontier.
+
+    Args:
+        input (str): Boolean expression defining the input keys needed from the state.
+        output (List[str]): List of output keys to be updated in the state.
+        node_config (dict): Additional configuration for the node.
+        node_name (str): The unique identifier name for the node, defaulting to "Crawl".
+    """
+
+    def __init__(
+        self,
+        input: str,
+        output: List[str],
+        node_config: Optional[dict] = None,
+        node_name: str = "Crawl",
+    ):
+        super().__init__(input, output, node_config, node_name)
+
+        node_config = node_config or {}
+        self.max_depth = node_config.get("max_depth", 1)
+        self.max_pages = node_config.get("max_pages", 20)
+        self.same_domain = node_config.get("same_domain", True)
+        self.include_patterns = node_config.get("include_patterns", [])
+        self.exclude_patterns = node_config.get("exclude_patterns", [])
+        self.visited_set = node_config.get("visited_set", None)
+        self.links_per_page = node_config.get("links_per_page", None)
+
+    def execute(self, state: dict) -> dict:
+        """
+        Crawls the website, running the graph instance on every page.
+
+        Args:
+            state (dict): The current state of the graph. The input keys will be used to fetch
+                            the user prompt and the seed of the crawl.
+
+        Returns:
+            dict: The updated state with the answers of the pages in the output key, in crawl
+            order, the first crawled URLs in "visited_urls", their number in "visited_count"
+            and the failed pages with their error in "failed_sources".
+
+        Raises:
+            KeyError: If the input keys are not found in the state.
+        """
+
+        batchsize = self.node_config.get("batchsize", DEFAULT_CRAWL_BATCHSIZE)
+
+        self.logger.info(
+            f"--- Executing {self.node_name} Node with batchsize {batchsize} ---"
+        )
+
+        input_keys = self.get_input_keys(state)
+        input_data = [state[key] for key in input_keys]
+
+        user_prompt = input_data[0]
+        seed = input_data[1]
+
+        rules = {
+            "max_depth": self.max_depth,
+            "max_pages": self.max_pages,
+            "same_domain": self.same_domain,
+            "include_patterns": self.include_patterns,
+            "exclude_patterns": self.exclude_patterns,
+        }
+
+        limiter = self._create_limiter(batchsize)
+        store = self._open_store(state)
+
+        visited_set = visited_path = None
+        try:
+            if store is None:
+                frontier = CrawlFrontier(visited_set=create_visited_set(self.visited_set),
+                                         **rules)
+            else:
+                # the store deduplicates the URLs on disk, the visited set saved with it
+                # avoids the database lookups of the URLs already seen
+                visited_path = f"{store.database_path}.visited"
+                if state.get("resume", False) and os.path.exists(visited_path):
+                    visited_set = load_visited_set(visited_path)
+                else:
+                    visited_set = create_visited_set(self.visited_set)
+                frontier = SQLiteCrawlFrontier(store, visited_set=visited_set, **rules)
+            frontier.add(seed)
+
+            answers, failed_sources = self._crawl(user_prompt, frontier, batchsize,
+                                                  limiter, store)
+            visited_urls = frontier.visited
+            visited_count = frontier.visited_count
+
+            if store is not None:
+                # the pages completed before a resume are part of the crawl
+                answers = dict(enumerate(result.answer for _, result in store.results(DONE)))
+                failed_sources = [{"source": url, "error": result.error}
+                                  for url, result in store.results(FAILED)]
+        finally:
+            if store is not None:
+                if visited_set is not None:
+                    visited_set.save(visited_path)
+                store.close()
+
+        if limiter is not None:
+            limiter.report()
+
+        self.logger.info(f"--- (crawled {visited_count} pages) ---")
+
+        state.update({
+            self.output[0]: [answers[order] for order in sorted(answers)],
+            "visited_urls": visited_urls,
+            "visited_count": visited_count,
+            "failed_sources": failed_sources,
+        })
+
+        return state
+
+    def _crawl(self, user_prompt: str, frontier: CrawlFrontier, batchsize: int,
+               limiter: Optional[AIMDLimiter],
+               store: Optional[SQLiteCrawlStore] = None) -> Tuple[dict, List[dict]]:
+        """
+        Runs the graph instance on the pages of the frontier until it is exhausted,
+        with at most batchsize pages, or the limit of the controller, in progress.
+
+        Returns:
+            Tuple[dict, List[dict]]: The answers by crawl order and the failed pages.
+        """
+
+        graph_instance = self._prepare_graph_instance(user_prompt)
+
+        # the nodes of the graph are built once, every page gets an isolated instance
+        pool = GraphPool(graph_instance)
+        scheduler = self._create_scheduler()
+
+        answers = {}
+        failed_sources = []
+        futures = {}
+
+        max_workers = batchsize if limiter is None else limiter.max_limit
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while True:
+                # the pages are taken from the frontier only when a worker is free,
+                # so that the links found meanwhile compete on their relevance
+                capacity = batchsize if limiter is None else int(limiter.limit)
+                while len(futures) < capacity:
+                    item = frontier.pop()
+                    if item is None:
+                        break
+                    future = executor.submit(copy_context().run, self._crawl_page,
+                                             pool, scheduler, limiter, item.url)
+                    futures[future] = item
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures.pop(future)
+                    try:
+                        answer, exec_info, content = future.result()
+                    except Exception as e:
+                        self.logger.warning(f"--- (page {item.url} failed: {e}) ---")
+                        failed_sources.append({"source": item.url, "error": str(e)})
+                        if store is not None:
+                            store.fail(item.url, e)
+                        continue
+
+                    answers[item.order] = answer
+                    # the links are selected on the scores of the page, and queued with
+                    # their BM25 score, comparable to the links of the other pages
+                    for link, score in rank_links(user_prompt, collect_links(content, item.url),
+                                                  top_k=self.links_per_page, raw_scores=True):
+                        frontier.add(link, item.depth + 1, score)
+                    # the page is completed once its links are in the frontier
+                    if store is not None:
+                        store.complete(item.url, answer, exec_info)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return answers, failed_sources
+
+    def _crawl_page(self, pool: GraphPool, scheduler: Optional[HostScheduler],
+                    limiter: Optional[AIMDLimiter], url: str) -> Tuple[Any, list, str]:
+        """
+        Runs the graph instance on a page.
+
+        Returns:
+            Tuple[Any, list, str]: The answer, the execution info and the fetched
+            content of the page.
+        """
+
+        def _run():
+            with pool.instance() as instance:
+                instance.source = url
+                instance.input_key = "url" if url.startswith("http") else "local_dir"
+                answer = instance.run()
+                documents = instance.final_state.get("doc") or []
+                content = "\n".join(getattr(document, "page_content", str(document))
+                                    for document in documents)
+                return answer, instance.get_execution_info(), content
+
+        # the host is held until the page is fetched, and waited for before the limiter
+        slot = scheduler.acquire(url) if scheduler is not None else None
+        with fetch_scope(scheduler, slot):
+            if limiter is None:
+                return _run()
+            return limiter.run(_run)
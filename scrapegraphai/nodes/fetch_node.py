@@ -4,7 +4,6 @@ FetchNode Module
 
 import json
 from typing import List, Optional
-from langchain_openai import ChatOpenAI
 import pandas as pd
 import requests
 from langchain_community.document_loaders import PyPDFLoader
@@ -14,9 +13,20 @@ from ..docloaders import ChromiumLoader
 from ..docloaders.browser_base import browser_base_fetch
 from ..utils.convert_to_md import convert_to_md
 from ..utils.logging import get_logger
+from ..utils.politeness import fetch_slot
+from ..utils.providers import is_provider_instance
 from .base_node import BaseNode
 
 
+def load_pdf(source: str) -> List[Document]:
+    """
+    Extracts the text of every page of a PDF file. Defined at the module level so that
+    it can run in the process pool of the graph.
+    """
+
+    return PyPDFLoader(source).load()
+
+
 """"
 FetchNode Module
 """
@@ -187,8 +197,7 @@ class FetchNode(BaseNode):
         """
         
         if input_type == "pdf":
-            loader = PyPDFLoader(source)
-            return loader.load()
+            return self.run_cpu_bound(load_pdf, source)
         elif input_type == "csv":
             return [Document(page_content=str(pd.read_csv(source)), metadata={"source": "csv"})]
         elif input_type == "json":
@@ -221,8 +230,8 @@ class FetchNode(BaseNode):
         
         parsed_content = source
 
-        if isinstance(self.llm_model, ChatOpenAI) and not self.script_creator or self.force and not self.script_creator:
-            parsed_content = convert_to_md(source)
+        if is_provider_instance(self.llm_model, "ChatOpenAI") and not self.script_creator or self.force and not self.script_creator:
+            parsed_content = self.run_cpu_bound(convert_to_md, source)
         else:
             parsed_content = source
 
@@ -250,7 +259,8 @@ class FetchNode(BaseNode):
         
         self.logger.info(f"--- (Fetching HTML from: {source}) ---")
         if self.use_soup:
-            response = requests.get(source)
+            with fetch_slot(source):
+                response = requests.get(source)
             if response.status_code == 200:
                 if not response.text.strip():
                     raise ValueError("No HTML body content found in the response.")
@@ -258,9 +268,9 @@ class FetchNode(BaseNode):
                 if not self.cut:
                     parsed_content = cleanup_html(response, source)
 
-                if  (isinstance(self.llm_model, ChatOpenAI)
+                if  (is_provider_instance(self.llm_model, "ChatOpenAI")
                      and not self.script_creator) or (self.force and not self.script_creator):
-                    parsed_content = convert_to_md(source, source)
+                    parsed_content = self.run_cpu_bound(convert_to_md, source, source)
 
                 compressed_document = [Document(page_content=parsed_content)]
             else:
@@ -273,22 +283,23 @@ class FetchNode(BaseNode):
             if self.node_config is not None:
                 loader_kwargs = self.node_config.get("loader_kwargs", {})
 
-            if self.browser_base is not None:
-                data =  browser_base_fetch(self.browser_base.get("api_key"),
-                                            self.browser_base.get("project_id"), [source])
+            with fetch_slot(source):
+                if self.browser_base is not None:
+                    data =  browser_base_fetch(self.browser_base.get("api_key"),
+                                                self.browser_base.get("project_id"), [source])
 
-                document = [Document(page_content=content,
-                                    metadata={"source": source}) for content in data]
-            else:
-                loader = ChromiumLoader([source], headless=self.headless, **loader_kwargs)
-                document = loader.load()
+                    document = [Document(page_content=content,
+                                        metadata={"source": source}) for content in data]
+                else:
+                    loader = ChromiumLoader([source], headless=self.headless, **loader_kwargs)
+                    document = loader.load()
 
             if not document or not document[0].page_content.strip():
                 raise ValueError("No HTML body content found in the document fetched by ChromiumLoader.")
             parsed_content = document[0].page_content
 
-            if  isinstance(self.llm_model, ChatOpenAI) and not self.script_creator or self.force and not self.script_creator and not self.openai_md_enabled:
-                parsed_content = convert_to_md(document[0].page_content, source)
+            if  is_provider_instance(self.llm_model, "ChatOpenAI") and not self.script_creator or self.force and not self.script_creator and not self.openai_md_enabled:
+                parsed_content = self.run_cpu_bound(convert_to_md, document[0].page_content, source)
 
             compressed_document = [
                 Document(page_content=parsed_content, metadata={"source": "html file"})
@@ -120,7 +120,7 @@ class GenerateAnswerCSVNode(BaseNode):
                 },
             )
 
-            chain =  prompt | self.llm_model | output_parser
+            chain =  self.build_chain(prompt, output_parser)
             answer = chain.invoke({"question": user_prompt})
             state.update({self.output[0]: answer})
             return state
@@ -139,7 +139,7 @@ class GenerateAnswerCSVNode(BaseNode):
                 )
 
             chain_name = f"chunk{i+1}"
-            chains_dict[chain_name] = prompt | self.llm_model | output_parser
+            chains_dict[chain_name] = self.build_chain(prompt, output_parser)
 
         async_runner = RunnableParallel(**chains_dict)
 
@@ -151,7 +151,7 @@ class GenerateAnswerCSVNode(BaseNode):
                 partial_variables={"format_instructions": format_instructions},
             )
 
-        merge_chain = merge_prompt | self.llm_model | output_parser
+        merge_chain = self.build_chain(merge_prompt, output_parser)
         answer = merge_chain.invoke({"context": batch_results, "question": user_prompt})
 
         state.update({self.output[0]: answer})
@@ -1,16 +1,22 @@
 """
 GenerateAnswerNode Module
 """
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from typing import List, Optional
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.runnables import RunnableParallel
-from langchain_openai import ChatOpenAI
-from langchain_community.chat_models import ChatOllama
 from tqdm import tqdm
 from ..utils.logging import get_logger
+from ..utils.providers import is_provider_instance
+from ..utils.schema_merge import deterministic_merge, has_list_fields, is_schema_satisfied
+from ..utils.streaming import invoke_chain
+from ..utils.tree_reduce import tree_reduce
 from .base_node import BaseNode
-from ..helpers import template_chunks, template_no_chunks, template_merge, template_chunks_md, template_no_chunks_md, template_merge_md
+from ..helpers import template_chunks, template_no_chunks, template_merge, template_chunks_md, template_no_chunks_md, template_merge_md, template_chunks_cache, template_chunks_md_cache
+
+DEFAULT_EARLY_EXIT_WINDOW = 2
 
 class GenerateAnswerNode(BaseNode):
     """
@@ -41,7 +47,7 @@ class GenerateAnswerNode(BaseNode):
 
         self.llm_model = node_config["llm_model"]
 
-        if isinstance(node_config["llm_model"], ChatOllama):
+        if is_provider_instance(node_config["llm_model"], "ChatOllama"):
             self.llm_model.format="json"
 
         self.verbose = (
@@ -58,6 +64,9 @@ class GenerateAnswerNode(BaseNode):
         )
 
         self.additional_info = node_config.get("additional_info")
+        self.model_token = node_config.get("model_token", 8192)
+        self.prompt_caching = node_config.get("prompt_caching", False)
+        self.early_exit = node_config.get("early_exit", False)
 
     def execute(self, state: dict) -> dict:
         """
@@ -93,13 +102,13 @@ class GenerateAnswerNode(BaseNode):
 
         format_instructions = output_parser.get_format_instructions()
 
-        if  isinstance(self.llm_model, ChatOpenAI) and not self.script_creator or self.force and not self.script_creator or self.is_md_scraper:
+        if  is_provider_instance(self.llm_model, "ChatOpenAI") and not self.script_creator or self.force and not self.script_creator or self.is_md_scraper:
             template_no_chunks_prompt = template_no_chunks_md
-            template_chunks_prompt = template_chunks_md
+            template_chunks_prompt = template_chunks_md_cache if self.prompt_caching else template_chunks_md
             template_merge_prompt = template_merge_md
         else:
             template_no_chunks_prompt = template_no_chunks
-            template_chunks_prompt = template_chunks
+            template_chunks_prompt = template_chunks_cache if self.prompt_caching else template_chunks
             template_merge_prompt = template_merge
 
         if self.additional_info is not None:
@@ -113,8 +122,8 @@ class GenerateAnswerNode(BaseNode):
                 input_variables=["question"],
                 partial_variables={"context": doc,
                                     "format_instructions": format_instructions})
-            chain =  prompt | self.llm_model | output_parser
-            answer = chain.invoke({"question": user_prompt})
+            chain =  self.build_chain(prompt, output_parser)
+            answer = invoke_chain(chain, {"question": user_prompt})
 
             state.update({self.output[0]: answer})
             return state
@@ -123,17 +132,30 @@ class GenerateAnswerNode(BaseNode):
         for i, chunk in enumerate(tqdm(doc, desc="Processing chunks", disable=not self.verbose)):
 
             prompt = PromptTemplate(
-                template=template_chunks,
+                template=template_chunks_prompt,
                 input_variables=["question"],
                 partial_variables={"context": chunk,
                                 "chunk_id": i + 1,
                                 "format_instructions": format_instructions})
             chain_name = f"chunk{i+1}"
-            chains_dict[chain_name] = prompt | self.llm_model | output_parser
+            chains_dict[chain_name] = self.build_chain(prompt, output_parser)
+
+        schema = self.node_config.get("schema", None)
 
-        async_runner = RunnableParallel(**chains_dict)
+        if self._can_exit_early(schema):
+            batch_results, answer = self._early_exit_map(chains_dict, user_prompt, schema)
+            if answer is not None:
+                state.update({self.output[0]: answer})
+                return state
+        else:
+            async_runner = RunnableParallel(**chains_dict)
+            batch_results =  async_runner.invoke({"question": user_prompt})
 
-        batch_results =  async_runner.invoke({"question": user_prompt})
+        answer = deterministic_merge(list(batch_results.values()), schema)
+        if answer is not None:
+            self.logger.info("--- (chunk answers merged using the schema) ---")
+            state.update({self.output[0]: answer})
+            return state
 
         merge_prompt = PromptTemplate(
                 template = template_merge_prompt,
@@ -141,8 +163,92 @@ class GenerateAnswerNode(BaseNode):
                 partial_variables={"format_instructions": format_instructions},
             )
 
-        merge_chain = merge_prompt | self.llm_model | output_parser
-        answer = merge_chain.invoke({"context": batch_results, "question": user_prompt})
+        merge_chain = self.build_chain(merge_prompt, output_parser)
+
+        def merge_groups(groups):
+            return merge_chain.batch([{"context": group, "question": user_prompt}
+                                      for group in groups])
+
+        def merge_final(group):
+            return invoke_chain(merge_chain, {"context": group, "question": user_prompt})
+
+        token_budget = self.node_config.get("merge_token_budget", self.model_token // 2)
+        answer = tree_reduce(list(batch_results.values()), merge_groups, token_budget,
+                             final_merge_fn=merge_final)
 
         state.update({self.output[0]: answer})
         return state
+
+    def _can_exit_early(self, schema) -> bool:
+        """
+        Checks if the chunks can be skipped once the schema is satisfied: the first
+        answer filling a list field would otherwise truncate a multi-entity extraction,
+        so schemas with list fields need the "allow_lists" option.
+        """
+
+        if not self.early_exit or schema is None:
+            return False
+        allow_lists = isinstance(self.early_exit, dict) and self.early_exit.get("allow_lists", False)
+        if has_list_fields(schema) and not allow_lists:
+            self.logger.info("--- (early exit disabled, the schema has list fields) ---")
+            return False
+        return True
+
+    def _early_exit_map(self, chains_dict: dict, user_prompt: str, schema) -> tuple:
+        """
+        Runs the chunk chains in order with a small concurrency window, stopping as soon
+        as the answers collected so far fill every required field of the schema. No chunk
+        is submitted once the schema is satisfied, but the calls already sent to the
+        model, at most window - 1, cannot be cancelled: they complete in the background
+        and are still billed.
+
+        Args:
+            chains_dict (dict): The chains of the chunks, in retrieval-rank order.
+            user_prompt (str): The user question.
+            schema: The pydantic model class describing the output.
+
+        Returns:
+            tuple: The answers of the processed chunks, and the merged answer if the
+            schema was satisfied before processing every chunk, None otherwise.
+        """
+
+        window = DEFAULT_EARLY_EXIT_WINDOW
+        if isinstance(self.early_exit, dict):
+            window = self.early_exit.get("window", DEFAULT_EARLY_EXIT_WINDOW)
+
+        executor = ThreadPoolExecutor(max_workers=window)
+        chains = iter(chains_dict.items())
+        pending = {}
+        results = {}
+
+        def submit_next():
+            for chain_name, chain in chains:
+                future = executor.submit(copy_context().run, chain.invoke,
+                                         {"question": user_prompt})
+                pending[future] = chain_name
+                return
+
+        try:
+            for _ in range(window):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+
+                ordered = {name: results[name] for name in chains_dict if name in results}
+                answer = deterministic_merge(list(ordered.values()), schema)
+                if answer is not None and is_schema_satisfied(answer, schema):
+                    self.logger.info(
+                        f"--- (schema satisfied after {len(results)} of {len(chains_dict)} chunks, "
+                        f"{len(pending)} calls still in flight) ---"
+                    )
+                    return ordered, answer
+
+                while len(pending) < window and len(results) + len(pending) < len(chains_dict):
+                    submit_next()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {name: results[name] for name in chains_dict}, None
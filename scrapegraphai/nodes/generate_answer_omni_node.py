@@ -10,8 +10,8 @@ from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.runnables import RunnableParallel
 from tqdm import tqdm
-from langchain_community.chat_models import ChatOllama
 # Imports from the library
+from ..utils.providers import is_provider_instance
 from .base_node import BaseNode
 from ..helpers.generate_answer_node_omni_prompts import template_no_chunk_omni, template_chunks_omni, template_merge_omni
 
@@ -44,7 +44,7 @@ class GenerateAnswerOmniNode(BaseNode):
         super().__init__(node_name, "node", input, output, 3, node_config)
 
         self.llm_model = node_config["llm_model"]
-        if isinstance(node_config["llm_model"], ChatOllama):
+        if is_provider_instance(node_config["llm_model"], "ChatOllama"):
             self.llm_model.format="json"
 
         self.verbose = (
@@ -111,7 +111,7 @@ class GenerateAnswerOmniNode(BaseNode):
                 },
             )
 
-            chain =  prompt | self.llm_model | output_parser
+            chain =  self.build_chain(prompt, output_parser)
             answer = chain.invoke({"question": user_prompt})
 
             state.update({self.output[0]: answer})
@@ -132,7 +132,7 @@ class GenerateAnswerOmniNode(BaseNode):
 
             # Dynamically name the chains based on their index
             chain_name = f"chunk{i+1}"
-            chains_dict[chain_name] = prompt | self.llm_model | output_parser
+            chains_dict[chain_name] = self.build_chain(prompt, output_parser)
 
         async_runner = RunnableParallel(**chains_dict)
 
@@ -144,7 +144,7 @@ class GenerateAnswerOmniNode(BaseNode):
                 partial_variables={"format_instructions": format_instructions},
             )
 
-        merge_chain = merge_prompt | self.llm_model | output_parser
+        merge_chain = self.build_chain(merge_prompt, output_parser)
         answer = merge_chain.invoke({"context": batch_results, "question": user_prompt})
 
         state.update({self.output[0]: answer})
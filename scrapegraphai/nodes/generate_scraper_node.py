@@ -127,7 +127,7 @@ class GenerateScraperNode(BaseNode):
                 "schema_instructions": format_instructions,
             },
         )
-        map_chain = prompt | self.llm_model | StrOutputParser()
+        map_chain = self.build_chain(prompt, StrOutputParser())
 
         answer = map_chain.invoke({"question": user_prompt})
 
@@ -90,7 +90,7 @@ class GetProbableTagsNode(BaseNode):
         )
 
         # Execute the chain to get probable tags
-        tag_answer = tag_prompt | self.llm_model | output_parser
+        tag_answer = self.build_chain(tag_prompt, output_parser)
         probable_tags = tag_answer.invoke({"question": user_prompt})
 
         # Update the dictionary with probable tags
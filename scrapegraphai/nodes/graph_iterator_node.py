@@ -3,22 +3,56 @@ GraphIterator Module
 """
 
 import asyncio
-import copy
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
 from tqdm.asyncio import tqdm
+from ..utils.concurrency import AIMDLimiter
+from ..utils.crawl_store import DONE, SQLiteCrawlStore
+from ..utils.graph_pool import GraphPool
 from ..utils.logging import get_logger
+from ..utils.politeness import HostScheduler, HostSlot, fetch_scope
+from ..utils.visited_set import create_visited_set
 from .base_node import BaseNode
 
 DEFAULT_BATCHSIZE = 16
 
 
+class SourceResult(NamedTuple):
+    """
+    The outcome of the graph run on one source: its answer and execution info,
+    or the error that made it fail.
+    """
+
+    source: str
+    answer: Any
+    exec_info: Optional[list]
+    error: Optional[Exception]
+
+
 class GraphIteratorNode(BaseNode):
     """
     A node responsible for instantiating and running multiple graph instances in parallel.
     It creates as many graph instances as the number of elements in the input list.
 
+    With "as_completed" (or an "on_result" callback) in the node configuration, the results
+    are handled in completion order: the callback receives a SourceResult as soon as every
+    source is done, and can return False to stop once enough results are collected. Failed
+    sources are then reported in the "failed_sources" state key instead of being raised,
+    and the answers of the other sources are kept.
+
+    With "politeness", the sources are interleaved across their hosts, and the concurrent
+    fetches and their rate are limited per host, a source taking the slot of its host
+    before its run is counted in the batchsize. With "crawl_store", the answers are persisted
+    as the sources complete, and a run with the "resume" state key set skips the sources
+    completed by the previous one. With "visited_set", the sources sharing their
+    canonical URL are scraped once, the first one being kept.
+
     Attributes:
         verbose (bool): A flag indicating whether to show print statements during execution.
+        as_completed (bool): Whether the results are handled in completion order.
+        on_result (Optional[Callable[[SourceResult], Optional[bool]]]): The function called
+            with the result of every source.
 
     Args:
         input (str): Boolean expression defining the input keys needed from the state.
@@ -39,6 +73,15 @@ class GraphIteratorNode(BaseNode):
         self.verbose = (
             False if node_config is None else node_config.get("verbose", False)
         )
+        self.as_completed = (
+            False if node_config is None else node_config.get("as_completed", False)
+        )
+        self.on_result = (
+            None if node_config is None else node_config.get("on_result", None)
+        )
+        self.visited_set = (
+            None if node_config is None else node_config.get("visited_set", None)
+        )
 
     def execute(self, state: dict) -> dict:
         """
@@ -63,25 +106,152 @@ class GraphIteratorNode(BaseNode):
             f"--- Executing {self.node_name} Node with batchsize {batchsize} ---"
         )
 
+        limiter = self._create_limiter(batchsize)
+        store = self._open_store(state)
+
         try:
-            eventloop = asyncio.get_event_loop()
-        except RuntimeError:
-            eventloop = None
+            if self.as_completed or self.on_result is not None:
+                state = self._execute_as_completed(state, batchsize, limiter, store)
+            else:
+                try:
+                    eventloop = asyncio.get_event_loop()
+                except RuntimeError:
+                    eventloop = None
+
+                if eventloop and eventloop.is_running():
+                    state = eventloop.run_until_complete(
+                        self._async_execute(state, batchsize, limiter, store))
+                else:
+                    state = asyncio.run(self._async_execute(state, batchsize, limiter, store))
+        finally:
+            if store is not None:
+                store.close()
+
+        if limiter is not None:
+            limiter.report()
+
+        return state
+
+    def _unique_sources(self, urls: List[str]) -> List[str]:
+        """
+        Removes the sources whose canonical URL was seen before in the list, when the
+        "visited_set" option is set, so that every page is scraped once.
+        """
+
+        if not self.visited_set:
+            return urls
+
+        visited = create_visited_set(None if self.visited_set is True else self.visited_set)
+        unique = [url for url in urls if not url.startswith("http") or visited.add(url)]
+        if len(unique) < len(urls):
+            self.logger.info(f"--- ({len(urls) - len(unique)} duplicate sources skipped) ---")
+        return unique
+
+    def _create_limiter(self, batchsize: int) -> Optional[AIMDLimiter]:
+        """
+        Creates the adaptive concurrency controller of the "adaptive_concurrency" option,
+        starting from the batchsize, or None if the concurrency is fixed to the batchsize.
+        """
+
+        config = getattr(self, "adaptive_concurrency", None)
+        if config is None:
+            config = (self.node_config or {}).get("adaptive_concurrency", False)
+
+        return AIMDLimiter.from_config(config, initial=batchsize)
+
+    def _create_scheduler(self) -> Optional[HostScheduler]:
+        """
+        Creates the per host scheduler of the "politeness" option, or None if the sources
+        run in their order without per host limits.
+        """
+
+        config = getattr(self, "politeness", None)
+        if config is None:
+            config = (self.node_config or {}).get("politeness", False)
 
-        if eventloop and eventloop.is_running():
-            state = eventloop.run_until_complete(self._async_execute(state, batchsize))
+        return HostScheduler.from_config(config)
+
+    def _open_store(self, state: dict) -> Optional[SQLiteCrawlStore]:
+        """
+        Opens the persistent store of the "crawl_store" option, emptied unless the
+        "resume" state key is set, or returns None if the results are not persisted.
+        """
+
+        config = getattr(self, "crawl_store", None)
+        if config is None:
+            config = (self.node_config or {}).get("crawl_store", False)
+
+        store = SQLiteCrawlStore.from_config(config)
+        if store is None:
+            return None
+
+        if state.get("resume", False):
+            reclaimed = store.reclaim()
+            self.logger.info(f"--- (resuming, {reclaimed} sources to scrape again) ---")
         else:
-            state = asyncio.run(self._async_execute(state, batchsize))
+            store.reset()
 
-        return state
+        return store
 
-    async def _async_execute(self, state: dict, batchsize: int) -> dict:
+    def _create_task(self, pool: GraphPool, limiter: Optional[AIMDLimiter],
+                     scheduler: Optional[HostScheduler],
+                     store: Optional[SQLiteCrawlStore] = None
+                     ) -> Callable[..., Tuple[Any, Optional[list]]]:
+        """
+        Returns the function running the graph on a source, once the host of the source
+        and the concurrency controller allow it. The slot of the host, taken before the
+        concurrency controller unless given, is held until the page is fetched. With a
+        store, the stored answers of the completed sources are returned without running
+        the graph.
+        """
+
+        def _run(url, slot):
+            # waiting for the host does not hold a run of the concurrency controller
+            if scheduler is not None and slot is None:
+                slot = scheduler.acquire(url)
+            with fetch_scope(scheduler, slot):
+                if limiter is None:
+                    return self._run_source(pool, url)
+                return limiter.run(self._run_source, pool, url)
+
+        def _stored_run(url, slot):
+            if store is None:
+                return _run(url, slot)
+
+            stored = store.get(url)
+            if stored is not None and stored.status == DONE:
+                return stored.answer, stored.exec_info
+
+            store.add(url)
+            store.take(url)
+            try:
+                answer, exec_info = _run(url, slot)
+            except Exception as e:
+                store.fail(url, e)
+                raise
+            store.complete(url, answer, exec_info)
+            return answer, exec_info
+
+        def _task(url, slot: Optional[HostSlot] = None):
+            try:
+                return _stored_run(url, slot)
+            finally:
+                if slot is not None:
+                    slot.release()
+
+        return _task
+
+    async def _async_execute(self, state: dict, batchsize: int,
+                             limiter: Optional[AIMDLimiter] = None,
+                             store: Optional[SQLiteCrawlStore] = None) -> dict:
         """asynchronously executes the node's logic with multiple graph instances
         running in parallel, using a semaphore of some size for concurrency regulation
 
         Args:
             state: The current state of the graph.
             batchsize: The maximum number of concurrent instances allowed.
+            limiter: The adaptive concurrency controller replacing the semaphore, if any.
+            store: The persistent store of the answers, if any.
 
         Returns:
             The updated state with the output key containing the results
@@ -98,7 +268,73 @@ class GraphIteratorNode(BaseNode):
         input_data = [state[key] for key in input_keys]
 
         user_prompt = input_data[0]
-        urls = input_data[1]
+        urls = self._unique_sources(input_data[1])
+
+        graph_instance = self._prepare_graph_instance(user_prompt)
+
+        # the nodes of the graph are built once, every run gets an isolated instance
+        pool = GraphPool(graph_instance)
+
+        scheduler = self._create_scheduler()
+        order = scheduler.order(urls) if scheduler is not None else range(len(urls))
+        task = self._create_task(pool, limiter, scheduler, store)
+
+        executor = None
+        if limiter is None:
+            # semaphore to limit the number of concurrent tasks
+            semaphore = asyncio.Semaphore(batchsize)
+
+            async def _async_run(url):
+                # the slot of the host is taken first, so that the sources waiting
+                # for their host do not hold the semaphore
+                slot = await scheduler.aacquire(url) if scheduler is not None else None
+                try:
+                    async with semaphore:
+                        if failed.is_set():
+                            return None
+                        answer, _ = await asyncio.to_thread(task, url, slot)
+                        return answer
+                finally:
+                    if slot is not None:
+                        slot.release()
+        else:
+            # the threads wait for the limiter, so there must be one per allowed run
+            executor = ThreadPoolExecutor(max_workers=limiter.max_limit)
+            loop = asyncio.get_running_loop()
+
+            async def _async_run(url):
+                answer, _ = await loop.run_in_executor(executor, copy_context().run, task, url)
+                return answer
+
+        failed = asyncio.Event()
+        futures = [asyncio.ensure_future(_async_run(urls[index])) for index in order]
+
+        try:
+            answers = await tqdm.gather(
+                *futures, desc="processing graph instances", disable=not self.verbose
+            )
+        except BaseException:
+            # the sources not started yet are skipped, the running ones are awaited
+            # since they still write to the store, closed once the node returns
+            failed.set()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            await asyncio.gather(*futures, return_exceptions=True)
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        # the answers are given in the order of the sources
+        answers = dict(zip(order, answers))
+        state.update({self.output[0]: [answers[index] for index in range(len(urls))]})
+
+        return state
+
+    def _prepare_graph_instance(self, user_prompt: str):
+        """
+        Returns the template graph run on every source, set up with the user prompt.
+        """
 
         graph_instance = self.node_config.get("graph_instance", None)
 
@@ -113,29 +349,126 @@ class GraphIteratorNode(BaseNode):
 
         graph_instance.prompt = user_prompt
 
-        participants = []
+        return graph_instance
 
-        # semaphore to limit the number of concurrent tasks
-        semaphore = asyncio.Semaphore(batchsize)
+    def iter_results(self, user_prompt: str, urls: List[str],
+                     batchsize: int = DEFAULT_BATCHSIZE) -> Iterator[SourceResult]:
+        """
+        Runs the graph on every source, batchsize at a time, yielding the results in
+        completion order. A failed source is yielded with its error instead of raising.
+        Closing the iterator early cancels the sources not started yet.
 
-        async def _async_run(graph):
-            async with semaphore:
-                return await asyncio.to_thread(graph.run)
+        Args:
+            user_prompt (str): The prompt of the graphs.
+            urls (List[str]): The sources.
+            batchsize (int): The maximum number of concurrent graph runs.
+
+        Yields:
+            SourceResult: The result of every source.
+        """
+
+        limiter = self._create_limiter(batchsize)
+        urls = self._unique_sources(urls)
+        for _, result in self._iter_indexed_results(user_prompt, urls, batchsize, limiter):
+            yield result
+
+    def _run_source(self, pool: GraphPool, url: str) -> Tuple[Any, Optional[list]]:
+        """
+        Runs the graph on a source with an instance of the pool.
+
+        Returns:
+            Tuple[Any, Optional[list]]: The answer and the execution info of the run.
+        """
 
-        # creates a deepcopy of the graph instance for each endpoint
-        for url in urls:
-            instance = copy.copy(graph_instance)
+        with pool.instance() as instance:
             instance.source = url
             if url.startswith("http"):
                 instance.input_key = "url"
-            participants.append(instance)
+            answer = instance.run()
+            return answer, instance.get_execution_info()
 
-        futures = [_async_run(graph) for graph in participants]
+    def _iter_indexed_results(self, user_prompt: str, urls: List[str], batchsize: int,
+                              limiter: Optional[AIMDLimiter] = None,
+                              store: Optional[SQLiteCrawlStore] = None
+                              ) -> Iterator[Tuple[int, SourceResult]]:
+        graph_instance = self._prepare_graph_instance(user_prompt)
 
-        answers = await tqdm.gather(
-            *futures, desc="processing graph instances", disable=not self.verbose
-        )
+        # the nodes of the graph are built once, every run gets an isolated instance
+        pool = GraphPool(graph_instance)
+
+        scheduler = self._create_scheduler()
+        order = scheduler.order(urls) if scheduler is not None else range(len(urls))
+        task = self._create_task(pool, limiter, scheduler, store)
+
+        max_workers = batchsize if limiter is None else limiter.max_limit
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            # every run gets its own copy of the context, as with asyncio.to_thread
+            futures = {executor.submit(copy_context().run, task, urls[index]): (index, urls[index])
+                       for index in order}
+
+            for future in as_completed(futures):
+                index, url = futures[future]
+                try:
+                    answer, exec_info = future.result()
+                    result = SourceResult(url, answer, exec_info, None)
+                except Exception as e:
+                    result = SourceResult(url, None, None, e)
+                yield index, result
+        finally:
+            # after an early stop, the sources not started yet are cancelled and the
+            # running ones awaited when they write to the store, closed once the node returns
+            executor.shutdown(wait=store is not None, cancel_futures=True)
+
+    def _execute_as_completed(self, state: dict, batchsize: int,
+                              limiter: Optional[AIMDLimiter] = None,
+                              store: Optional[SQLiteCrawlStore] = None) -> dict:
+        """
+        Executes the node handling the results in completion order, keeping the answers
+        of the sources that succeeded until the callback asks to stop.
 
-        state.update({self.output[0]: answers})
+        Args:
+            state: The current state of the graph.
+            batchsize: The maximum number of concurrent instances allowed.
+            limiter: The adaptive concurrency controller, if any.
+            store: The persistent store of the answers, if any.
+
+        Returns:
+            The updated state with the answers in the order of the sources, and the
+            failed sources with their error in the "failed_sources" key.
+        """
+
+        input_keys = self.get_input_keys(state)
+        input_data = [state[key] for key in input_keys]
+
+        user_prompt = input_data[0]
+        urls = self._unique_sources(input_data[1])
+
+        answers = {}
+        failed_sources = []
+
+        results = self._iter_indexed_results(user_prompt, urls, batchsize, limiter, store)
+        progress = tqdm(total=len(urls), desc="processing graph instances",
+                        disable=not self.verbose)
+        try:
+            for index, result in results:
+                progress.update(1)
+                if result.error is None:
+                    answers[index] = result.answer
+                else:
+                    self.logger.warning(f"--- (source {result.source} failed: {result.error}) ---")
+                    failed_sources.append({"source": result.source, "error": str(result.error)})
+
+                if self.on_result is not None and self.on_result(result) is False:
+                    self.logger.info(f"--- (stopped after {len(answers)} answers) ---")
+                    break
+        finally:
+            results.close()
+            progress.close()
+
+        state.update({
+            self.output[0]: [answers[index] for index in sorted(answers)],
+            "failed_sources": failed_sources,
+        })
 
         return state
@@ -6,6 +6,9 @@ from typing import List, Optional
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from ..utils.logging import get_logger
+from ..utils.schema_merge import deterministic_merge
+from ..utils.streaming import invoke_chain
+from ..utils.tree_reduce import tree_reduce
 from .base_node import BaseNode
 from ..helpers import template_combined
 
@@ -38,6 +41,7 @@ class MergeAnswersNode(BaseNode):
         self.verbose = (
             False if node_config is None else node_config.get("verbose", False)
         )
+        self.model_token = node_config.get("model_token", 8192)
 
     def execute(self, state: dict) -> dict:
         """
@@ -67,10 +71,11 @@ class MergeAnswersNode(BaseNode):
         user_prompt = input_data[0]
         answers = input_data[1]
 
-        # merge the answers in one string
-        answers_str = ""
-        for i, answer in enumerate(answers):
-            answers_str += f"CONTENT WEBSITE {i+1}: {answer}\n"
+        answer = deterministic_merge(answers, self.node_config.get("schema", None))
+        if answer is not None:
+            self.logger.info("--- (answers merged using the schema) ---")
+            state.update({self.output[0]: answer})
+            return state
 
         # Initialize the output parser
         if self.node_config.get("schema", None) is not None:
@@ -82,15 +87,29 @@ class MergeAnswersNode(BaseNode):
 
         prompt_template = PromptTemplate(
             template=template_combined,
-            input_variables=["user_prompt"],
+            input_variables=["user_prompt", "website_content"],
             partial_variables={
                 "format_instructions": format_instructions,
-                "website_content": answers_str,
             },
         )
 
-        merge_chain = prompt_template | self.llm_model | output_parser
-        answer = merge_chain.invoke({"user_prompt": user_prompt})
+        merge_chain = self.build_chain(prompt_template, output_parser)
+
+        def merge_inputs(group):
+            # merge the answers of the group in one string
+            answers_str = ""
+            for i, answer in enumerate(group):
+                answers_str += f"CONTENT WEBSITE {i+1}: {answer}\n"
+            return {"user_prompt": user_prompt, "website_content": answers_str}
+
+        def merge_groups(groups):
+            return merge_chain.batch([merge_inputs(group) for group in groups])
+
+        def merge_final(group):
+            return invoke_chain(merge_chain, merge_inputs(group))
+
+        token_budget = self.node_config.get("merge_token_budget", self.model_token // 2)
+        answer = tree_reduce(answers, merge_groups, token_budget, final_merge_fn=merge_final)
 
         # Update the state with the generated answer
         state.update({self.output[0]: answer})
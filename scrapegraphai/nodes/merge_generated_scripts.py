@@ -101,7 +101,7 @@ class MergeGeneratedScriptsNode(BaseNode):
             },
         )
 
-        merge_chain = prompt_template | self.llm_model | StrOutputParser()
+        merge_chain = self.build_chain(prompt_template, StrOutputParser())
         answer = merge_chain.invoke({"user_prompt": user_prompt})
 
         # Update the state with the generated answer
@@ -10,6 +10,31 @@ from ..utils.logging import get_logger
 from .base_node import BaseNode
 
 
+def split_document(document, chunk_size: int, parse_html: bool = True) -> List[str]:
+    """
+    Converts a document to text and splits it into chunks. Defined at the module level
+    so that it can run in the process pool of the graph.
+
+    Args:
+        document (Union[Document, str]): The document, or its content.
+        chunk_size (int): The maximum number of words of a chunk.
+        parse_html (bool): Whether the content is HTML to convert to text.
+
+    Returns:
+        List[str]: The chunks.
+    """
+
+    if parse_html:
+        document = Html2TextTransformer().transform_documents([document])[0]
+
+    text = document.page_content if isinstance(document, Document) else document
+
+    return chunk(text=text,
+                 chunk_size=chunk_size,
+                 token_counter=lambda text: len(text.split()),
+                 memoize=False)
+
+
 class ParseNode(BaseNode):
     """
     A node responsible for parsing HTML content from a document.
@@ -68,30 +93,10 @@ class ParseNode(BaseNode):
         # Fetching data from the state based on the input keys
         input_data = [state[key] for key in input_keys]
         # Parse the document
-        docs_transformed = input_data[0]
-        if self.parse_html:
-            docs_transformed = Html2TextTransformer().transform_documents(input_data[0])
-            docs_transformed = docs_transformed[0]
-
-            chunks = chunk(text=docs_transformed.page_content,
-                            chunk_size=self.node_config.get("chunk_size", 4096)-250,
-                            token_counter=lambda text: len(text.split()),
-                            memoize=False)
-        else:
-            docs_transformed = docs_transformed[0]
-
-            if isinstance(docs_transformed, Document):
-                chunks = chunk(text=docs_transformed.page_content,
-                            chunk_size=self.node_config.get("chunk_size", 4096)-250,
-                            token_counter=lambda text: len(text.split()),
-                            memoize=False)
-            else:
-
-                chunks = chunk(text=docs_transformed,
-                                chunk_size=self.node_config.get("chunk_size", 4096)-250,
-                                token_counter=lambda text: len(text.split()),
-                                memoize=False)
-    
+        chunks = self.run_cpu_bound(split_document, input_data[0][0],
+                                    self.node_config.get("chunk_size", 4096) - 250,
+                                    self.parse_html)
+
         state.update({self.output[0]: chunks})
 
         return state
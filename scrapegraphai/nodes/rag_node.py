@@ -14,20 +14,11 @@ from langchain.retrievers.document_compressors import (
 from langchain_community.document_transformers import EmbeddingsRedundantFilter
 from langchain_community.vectorstores import FAISS
 
-from langchain_community.chat_models import ChatOllama
-from langchain_aws import BedrockEmbeddings, ChatBedrock
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEmbeddings
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_google_vertexai import ChatVertexAI, VertexAIEmbeddings
-from langchain_fireworks import FireworksEmbeddings, ChatFireworks
-from langchain_openai import AzureOpenAIEmbeddings, OpenAIEmbeddings, ChatOpenAI, AzureChatOpenAI
-from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings, ChatNVIDIA
-
+from ..utils.client_registry import get_shared_client
 from ..utils.logging import get_logger
+from ..utils.providers import get_provider_class, is_provider_instance
 from .base_node import BaseNode
 from ..helpers import models_tokens
-from ..models import DeepSeek
 
 
 class RAGNode(BaseNode):
@@ -40,6 +31,8 @@ class RAGNode(BaseNode):
     Attributes:
         llm_model: An instance of a language model client, configured for generating answers.
         embedder_model: An instance of an embedding model client, configured for generating embeddings.
+        llm_config (dict): The configuration of the language model, identifying the default
+            embedder shared by the graphs.
         verbose (bool): A flag indicating whether to show print statements during execution.
 
     Args:
@@ -106,22 +99,7 @@ class RAGNode(BaseNode):
 
         self.logger.info("--- (updated chunks metadata) ---")
 
-        # check if embedder_model is provided, if not use llm_model
-        if self.embedder_model is not None:
-            embeddings = self.embedder_model
-        elif 'embeddings' in self.node_config:
-            try:
-                embeddings = self._create_embedder(self.node_config['embedder_config'])
-            except Exception:
-                try:
-                    embeddings = self._create_default_embedder()
-                    self.embedder_model = embeddings
-                except ValueError:
-                    embeddings = self.llm_model
-                    self.embedder_model = self.llm_model
-        else:
-            embeddings = self.llm_model
-            self.embedder_model = self.llm_model
+        embeddings = self._get_embeddings()
 
         folder_name = self.node_config.get("cache_path", "cache")
 
@@ -166,6 +144,41 @@ class RAGNode(BaseNode):
         return state
     
 
+    def _get_embeddings(self) -> object:
+        """
+        Returns the embedding model of the node: the embedder model, the one of the
+        embedder configuration, or the default embedder of the language model.
+        """
+
+        # check if embedder_model is provided, if not use llm_model
+        if self.embedder_model is not None:
+            embeddings = self.embedder_model
+        elif 'embeddings' in self.node_config:
+            try:
+                embedder_config = self.node_config['embedder_config']
+                embeddings = get_shared_client("embedder", embedder_config,
+                                               lambda: self._create_embedder(embedder_config))
+            except Exception:
+                try:
+                    # shared by the graphs with the same language model configuration,
+                    # created for the node alone without a serializable one
+                    llm_config = (getattr(self, "llm_config", None)
+                                  or self.node_config.get("llm_config"))
+                    if llm_config is None:
+                        embeddings = self._create_default_embedder()
+                    else:
+                        embeddings = get_shared_client("default_embedder", {"llm": llm_config},
+                                                       self._create_default_embedder)
+                    self.embedder_model = embeddings
+                except ValueError:
+                    embeddings = self.llm_model
+                    self.embedder_model = self.llm_model
+        else:
+            embeddings = self.llm_model
+            self.embedder_model = self.llm_model
+
+        return embeddings
+
     def _create_default_embedder(self, llm_config=None) -> object:
         """
         Create an embedding model instance based on the chosen llm model.
@@ -176,37 +189,38 @@ class RAGNode(BaseNode):
         Raises:
             ValueError: If the model is not supported.
         """
-        if isinstance(self.llm_model, ChatGoogleGenerativeAI):
-            return GoogleGenerativeAIEmbeddings(
+        if is_provider_instance(self.llm_model, "ChatGoogleGenerativeAI"):
+            return get_provider_class("GoogleGenerativeAIEmbeddings")(
                 google_api_key=llm_config["api_key"], model="models/embedding-001"
             )
-        if isinstance(self.llm_model, ChatOpenAI):
-            return OpenAIEmbeddings(api_key=self.llm_model.openai_api_key,
-                                    base_url=self.llm_model.openai_api_base)
-        elif isinstance(self.llm_model, DeepSeek):
-            return OpenAIEmbeddings(api_key=self.llm_model.openai_api_key)
-        elif isinstance(self.llm_model, ChatVertexAI):
-            return VertexAIEmbeddings()
-        elif isinstance(self.llm_model, AzureOpenAIEmbeddings):
+        if is_provider_instance(self.llm_model, "ChatOpenAI"):
+            return get_provider_class("OpenAIEmbeddings")(
+                api_key=self.llm_model.openai_api_key, base_url=self.llm_model.openai_api_base
+            )
+        elif is_provider_instance(self.llm_model, "DeepSeek"):
+            return get_provider_class("OpenAIEmbeddings")(api_key=self.llm_model.openai_api_key)
+        elif is_provider_instance(self.llm_model, "ChatVertexAI"):
+            return get_provider_class("VertexAIEmbeddings")()
+        elif is_provider_instance(self.llm_model, "AzureOpenAIEmbeddings"):
             return self.llm_model
-        elif isinstance(self.llm_model, AzureChatOpenAI):
-            return AzureOpenAIEmbeddings()
-        elif isinstance(self.llm_model, ChatFireworks):
-            return FireworksEmbeddings(model=self.llm_model.model_name)
-        elif isinstance(self.llm_model, ChatNVIDIA):
-            return NVIDIAEmbeddings(model=self.llm_model.model_name)
-        elif isinstance(self.llm_model, ChatOllama):
-            # unwrap the kwargs from the model whihc is a dict
-            params = self.llm_model._lc_kwargs
+        elif is_provider_instance(self.llm_model, "AzureChatOpenAI"):
+            return get_provider_class("AzureOpenAIEmbeddings")()
+        elif is_provider_instance(self.llm_model, "ChatFireworks"):
+            return get_provider_class("FireworksEmbeddings")(model=self.llm_model.model_name)
+        elif is_provider_instance(self.llm_model, "ChatNVIDIA"):
+            return get_provider_class("NVIDIAEmbeddings")(model=self.llm_model.model_name)
+        elif is_provider_instance(self.llm_model, "ChatOllama"):
+            # unwrap the kwargs from the model whihc is a dict, copied since the model is shared
+            params = dict(self.llm_model._lc_kwargs)
             # remove streaming and temperature
             params.pop("streaming", None)
             params.pop("temperature", None)
 
-            return OllamaEmbeddings(**params)
-        elif isinstance(self.llm_model, ChatHuggingFace):
-            return HuggingFaceEmbeddings(model=self.llm_model.model)
-        elif isinstance(self.llm_model, ChatBedrock):
-            return BedrockEmbeddings(client=None, model_id=self.llm_model.model_id)
+            return get_provider_class("OllamaEmbeddings")(**params)
+        elif is_provider_instance(self.llm_model, "ChatHuggingFace"):
+            return get_provider_class("HuggingFaceEmbeddings")(model=self.llm_model.model)
+        elif is_provider_instance(self.llm_model, "ChatBedrock"):
+            return get_provider_class("BedrockEmbeddings")(client=None, model_id=self.llm_model.model_id)
         else:
             raise ValueError("Embedding Model missing or not supported")
 
@@ -229,44 +243,45 @@ class RAGNode(BaseNode):
             return embedder_params["model_instance"]
         # Instantiate the embedding model based on the model name
         if "openai" in embedder_params["model"]:
-            return OpenAIEmbeddings(api_key=embedder_params["api_key"])
+            return get_provider_class("OpenAIEmbeddings")(api_key=embedder_params["api_key"])
         if "azure" in embedder_params["model"]:
-            return AzureOpenAIEmbeddings()
+            return get_provider_class("AzureOpenAIEmbeddings")()
         if "nvidia" in embedder_params["model"]:
             embedder_params["model"] = "/".join(embedder_params["model"].split("/")[1:])
             try:
                 models_tokens["nvidia"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return NVIDIAEmbeddings(model=embedder_params["model"],
-                                    nvidia_api_key=embedder_params["api_key"])
+            return get_provider_class("NVIDIAEmbeddings")(
+                model=embedder_params["model"], nvidia_api_key=embedder_params["api_key"]
+            )
         if "ollama" in embedder_params["model"]:
             embedder_params["model"] = "/".join(embedder_params["model"].split("/")[1:])
             try:
                 models_tokens["ollama"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return OllamaEmbeddings(**embedder_params)
+            return get_provider_class("OllamaEmbeddings")(**embedder_params)
         if "hugging_face" in embedder_params["model"]:
             embedder_params["model"] = "/".join(embedder_params["model"].split("/")[1:])
             try:
                 models_tokens["hugging_face"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return HuggingFaceEmbeddings(model=embedder_params["model"])
+            return get_provider_class("HuggingFaceEmbeddings")(model=embedder_params["model"])
         if "fireworks" in embedder_params["model"]:
             embedder_params["model"] = "/".join(embedder_params["model"].split("/")[1:])
             try:
                 models_tokens["fireworks"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return FireworksEmbeddings(model=embedder_params["model"])
+            return get_provider_class("FireworksEmbeddings")(model=embedder_params["model"])
         if "gemini" in embedder_params["model"]:
             try:
                 models_tokens["gemini"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return GoogleGenerativeAIEmbeddings(model=embedder_params["model"])
+            return get_provider_class("GoogleGenerativeAIEmbeddings")(model=embedder_params["model"])
         if "bedrock" in embedder_params["model"]:
             embedder_params["model"] = embedder_params["model"].split("/")[-1]
             client = embedder_params.get("client", None)
@@ -274,6 +289,6 @@ class RAGNode(BaseNode):
                 models_tokens["bedrock"][embedder_params["model"]]
             except KeyError as exc:
                 raise KeyError("Model not supported") from exc
-            return BedrockEmbeddings(client=client, model_id=embedder_params["model"])
+            return get_provider_class("BedrockEmbeddings")(client=client, model_id=embedder_params["model"])
 
         raise ValueError("Model provided by the configuration not supported")
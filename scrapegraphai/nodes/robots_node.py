@@ -122,7 +122,7 @@ class RobotsNode(BaseNode):
                 partial_variables={"context": document, "agent": agent},
             )
 
-            chain = prompt | self.llm_model | output_parser
+            chain = self.build_chain(prompt, output_parser)
             is_scrapable = chain.invoke({"path": source})[0]
 
             if "no" in is_scrapable:
@@ -4,9 +4,10 @@ SearchInternetNode Module
 from typing import List, Optional
 from langchain.output_parsers import CommaSeparatedListOutputParser
 from langchain.prompts import PromptTemplate
-from langchain_community.chat_models import ChatOllama
 from ..utils.logging import get_logger
-from ..utils.research_web import search_on_web
+from ..utils.providers import is_provider_instance
+from ..utils.query_rewrite import QueryRewriteCache, keyword_query, model_key
+from ..utils.research_web import DEFAULT_SEARCH_TIMEOUT, search_on_web
 from .base_node import BaseNode
 
 class SearchInternetNode(BaseNode):
@@ -19,6 +20,13 @@ class SearchInternetNode(BaseNode):
     Attributes:
         llm_model: An instance of the language model client used for generating search queries.
         verbose (bool): A flag indicating whether to show print statements during execution.
+        search_engine (Union[str, List[str]]): The search engine, or the engines queried
+            concurrently with their results merged.
+        search_timeout (float): The number of seconds every search engine gets to answer.
+        query_cache (Optional[QueryRewriteCache]): The cache of the search queries generated
+            from the prompts, None to always ask the language model.
+        keyword_fast_path (bool): Whether the short keyword-like prompts are searched as
+            they are, without asking the language model.
 
     Args:
         input (str): Boolean expression defining the input keys needed from the state.
@@ -42,6 +50,12 @@ class SearchInternetNode(BaseNode):
         )
         self.search_engine = node_config.get("search_engine", "google")
         self.max_results = node_config.get("max_results", 3)
+        self.search_timeout = node_config.get("search_timeout", DEFAULT_SEARCH_TIMEOUT)
+
+        query_rewrite = node_config.get("query_rewrite") or {}
+        self.query_cache = QueryRewriteCache.from_config(query_rewrite.get("cache", False))
+        self.keyword_fast_path = query_rewrite.get("fast_path", False)
+        self.keyword_max_words = query_rewrite.get("max_words", 6)
 
     def execute(self, state: dict) -> dict:
         """
@@ -71,6 +85,48 @@ class SearchInternetNode(BaseNode):
 
         user_prompt = input_data[0]
 
+        search_query = self._rewrite_query(user_prompt)
+
+        self.logger.info(f"Search Query: {search_query}")
+
+        answer = search_on_web(query=search_query, max_results=self.max_results,
+                               search_engine=self.search_engine,
+                               timeout=self.search_timeout)
+
+        if len(answer) == 0:
+            # raise an exception if no answer is found
+            raise ValueError("Zero results found for the search query.")
+
+        # Update the state with the generated answer
+        state.update({self.output[0]: answer})
+        return state
+
+    def _rewrite_query(self, user_prompt: str) -> str:
+        """
+        Turns the user prompt into a search query: the short keyword-like prompts are
+        used as they are, the others are rewritten by the language model, unless their
+        query is cached.
+
+        Args:
+            user_prompt (str): The user prompt.
+
+        Returns:
+            str: The search query.
+        """
+
+        if self.keyword_fast_path:
+            search_query = keyword_query(user_prompt, self.keyword_max_words)
+            if search_query is not None:
+                self.logger.info("Search query taken from the keyword-like prompt")
+                return search_query
+
+        model = model_key(self.llm_model)
+        if self.query_cache is not None:
+            search_query = self.query_cache.get(model, user_prompt)
+            if search_query is not None:
+                self.logger.info("Search query found in the cache")
+                return search_query
+
         output_parser = CommaSeparatedListOutputParser()
 
         search_template = """
@@ -89,26 +145,17 @@ class SearchInternetNode(BaseNode):
             input_variables=["user_prompt"],
         )
 
-        # Execute the chain to get the search query
-        search_answer = search_prompt | self.llm_model | output_parser
-        
-        # Ollama: Use no json format when creating the search query
-        if isinstance(self.llm_model, ChatOllama) and self.llm_model.format == 'json':
-            self.llm_model.format = None
-            search_query = search_answer.invoke({"user_prompt": user_prompt})[0]
-            self.llm_model.format = 'json'
+        # Ollama: Use no json format when creating the search query, the model is bound
+        # to it instead of being changed since the other graphs share it
+        if is_provider_instance(self.llm_model, "ChatOllama") and self.llm_model.format == 'json':
+            llm_model = self.get_llm_runnable(self.llm_model.bind(format=None))
+            search_answer = search_prompt | llm_model | output_parser
         else:
-            search_query = search_answer.invoke({"user_prompt": user_prompt})[0]
-
-        self.logger.info(f"Search Query: {search_query}")
+            search_answer = self.build_chain(search_prompt, output_parser)
 
-        answer = search_on_web(query=search_query, max_results=self.max_results,
-                               search_engine=self.search_engine)
-
-        if len(answer) == 0:
-            # raise an exception if no answer is found
-            raise ValueError("Zero results found for the search query.")
+        # Execute the chain to get the search query
+        search_query = search_answer.invoke({"user_prompt": user_prompt})[0]
 
-        # Update the state with the generated answer
-        state.update({self.output[0]: answer})
-        return state
+        if self.query_cache is not None:
+            self.query_cache.set(model, user_prompt, search_query)
+        return search_query
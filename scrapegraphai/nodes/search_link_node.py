@@ -3,11 +3,12 @@ SearchLinkNode Module
 """
 
 from typing import List, Optional
-import re
 from tqdm import tqdm
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.runnables import RunnableParallel
+from ..utils.crawl_frontier import canonicalize_url
+from ..utils.link_ranking import LinkCandidate, collect_links, rank_links
 from ..utils.logging import get_logger
 from .base_node import BaseNode
 
@@ -18,9 +19,17 @@ class SearchLinkNode(BaseNode):
     Node expects the already scrapped links on the webpage and hence it is expected
     that this node be used after the FetchNode.
 
+    The links are deduplicated and ranked by the relevance of their anchor text, URL and
+    surrounding text to the user prompt, with BM25 or with the embeddings of the embedder
+    model, without calling the language model.
+
     Attributes:
         llm_model: An instance of the language model client used for generating answers.
+        embedder_model: The embedding model used to rank the links with "embeddings".
         verbose (bool): A flag indicating whether to show print statements during execution.
+        ranking (str): The ranking method, "bm25" or "embeddings".
+        top_k (Optional[int]): The maximum number of links returned, None for all.
+        threshold (float): The minimum relevance score, between 0 and 1, of the links returned.
 
     Args:
         input (str): Boolean expression defining the input keys needed from the state.
@@ -39,9 +48,13 @@ class SearchLinkNode(BaseNode):
         super().__init__(node_name, "node", input, output, 1, node_config)
 
         self.llm_model = node_config["llm_model"]
+        self.embedder_model = node_config.get("embedder_model", None)
         self.verbose = (
             False if node_config is None else node_config.get("verbose", False)
         )
+        self.ranking = node_config.get("ranking", "bm25")
+        self.top_k = node_config.get("top_k", None)
+        self.threshold = node_config.get("threshold", 0.0)
 
     def execute(self, state: dict) -> dict:
         """
@@ -53,7 +66,8 @@ class SearchLinkNode(BaseNode):
                             correct data types from the state.
 
         Returns:
-            dict: The updated state with the output key containing the list of links.
+            dict: The updated state with the output key containing the list of links, the
+            most relevant first, and the "scored_links" key containing their scores.
 
         Raises:
             KeyError: If the input keys are not found in the state, indicating that the
@@ -66,7 +80,10 @@ class SearchLinkNode(BaseNode):
         parsed_content_chunks = state.get("doc")
         output_parser = JsonOutputParser()
 
-        relevant_links = []
+        user_prompt = state.get("user_prompt", "")
+        base_url = state.get("url", "")
+
+        links = {}
 
         for i, chunk in enumerate(
             tqdm(
@@ -77,9 +94,7 @@ class SearchLinkNode(BaseNode):
         ):
             try:
                 # Primary approach: Regular expression to extract links
-                links = re.findall(r'https?://[^\s"<>\]]+', str(chunk.page_content))
-
-                relevant_links += links
+                candidates = collect_links(str(chunk.page_content), base_url)
             except Exception as e:
                 # Fallback approach: Using the LLM to extract links
                 self.logger.error(f"Error extracting links: {e}. Falling back to LLM.")
@@ -111,11 +126,32 @@ class SearchLinkNode(BaseNode):
                     template=prompt_relevant_links,
                     input_variables=["content", "user_prompt"],
                 )
-                merge_chain = merge_prompt | self.llm_model | output_parser
+                merge_chain = self.build_chain(merge_prompt, output_parser)
                 answer = merge_chain.invoke(
                     {"content": chunk.page_content}
                 )
-                relevant_links += answer
-
-        state.update({self.output[0]: relevant_links})
+                candidates = [LinkCandidate(link, "", "") for link in answer]
+
+            # the same link found in several chunks is ranked on all of its texts
+            for candidate in candidates:
+                key = canonicalize_url(candidate.url)
+                known = links.get(key)
+                if known is not None:
+                    candidate = LinkCandidate(known.url,
+                                              f"{known.anchor_text} {candidate.anchor_text}".strip(),
+                                              f"{known.context} {candidate.context}".strip())
+                links[key] = candidate
+
+        embedder = None
+        if self.ranking == "embeddings":
+            embedder = self.embedder_model
+            if embedder is None:
+                self.logger.warning("--- (no embedder model to rank the links, using BM25) ---")
+        ranked = rank_links(user_prompt, list(links.values()), top_k=self.top_k,
+                            threshold=self.threshold, embedder=embedder)
+
+        state.update({
+            self.output[0]: [url for url, _ in ranked],
+            "scored_links": [{"url": url, "score": round(score, 4)} for url, score in ranked],
+        })
         return state
@@ -119,7 +119,7 @@ class SearchLinksWithContext(BaseNode):
                     },
                 )
 
-            result.extend(prompt | self.llm_model | output_parser)
+            result.extend(self.build_chain(prompt, output_parser))
 
         state["urls"] = result
         return state
@@ -0,0 +1,469 @@
+"""
+Module for running graphs offline through the batch endpoints of the providers
+"""
+
+import hashlib
+import json
+import os
+import threading
+import warnings
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, load, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from .logging import get_logger
+
+PENDING_MARKER = "__scrapegraphai_batch_pending__"
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+MESSAGE_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+# the nodes computing the inputs of the map phase, run once per job
+REPLAYED_NODES = {"FetchNode", "ParseNode"}
+
+_bypass_jobs: ContextVar[bool] = ContextVar("bypass_batch_jobs", default=False)
+
+_jobs: Dict[str, "BatchJob"] = {}
+_jobs_lock = threading.Lock()
+
+
+def _read_jsonl(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_jsonl(path: str, records: List[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def _to_openai_messages(messages: list) -> List[dict]:
+    return [{"role": MESSAGE_ROLES.get(message.type, message.type), "content": message.content}
+            for message in messages]
+
+
+class BatchBackend(ABC):
+    """
+    The interface of the services running a file of requests in the OpenAI batch format,
+    one JSON object per line with the keys "custom_id", "method", "url" and "body".
+    """
+
+    @abstractmethod
+    def submit(self, requests_path: str) -> str:
+        """
+        Submits the requests of a JSONL file.
+
+        Args:
+            requests_path (str): The path of the requests file.
+
+        Returns:
+            str: The identifier of the batch.
+        """
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """
+        Returns the status of a batch, e.g. "in_progress" or "completed".
+        """
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[dict]:
+        """
+        Yields the results of a finished batch in the OpenAI batch output format,
+        with the keys "custom_id", "response" and "error".
+        """
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    Runs the requests through the OpenAI Batch API.
+
+    Args:
+        client (Optional[openai.OpenAI]): The OpenAI client, created from the
+            environment variables if not given.
+        completion_window (str): The time frame within which the batch is processed.
+    """
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: str) -> str:
+        with open(requests_path, "rb") as file:
+            input_file = self.client.files.create(file=file, purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id,
+                                           endpoint="/v1/chat/completions",
+                                           completion_window=self.completion_window)
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> Iterator[dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Runs the requests with any chat model as soon as they are submitted, writing the
+    results next to the requests file. Useful for providers without a batch endpoint
+    and for testing batch jobs.
+
+    Args:
+        llm_model (BaseChatModel): The chat model answering the requests.
+        max_concurrency (int): The maximum number of concurrent requests.
+    """
+
+    def __init__(self, llm_model, max_concurrency: int = 8):
+        self.llm_model = llm_model
+        self.max_concurrency = max_concurrency
+
+    def submit(self, requests_path: str) -> str:
+        requests = list(_read_jsonl(requests_path))
+        output_path = os.path.splitext(requests_path)[0] + "_output.jsonl"
+
+        # the model of a batch job answers from the job itself, bypass it
+        token = _bypass_jobs.set(True)
+        try:
+            outputs = self.llm_model.batch(
+                [[(message["role"], message["content"]) for message in request["body"]["messages"]]
+                 for request in requests],
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True,
+            )
+        finally:
+            _bypass_jobs.reset(token)
+
+        results = []
+        for request, output in zip(requests, outputs):
+            if isinstance(output, Exception):
+                results.append({"custom_id": request["custom_id"], "response": None,
+                                "error": {"message": str(output)}})
+                continue
+
+            usage = getattr(output, "usage_metadata", None) or {}
+            results.append({
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {
+                    "choices": [{"message": {"role": "assistant", "content": output.content}}],
+                    "usage": {"prompt_tokens": usage.get("input_tokens", 0),
+                              "completion_tokens": usage.get("output_tokens", 0),
+                              "total_tokens": usage.get("total_tokens", 0)},
+                }},
+                "error": None,
+            })
+
+        _write_jsonl(output_path, results)
+        return output_path
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if os.path.exists(batch_id) else "failed"
+
+    def results(self, batch_id: str) -> Iterator[dict]:
+        if os.path.exists(batch_id):
+            yield from _read_jsonl(batch_id)
+
+
+class BatchJob(BaseCache):
+    """
+    An offline job answering the language model calls of a graph through a batch backend.
+
+    The job is set as the cache of the language model: every run of the graph replays the
+    calls already answered by the backend, and records the others in a JSONL file submitted
+    as the next round. Calls depending on answers that are still pending are not submitted,
+    so the map phase goes in the first round and every reduce level in the following ones.
+    The state of the job is persisted in its folder, so the process can exit between rounds.
+    The outputs of the nodes fetching and parsing the sources are persisted on the first
+    round and replayed on the following ones, so that every round sees the same prompts.
+
+    Attributes:
+        job_dir (str): The folder of the job files.
+        backend (BatchBackend): The backend running the requests.
+        state (dict): The persisted state of the job.
+
+    Args:
+        job_dir (str): The folder of the job files.
+        backend (BatchBackend): The backend running the requests.
+        llm_model (BaseChatModel): The model whose name and temperature are used in the requests.
+        max_rounds (int): The maximum number of rounds before giving up.
+    """
+
+    def __init__(self, job_dir: str, backend: BatchBackend, llm_model, max_rounds: int = 10):
+        self.job_dir = job_dir
+        self.backend = backend
+        self.llm_model = llm_model
+        self.max_rounds = max_rounds
+        self.logger = get_logger()
+
+        os.makedirs(job_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, dict] = {}
+
+        self.state = {"round": 0, "status": "new", "batch_id": None, "answer": None,
+                      "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
+        if os.path.exists(self._path("state.json")):
+            with open(self._path("state.json"), "r", encoding="utf-8") as file:
+                self.state.update(json.load(file))
+
+        self._responses: Dict[str, str] = {}
+        if os.path.exists(self._path("responses.jsonl")):
+            for record in _read_jsonl(self._path("responses.jsonl")):
+                self._responses[record["custom_id"]] = record["content"]
+
+        self._nodes: Dict[str, str] = {}
+        if os.path.exists(self._path("nodes.jsonl")):
+            for record in _read_jsonl(self._path("nodes.jsonl")):
+                self._nodes[record["key"]] = record["outputs"]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.job_dir, name)
+
+    def _save_state(self) -> None:
+        with open(self._path("state.json"), "w", encoding="utf-8") as file:
+            json.dump(self.state, file, default=str)
+
+    def _placeholder(self) -> RETURN_VAL_TYPE:
+        content = json.dumps({PENDING_MARKER: True})
+        return [ChatGeneration(message=AIMessage(content=content))]
+
+    def _render_request(self, custom_id: str, prompt: str) -> dict:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            messages = loads(prompt)
+
+        body = {"messages": _to_openai_messages(messages)}
+        model_name = getattr(self.llm_model, "model_name", None) or getattr(self.llm_model, "model", None)
+        if model_name:
+            body["model"] = model_name
+        temperature = getattr(self.llm_model, "temperature", None)
+        if temperature is not None:
+            body["temperature"] = temperature
+
+        return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                "body": body}
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Returns the answer collected for a prompt, or a placeholder recording
+        the prompt for the next round.
+        """
+
+        if _bypass_jobs.get():
+            return None
+
+        # built from answers that are still pending, it will be rendered again later
+        if PENDING_MARKER in prompt:
+            return self._placeholder()
+
+        custom_id = hashlib.sha256((llm_string + prompt).encode("utf-8")).hexdigest()
+
+        with self._lock:
+            content = self._responses.get(custom_id)
+            if content is None:
+                if custom_id not in self._pending:
+                    self._pending[custom_id] = self._render_request(custom_id, prompt)
+                return self._placeholder()
+
+        message = AIMessage(content=content, response_metadata={"llm_cache_hit": True})
+        return [ChatGeneration(message=message)]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        The answers of a batch job only come from the backend.
+        """
+
+    def clear(self, **kwargs: Any) -> None:
+        """
+        Removes the collected answers of the job.
+        """
+
+        with self._lock:
+            self._responses = {}
+        if os.path.exists(self._path("responses.jsonl")):
+            os.remove(self._path("responses.jsonl"))
+
+    def run_node(self, node, state: dict) -> dict:
+        """
+        Executes a node of the graph, replaying the persisted outputs of the nodes
+        fetching and parsing the sources instead of running them again, so that the pages
+        are not fetched at every round and dynamic pages do not change the prompts.
+
+        Args:
+            node (BaseNode): The node to execute.
+            state (dict): The state of the graph.
+
+        Returns:
+            dict: The updated state.
+        """
+
+        if _bypass_jobs.get() or type(node).__name__ not in REPLAYED_NODES:
+            return node.execute(state)
+
+        inputs = {key: state.get(key) for key in node.get_input_keys(state)}
+        key = hashlib.sha256((type(node).__name__ + node.node_name
+                              + json.dumps(inputs, default=str, sort_keys=True)).encode("utf-8")).hexdigest()
+
+        with self._lock:
+            outputs = self._nodes.get(key)
+        if outputs is not None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                state.update(load(json.loads(outputs)))
+            return state
+
+        before = dict(state)
+        state = node.execute(state)
+        outputs = dumps({name: value for name, value in state.items()
+                         if name not in before or before[name] is not value})
+
+        # outputs that cannot be loaded back are computed again at every round
+        if '"not_implemented"' not in outputs:
+            with self._lock:
+                self._nodes[key] = outputs
+                with open(self._path("nodes.jsonl"), "a", encoding="utf-8") as file:
+                    file.write(json.dumps({"key": key, "outputs": outputs}) + "\n")
+
+        return state
+
+    def _collect(self) -> None:
+        records = []
+        usage = self.state["usage"]
+
+        for result in self.backend.results(self.state["batch_id"]):
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                self.logger.warning(f"Batch request {result.get('custom_id')} failed: "
+                                    f"{result.get('error') or response}")
+                continue
+
+            body = response["body"]
+            records.append({"custom_id": result["custom_id"],
+                            "content": body["choices"][0]["message"]["content"]})
+            for key in usage:
+                usage[key] += (body.get("usage") or {}).get(key, 0)
+
+        with open(self._path("responses.jsonl"), "a", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+        with self._lock:
+            for record in records:
+                self._responses[record["custom_id"]] = record["content"]
+
+        self.state["status"] = "collected"
+        self._save_state()
+
+    def advance(self, run_graph: Callable[[], Any]) -> bool:
+        """
+        Moves the job forward as far as possible: collects the results of the submitted
+        round if it is finished, replays the graph and submits the next round.
+
+        Args:
+            run_graph (Callable[[], Any]): The function running the graph.
+
+        Returns:
+            bool: True if the job is completed, False if a round is still being processed.
+
+        Raises:
+            RuntimeError: If the job is not completed within the maximum number of rounds.
+        """
+
+        while True:
+            if self.state["status"] == "completed":
+                return True
+
+            if self.state["status"] == "submitted":
+                status = self.backend.status(self.state["batch_id"])
+                if status not in TERMINAL_STATUSES:
+                    return False
+                if status != "completed":
+                    self.logger.warning(f"Batch {self.state['batch_id']} ended as {status}, "
+                                        "its failed requests will be submitted again")
+                self._collect()
+
+            with self._lock:
+                self._pending = {}
+
+            answer = run_graph()
+
+            with self._lock:
+                requests = list(self._pending.values())
+
+            if not requests:
+                self.state.update({"status": "completed", "answer": answer})
+                self._save_state()
+                return True
+
+            if self.state["round"] >= self.max_rounds:
+                raise RuntimeError(f"Batch job not completed after {self.max_rounds} rounds")
+
+            self.state["round"] += 1
+            requests_path = self._path(f"requests_{self.state['round']:03d}.jsonl")
+            _write_jsonl(requests_path, requests)
+
+            self.logger.info(f"--- Submitting round {self.state['round']} "
+                             f"with {len(requests)} requests ---")
+            self.state.update({"status": "submitted", "batch_id": self.backend.submit(requests_path)})
+            self._save_state()
+
+
+def get_batch_job(batch_config: Union[dict, None], llm_model) -> Optional[BatchJob]:
+    """
+    Returns the process-wide batch job matching the configuration, so that a graph
+    and its sub-graphs record their requests in the same job.
+
+    Args:
+        batch_config (Union[dict, None]): A dictionary with the key "job_dir" and the
+            optional keys "backend" ("local", "openai" or a BatchBackend instance),
+            "max_rounds", "max_concurrency" and "completion_window".
+        llm_model (BaseChatModel): The language model of the graph.
+
+    Returns:
+        Optional[BatchJob]: The batch job, or None if the batch mode is disabled.
+
+    Example:
+        >>> get_batch_job({"job_dir": "jobs/nightly", "backend": "openai"}, llm_model)
+    """
+
+    if not batch_config:
+        return None
+
+    if "job_dir" not in batch_config:
+        raise ValueError("The batch configuration requires a \"job_dir\"")
+
+    path = os.path.abspath(batch_config["job_dir"])
+
+    with _jobs_lock:
+        job = _jobs.get(path)
+        if job is None:
+            backend = batch_config.get("backend", "local")
+            if backend == "local":
+                backend = LocalBatchBackend(llm_model, batch_config.get("max_concurrency", 8))
+            elif backend == "openai":
+                backend = OpenAIBatchBackend(
+                    completion_window=batch_config.get("completion_window", "24h"))
+            elif not isinstance(backend, BatchBackend):
+                raise ValueError(f"Batch backend not supported: {backend}")
+
+            job = BatchJob(path, backend, llm_model, batch_config.get("max_rounds", 10))
+            _jobs[path] = job
+
+    return job
@@ -0,0 +1,117 @@
+"""
+Module for sharing the language model and embedder clients across graph instances
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_clients: Dict[str, Any] = {}
+_creation_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _not_serializable(value: Any) -> Any:
+    raise TypeError(f"Object of type {type(value).__name__} cannot identify a shared client")
+
+
+def make_client_key(kind: str, params: Any) -> Optional[str]:
+    """
+    Builds the registry key of a client from its parameters. The parameters, credentials
+    included, are only stored as a hash.
+
+    Args:
+        kind (str): The kind of client, e.g. "llm" or "embedder".
+        params (Any): The JSON serializable parameters of the client.
+
+    Returns:
+        Optional[str]: The key, or None if the parameters contain objects (such as a model
+        instance) that cannot identify the client.
+    """
+
+    try:
+        serialized = json.dumps(params, sort_keys=True, default=_not_serializable)
+    except (TypeError, ValueError):
+        return None
+
+    model = params.get("model", "") if isinstance(params, dict) else ""
+    digest = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    return f"{kind}:{model}:{digest}"
+
+
+def get_shared_client(kind: str, params: Any, factory: Callable[[], T]) -> T:
+    """
+    Returns the client created for the same parameters, creating it the first time.
+    The clients are shared by every graph of the process, so that their HTTP connection
+    pools are reused instead of opening new connections for every graph.
+
+    Args:
+        kind (str): The kind of client, e.g. "llm" or "embedder".
+        params (Any): The JSON serializable parameters of the client.
+        factory (Callable[[], T]): The function creating the client.
+
+    Returns:
+        T: The shared client, or a new one if the parameters cannot identify it.
+
+    Example:
+        >>> llm = get_shared_client("llm", {"model": "gpt-4o-mini"}, lambda: ChatOpenAI(...))
+    """
+
+    key = make_client_key(kind, params)
+    if key is None:
+        return factory()
+
+    with _registry_lock:
+        if key in _clients:
+            return _clients[key]
+        lock = _creation_locks.setdefault(key, threading.Lock())
+
+    # clients are created outside of the registry lock, a slow provider does not block the others
+    with lock:
+        with _registry_lock:
+            if key in _clients:
+                return _clients[key]
+
+        client = factory()
+
+        with _registry_lock:
+            _clients[key] = client
+            _creation_locks.pop(key, None)
+
+    return client
+
+
+def private_copy(client: T) -> T:
+    """
+    Returns a shallow copy of a client whose attributes (e.g. the cache or the output
+    format of a language model) can be set without affecting the original, while the
+    HTTP clients and their connection pools are still shared.
+
+    Args:
+        client (T): The client, typically a shared one.
+
+    Returns:
+        T: The copy.
+    """
+
+    clone = copy.copy(client)
+    # a shallow copy of a pydantic model shares its attribute dictionary
+    if hasattr(client, "__dict__"):
+        object.__setattr__(clone, "__dict__", dict(vars(client)))
+    fields_set = getattr(client, "__fields_set__", None)
+    if isinstance(fields_set, set):
+        object.__setattr__(clone, "__fields_set__", set(fields_set))
+    return clone
+
+
+def clear_shared_clients() -> None:
+    """
+    Removes every client from the registry, e.g. after rotating the credentials.
+    """
+
+    with _registry_lock:
+        _clients.clear()
@@ -0,0 +1,216 @@
+"""
+Module for adapting the number of concurrent graph runs to the health of the providers
+and of the scraped sites, with an additive increase / multiplicative decrease controller
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+
+from .resilience import is_retryable
+
+T = TypeVar("T")
+
+_concurrency_stats: ContextVar[Optional[Dict[str, Any]]] = ContextVar("concurrency_stats",
+                                                                     default=None)
+
+
+@contextmanager
+def concurrency_stats():
+    """
+    Context manager collecting the state of the adaptive concurrency controller used
+    within its scope, empty if the concurrency was fixed.
+
+    Example:
+        >>> with concurrency_stats() as stats:
+        ...     node.execute(state)
+        >>> stats
+        {'limit': 12.4, 'peak': 16.0, 'decreases': 1, 'errors': 2, 'p95_latency': 3.1}
+    """
+
+    stats = {}
+    token = _concurrency_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _concurrency_stats.reset(token)
+
+
+class AIMDLimiter:
+    """
+    A semaphore whose size follows the AIMD rule of TCP congestion control: the limit
+    grows by `increase` after every `limit` successful runs, while the latency and the
+    error rate are healthy, and is multiplied by `decrease` on congestion, i.e. a rate
+    limit, a timeout or a server error, or a 95th percentile latency rising above
+    `latency_factor` times the best one of the last `window` runs, measured again
+    after every decrease. The runs started before a decrease cannot cause another one,
+    so a burst of failures only cuts the limit once.
+
+    Attributes:
+        limit (float): The current number of concurrent runs allowed.
+        max_limit (int): The maximum number of concurrent runs.
+
+    Args:
+        initial (float): The initial limit.
+        min_limit (int): The minimum limit.
+        max_limit (int): The maximum limit.
+        increase (float): The increase of the limit per round of successful runs.
+        decrease (float): The factor applied to the limit on congestion.
+        latency_factor (Optional[float]): The rise of the p95 latency considered as
+            congestion, None to only react to errors.
+        window (int): The number of latencies the p95 is computed on.
+    """
+
+    def __init__(self, initial: float = 4, min_limit: int = 1, max_limit: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5,
+                 latency_factor: Optional[float] = 2.0,
+                 window: int = 20):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.peak = self.limit
+        self.decreases = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=window)
+        # the p95 latencies of the last runs, whose minimum is the healthy latency
+        self._recent_p95 = deque(maxlen=window)
+        self._last_decrease = 0.0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: Union[bool, dict, None],
+                    initial: float = 4) -> Optional["AIMDLimiter"]:
+        """
+        Creates the controller of an "adaptive_concurrency" configuration.
+
+        Args:
+            config (Union[bool, dict, None]): True for the default settings, False or None
+                for a fixed concurrency, or a dictionary like {"initial": 4, "max": 64}.
+            initial (float): The initial limit if not configured, e.g. the batchsize.
+
+        Returns:
+            Optional[AIMDLimiter]: The controller, or None for a fixed concurrency.
+        """
+
+        if not config:
+            return None
+        if config is True:
+            config = {}
+
+        config = dict(config)
+        initial = config.pop("initial", initial)
+        return cls(initial=initial,
+                   min_limit=config.pop("min", 1),
+                   max_limit=config.pop("max", max(64, int(initial))),
+                   **config)
+
+    def acquire(self) -> float:
+        """
+        Waits until a run is allowed by the current limit.
+
+        Returns:
+            float: The start time of the run, to be passed to release.
+        """
+
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(self, start: float, error: Optional[BaseException] = None) -> None:
+        """
+        Ends a run, adapting the limit to its outcome.
+
+        Args:
+            start (float): The start time returned by acquire.
+            error (Optional[BaseException]): The error of the run, None if it succeeded.
+        """
+
+        latency = time.monotonic() - start
+
+        with self._condition:
+            self._in_flight -= 1
+
+            if error is not None:
+                self.errors += 1
+                if is_retryable(error):
+                    self._decrease(start)
+            elif self._latency_rising(latency):
+                self._decrease(start)
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self.peak = max(self.peak, self.limit)
+
+            self._condition.notify_all()
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a function once the limit allows it, adapting the limit to its outcome.
+        """
+
+        start = self.acquire()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.release(start, e)
+            raise
+        self.release(start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the state of the controller, as reported in the execution info.
+        """
+
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "peak": round(self.peak, 2),
+                "decreases": self.decreases,
+                "errors": self.errors,
+                "p95_latency": self._p95(),
+            }
+
+    def report(self) -> None:
+        """
+        Writes the state of the controller in the current concurrency_stats scope.
+        """
+
+        stats = _concurrency_stats.get()
+        if stats is not None:
+            stats.update(self.stats())
+
+    def _p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def _latency_rising(self, latency: float) -> bool:
+        self._latencies.append(latency)
+        if self.latency_factor is None or len(self._latencies) < self._latencies.maxlen:
+            return False
+
+        p95 = self._p95()
+        baseline = min(self._recent_p95, default=p95)
+        self._recent_p95.append(p95)
+        return p95 > self.latency_factor * baseline
+
+    def _decrease(self, start: float) -> None:
+        # the runs started before the last decrease saw the previous limit
+        if start < self._last_decrease:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        # the latencies are measured again at the new limit
+        self._latencies.clear()
+        self._recent_p95.clear()
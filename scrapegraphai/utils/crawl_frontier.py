@@ -0,0 +1,193 @@
+"""
+Module for the URL frontier of the crawls: canonicalization, deduplication, crawl rules
+and prioritization of the links by relevance
+"""
+
+import heapq
+import re
+from typing import Any, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "_ga"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of a URL, so that the variants of the same page are
+    crawled once: the scheme and host are lowercased, the default port, the fragment
+    and the tracking parameters are removed, and the query parameters are sorted.
+    Sources that are not URLs are returned unchanged.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The canonical URL.
+
+    Example:
+        >>> canonicalize_url("HTTPS://Example.com:443/a?b=2&a=1&utm_source=x#top")
+        'https://example.com/a?a=1&b=2'
+    """
+
+    url = url.strip()
+    if not url.lower().startswith("http"):
+        return url
+
+    parsed = urlsplit(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port is not None and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+
+    path = re.sub(r"/{2,}", "/", parsed.path) or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class FrontierItem(NamedTuple):
+    """
+    A URL taken from the frontier, with its depth, its score and its position in the
+    crawl order.
+    """
+
+    url: str
+    depth: int
+    score: float
+    order: int
+
+
+class CrawlFrontier:
+    """
+    The URLs waiting to be crawled, returned by decreasing relevance score, then by
+    depth. Every URL is canonicalized and enters the frontier once, and the crawl
+    stops at `max_depth` levels from the seeds or after `max_pages` pages.
+
+    Args:
+        max_depth (int): The maximum number of links followed from a seed.
+        max_pages (int): The maximum number of pages returned.
+        same_domain (bool): Whether to only follow the links to the hosts of the seeds.
+        include_patterns (Optional[Iterable[str]]): Regular expressions, one of which the
+            followed links must match.
+        exclude_patterns (Optional[Iterable[str]]): Regular expressions the followed
+            links must not match.
+        visited_set (Optional[Any]): The set of the URLs already seen, e.g. a compact
+            FingerprintSet or ScalableBloomFilter for large crawls, a set by default.
+        visited_sample (int): The number of first visited URLs kept in `visited`, the
+            others are only counted.
+
+    Example:
+        >>> frontier = CrawlFrontier(max_depth=2, max_pages=50)
+        >>> frontier.add("https://example.com")
+        >>> while (item := frontier.pop()) is not None:
+        ...     for link, score in rank_links(prompt, collect_links(crawl(item.url), item.url)):
+        ...         frontier.add(link, item.depth + 1, score)
+    """
+
+    def __init__(self, max_depth: int = 1, max_pages: int = 20, same_domain: bool = True,
+                 include_patterns: Optional[Iterable[str]] = None,
+                 exclude_patterns: Optional[Iterable[str]] = None,
+                 visited_set: Optional[Any] = None, visited_sample: int = 1000):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.same_domain = same_domain
+        self.include_patterns = [re.compile(pattern) for pattern in include_patterns or []]
+        self.exclude_patterns = [re.compile(pattern) for pattern in exclude_patterns or []]
+        self.visited_sample = visited_sample
+        self._visited: List[str] = []
+        self._visited_count = 0
+        self._seen = visited_set if visited_set is not None else set()
+        self._domains = set()
+        self._heap = []
+        self._count = 0
+
+    def allows(self, url: str) -> bool:
+        """
+        Checks if a link can be followed according to the domain and pattern rules.
+        """
+
+        # the links of seeds that are not URLs, e.g. HTML documents, have no domain rule
+        if self.same_domain and self._domains and _domain(url) not in self._domains:
+            return False
+        if self.include_patterns and not any(p.search(url) for p in self.include_patterns):
+            return False
+        return not any(pattern.search(url) for pattern in self.exclude_patterns)
+
+    def add(self, url: str, depth: int = 0, score: float = 1.0) -> bool:
+        """
+        Adds a URL to the frontier, the URLs of depth 0 being the seeds of the crawl.
+
+        Returns:
+            bool: Whether the URL was added, False if already seen or not allowed.
+        """
+
+        if depth > self.max_depth:
+            return False
+
+        url = canonicalize_url(url)
+        if depth == 0:
+            self._register_seed(url)
+        elif not self.allows(url):
+            return False
+
+        return self._push(url, depth, score)
+
+    def pop(self) -> Optional[FrontierItem]:
+        """
+        Takes the most relevant URL of the frontier.
+
+        Returns:
+            Optional[FrontierItem]: The URL, or None if the frontier is empty or the
+            maximum number of pages is reached.
+        """
+
+        if not self._heap or self._visited_count >= self.max_pages:
+            return None
+
+        score, depth, _, url = heapq.heappop(self._heap)
+        order = self._visited_count
+        self._visited_count += 1
+        if len(self._visited) < self.visited_sample:
+            self._visited.append(url)
+        return FrontierItem(url, depth, -score, order)
+
+    @property
+    def visited(self) -> List[str]:
+        """
+        The first `visited_sample` URLs taken from the frontier, in crawl order.
+        """
+
+        return self._visited
+
+    @property
+    def visited_count(self) -> int:
+        """
+        The number of URLs taken from the frontier.
+        """
+
+        return self._visited_count
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _register_seed(self, url: str) -> None:
+        if url.startswith("http"):
+            self._domains.add(_domain(url))
+
+    def _push(self, url: str, depth: int, score: float) -> bool:
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        heapq.heappush(self._heap, (-score, depth, self._count, url))
+        self._count += 1
+        return True
+
+
+def _domain(url: str) -> str:
+    host = urlsplit(url).netloc.lower() if url.startswith("http") else ""
+    return host[4:] if host.startswith("www.") else host
@@ -0,0 +1,377 @@
+"""
+Module for persisting the state of the crawls and of the multi graphs in sqlite,
+so that an interrupted run can be resumed without scraping the completed pages again
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, List, NamedTuple, Optional, Union
+
+from .crawl_frontier import CrawlFrontier, FrontierItem
+
+DEFAULT_CRAWL_STORE_PATH = ".scrapegraphai_crawl.db"
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class StoredResult(NamedTuple):
+    """
+    The stored outcome of a source: its status, its answer and execution info once
+    done, or its error once failed.
+    """
+
+    status: str
+    answer: Any
+    exec_info: Optional[list]
+    error: Optional[str]
+
+
+class SQLiteCrawlStore:
+    """
+    The persistent state of a crawl: the pending, in-flight, completed and failed URLs
+    with the answer and the execution info of every completed one. A URL taken for
+    scraping is leased, and can be taken again once the lease expired if it was left in
+    flight by another run, e.g. after a crash; the URLs in flight in this store are not
+    taken again however long they run. A database holds a single crawl, run by a single
+    process at a time.
+
+    Attributes:
+        database_path (str): The path of the sqlite database.
+        lease (float): The number of seconds a URL stays in flight.
+
+    Args:
+        database_path (str): The path of the sqlite database.
+        lease (float): The duration of the leases in seconds.
+    """
+
+    def __init__(self, database_path: str = DEFAULT_CRAWL_STORE_PATH, lease: float = 600.0):
+        self.database_path = database_path
+        self.lease = lease
+
+        folder = os.path.dirname(os.path.abspath(database_path))
+        os.makedirs(folder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # the URLs leased by this store and not completed or failed yet
+        self._held = set()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False,
+                                           timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS crawl_urls (
+                    url TEXT PRIMARY KEY,
+                    depth INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    added INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    lease_until REAL,
+                    visit_order INTEGER,
+                    answer TEXT,
+                    exec_info TEXT,
+                    error TEXT
+                )"""
+            )
+            self._connection.execute(
+                """CREATE INDEX IF NOT EXISTS crawl_urls_priority
+                ON crawl_urls (status, score DESC, depth, added)"""
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS crawl_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            # the counters of the added and visited URLs are kept in memory, seeded once
+            self._added = self._connection.execute(
+                "SELECT COALESCE(MAX(added) + 1, 0) FROM crawl_urls"
+            ).fetchone()[0]
+            self._visits = self._connection.execute(
+                "SELECT COUNT(*) FROM crawl_urls WHERE visit_order IS NOT NULL"
+            ).fetchone()[0]
+
+    @classmethod
+    def from_config(cls, config: Union[bool, str, dict, None]) -> Optional["SQLiteCrawlStore"]:
+        """
+        Opens the store of a "crawl_store" configuration.
+
+        Args:
+            config (Union[bool, str, dict, None]): True for the default settings, the path
+                of the database, or a dictionary like {"path": "crawls/jobs.db", "lease": 600}.
+
+        Returns:
+            Optional[SQLiteCrawlStore]: The store, or None if the state is not persisted.
+        """
+
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if isinstance(config, str):
+            config = {"path": config}
+        return cls(config.get("path", DEFAULT_CRAWL_STORE_PATH), lease=config.get("lease", 600.0))
+
+    def reset(self) -> None:
+        """
+        Removes the state of the previous crawl, to start a new one.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM crawl_urls")
+            self._connection.execute("DELETE FROM crawl_meta")
+            self._added = 0
+            self._visits = 0
+            self._held.clear()
+
+    def reclaim(self) -> int:
+        """
+        Returns the in-flight and failed URLs of an interrupted crawl to the pending ones,
+        to resume it.
+
+        Returns:
+            int: The number of URLs to scrape again.
+        """
+
+        with self._lock, self._connection:
+            self._held.clear()
+            return self._connection.execute(
+                "UPDATE crawl_urls SET status = ?, lease_until = NULL WHERE status IN (?, ?)",
+                (PENDING, IN_FLIGHT, FAILED),
+            ).rowcount
+
+    def add(self, url: str, depth: int = 0, score: float = 0.0) -> bool:
+        """
+        Adds a pending URL.
+
+        Returns:
+            bool: Whether the URL was added, False if already known.
+        """
+
+        with self._lock, self._connection:
+            added = self._connection.execute(
+                """INSERT OR IGNORE INTO crawl_urls (url, depth, score, added, status)
+                VALUES (?, ?, ?, ?, ?)""",
+                (url, depth, score, self._added, PENDING),
+            ).rowcount == 1
+            if added:
+                self._added += 1
+            return added
+
+    def take(self, url: Optional[str] = None, visited_only: bool = False) -> Optional[FrontierItem]:
+        """
+        Leases a pending URL, or an in-flight one whose lease expired and that this
+        store does not hold: the given one, or the one with the highest score, then the
+        lowest depth.
+
+        Args:
+            url (Optional[str]): The URL to lease, None for the most relevant one.
+            visited_only (bool): Whether to only lease the URLs taken before, e.g. when
+                resuming a crawl that reached its maximum number of pages.
+
+        Returns:
+            Optional[FrontierItem]: The URL, or None if there is none to scrape.
+        """
+
+        now = time.time()
+        query = """SELECT url, depth, score, visit_order FROM crawl_urls
+            WHERE (status = ? OR (status = ? AND lease_until < ?))"""
+        params = [PENDING, IN_FLIGHT, now]
+        if url is not None:
+            query += " AND url = ?"
+            params.append(url)
+        if visited_only:
+            query += " AND visit_order IS NOT NULL"
+
+        with self._lock, self._connection:
+            if self._held:
+                # the pages of this run outliving their lease are still being scraped
+                query += f" AND url NOT IN ({', '.join('?' * len(self._held))})"
+                params.extend(self._held)
+            row = self._connection.execute(
+                query + " ORDER BY score DESC, depth ASC, added ASC LIMIT 1", params
+            ).fetchone()
+            if row is None:
+                return None
+
+            url, depth, score, order = row
+            first_visit = order is None
+            if first_visit:
+                order = self._visits
+            self._connection.execute(
+                "UPDATE crawl_urls SET status = ?, lease_until = ?, visit_order = ? WHERE url = ?",
+                (IN_FLIGHT, now + self.lease, order, url),
+            )
+            if first_visit:
+                self._visits += 1
+            self._held.add(url)
+
+        return FrontierItem(url, depth, score, order)
+
+    def complete(self, url: str, answer: Any, exec_info: Optional[list] = None) -> None:
+        """
+        Stores the answer and the execution info of a URL.
+        """
+
+        with self._lock, self._connection:
+            self._held.discard(url)
+            self._connection.execute(
+                """UPDATE crawl_urls SET status = ?, lease_until = NULL, answer = ?,
+                exec_info = ?, error = NULL WHERE url = ?""",
+                (DONE, json.dumps(answer, default=str), json.dumps(exec_info, default=str), url),
+            )
+
+    def fail(self, url: str, error: BaseException) -> None:
+        """
+        Stores the error of a URL.
+        """
+
+        with self._lock, self._connection:
+            self._held.discard(url)
+            self._connection.execute(
+                "UPDATE crawl_urls SET status = ?, lease_until = NULL, error = ? WHERE url = ?",
+                (FAILED, str(error), url),
+            )
+
+    def get(self, url: str) -> Optional[StoredResult]:
+        """
+        Returns the stored outcome of a URL, None if the URL is unknown.
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, answer, exec_info, error FROM crawl_urls WHERE url = ?", (url,)
+            ).fetchone()
+        return _to_result(row) if row is not None else None
+
+    def results(self, status: str = DONE) -> List[tuple]:
+        """
+        Returns the URLs of a status with their stored outcome, in visit order.
+
+        Returns:
+            List[tuple]: The (url, StoredResult) pairs.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                """SELECT url, status, answer, exec_info, error FROM crawl_urls
+                WHERE status = ? ORDER BY visit_order""", (status,)
+            ).fetchall()
+        return [(row[0], _to_result(row[1:])) for row in rows]
+
+    def visited(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Returns the URLs taken for scraping, in visit order.
+
+        Args:
+            limit (Optional[int]): The maximum number of URLs returned, None for all.
+        """
+
+        with self._lock:
+            rows = self._connection.execute(
+                """SELECT url FROM crawl_urls WHERE visit_order IS NOT NULL
+                ORDER BY visit_order LIMIT ?""", (-1 if limit is None else limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def visited_count(self) -> int:
+        """
+        Returns the number of URLs taken for scraping.
+        """
+
+        with self._lock:
+            return self._visits
+
+    def count(self, status: str = PENDING) -> int:
+        """
+        Returns the number of URLs of a status.
+        """
+
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM crawl_urls WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """
+        Returns a value stored with the crawl.
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM crawl_meta WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """
+        Stores a value with the crawl.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO crawl_meta VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+
+        with self._lock:
+            self._connection.close()
+
+
+def _to_result(row: Iterable) -> StoredResult:
+    status, answer, exec_info, error = row
+    return StoredResult(
+        status,
+        json.loads(answer) if answer is not None else None,
+        json.loads(exec_info) if exec_info is not None else None,
+        error,
+    )
+
+
+class SQLiteCrawlFrontier(CrawlFrontier):
+    """
+    A crawl frontier whose URLs are persisted in a SQLiteCrawlStore, with the same
+    rules and order as the in-memory one. A visited set, if given, is checked before
+    the database, which stays the reference for the URLs missing from the set.
+
+    Args:
+        store (SQLiteCrawlStore): The store of the crawl.
+        **kwargs: The rules of the frontier, see CrawlFrontier.
+    """
+
+    def __init__(self, store: SQLiteCrawlStore, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.store = store
+        self._domains = set(store.get_meta("domains", []))
+
+    @property
+    def visited(self) -> List[str]:
+        return self.store.visited(self.visited_sample)
+
+    @property
+    def visited_count(self) -> int:
+        return self.store.visited_count()
+
+    def pop(self) -> Optional[FrontierItem]:
+        # the URLs taken before a resume were already counted in the pages
+        return self.store.take(visited_only=self.store.visited_count() >= self.max_pages)
+
+    def __len__(self) -> int:
+        return self.store.count(PENDING)
+
+    def _register_seed(self, url: str) -> None:
+        super()._register_seed(url)
+        self.store.set_meta("domains", sorted(self._domains))
+
+    def _push(self, url: str, depth: int, score: float) -> bool:
+        # the URLs of the set are already in the database
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        return self.store.add(url, depth, score)
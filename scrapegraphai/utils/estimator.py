@@ -0,0 +1,258 @@
+"""
+Module for estimating the language model calls, tokens, cost and latency of a graph
+before running it
+"""
+
+import json
+import re
+import threading
+import time
+import warnings
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_community.callbacks.openai_info import get_openai_token_cost_for_model
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from .client_registry import private_copy
+
+ESTIMATE_MARKER = "__scrapegraphai_estimate__"
+
+_MARKER_LEVEL = re.compile(re.escape(ESTIMATE_MARKER) + r"\W+(\d+)")
+
+
+def _get_model_name(llm_model) -> str:
+    return (getattr(llm_model, "model_name", None) or getattr(llm_model, "model", None)
+            or type(llm_model).__name__)
+
+
+class CallRecorder(BaseCache):
+    """
+    A cache recording the language model calls instead of answering them. Every call
+    gets a placeholder answer holding its level, the number of calls that must complete
+    before it, so that the calls merging placeholders are placed on the next level.
+
+    Attributes:
+        calls (List[dict]): The recorded calls, with the keys "model", "prompt_tokens",
+            "completion_tokens" and "level".
+
+    Args:
+        llm_model (BaseChatModel): The language model whose calls are recorded.
+        expected_output_tokens (int): The expected number of tokens of every answer.
+    """
+
+    def __init__(self, llm_model, expected_output_tokens: int):
+        self.llm_model = llm_model
+        self.model_name = _get_model_name(llm_model)
+        self.expected_output_tokens = expected_output_tokens
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+        self._tokenizer_available = True
+
+    def count_tokens(self, messages: list) -> int:
+        """
+        Counts the tokens of the messages with the tokenizer of the model, approximating
+        them with 4 characters per token if the tokenizer is not available.
+        """
+
+        if self._tokenizer_available:
+            try:
+                return self.llm_model.get_num_tokens_from_messages(messages)
+            except Exception:
+                self._tokenizer_available = False
+
+        return sum(max(1, len(str(message.content)) // 4) for message in messages)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            messages = loads(prompt)
+
+        levels = [int(level) for level in _MARKER_LEVEL.findall(prompt)]
+        level = max(levels, default=0) + 1
+
+        # the placeholders stand for real answers of the expected size
+        prompt_tokens = self.count_tokens(messages) + len(levels) * self.expected_output_tokens
+
+        with self._lock:
+            self.calls.append({"model": self.model_name, "prompt_tokens": prompt_tokens,
+                               "completion_tokens": self.expected_output_tokens,
+                               "level": level})
+
+        content = json.dumps({ESTIMATE_MARKER: level})
+        return [ChatGeneration(message=AIMessage(content=content))]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Nothing is stored, the calls are never answered.
+        """
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self.calls = []
+
+
+def iter_graph_models(graph_instance) -> Iterator[Any]:
+    """
+    Yields the language models used by a graph and by the sub-graphs it runs.
+
+    Args:
+        graph_instance (AbstractGraph): The graph.
+
+    Yields:
+        BaseChatModel: Every distinct language model.
+    """
+
+    seen = set()
+    graphs = [graph_instance]
+
+    while graphs:
+        graph = graphs.pop()
+        models = [graph.llm_model] + [model for _, model in getattr(graph, "llm_cascade", None) or []]
+        for node in graph.graph.nodes:
+            models.append(getattr(node, "llm_model", None))
+            models.extend(model for _, model in getattr(node, "llm_cascade", None) or [])
+            sub_graph = (node.node_config or {}).get("graph_instance")
+            if sub_graph is not None:
+                graphs.append(sub_graph)
+
+        for model in models:
+            if model is not None and hasattr(model, "cache") and id(model) not in seen:
+                seen.add(id(model))
+                yield model
+
+
+def _dry_run_graph(graph_instance, models: Dict[int, Any]):
+    """
+    Clones a graph and its sub-graphs with private copies of their language models,
+    so that the recording caches are not seen by the graphs sharing the models.
+    """
+
+    def _model(model):
+        if model is None or not hasattr(model, "cache"):
+            return model
+        if id(model) not in models:
+            models[id(model)] = private_copy(model)
+        return models[id(model)]
+
+    def _cascade(cascade):
+        return cascade and [(tier, _model(model)) for tier, model in cascade]
+
+    graph = graph_instance.clone()
+    graph.llm_model = _model(getattr(graph, "llm_model", None))
+    graph.llm_cascade = _cascade(getattr(graph, "llm_cascade", None))
+
+    for node in graph.graph.nodes:
+        if hasattr(node, "llm_model"):
+            node.llm_model = _model(node.llm_model)
+        if hasattr(node, "llm_cascade"):
+            node.llm_cascade = _cascade(node.llm_cascade)
+        if isinstance(node.node_config, dict):
+            node.node_config = dict(node.node_config)
+            for key in ("llm_model", "llm_cascade", "graph_instance"):
+                value = node.node_config.get(key)
+                if value is None:
+                    continue
+                if key == "llm_model":
+                    node.node_config[key] = _model(value)
+                elif key == "llm_cascade":
+                    node.node_config[key] = _cascade(value)
+                else:
+                    node.node_config[key] = _dry_run_graph(value, models)
+
+    return graph
+
+
+def get_call_cost(model_name: str, prompt_tokens: int, completion_tokens: int,
+                  pricing: Optional[dict] = None) -> Optional[float]:
+    """
+    Computes the cost of a call in USD.
+
+    Args:
+        model_name (str): The name of the model.
+        prompt_tokens (int): The number of prompt tokens.
+        completion_tokens (int): The number of completion tokens.
+        pricing (Optional[dict]): The prices in USD per million tokens, either as
+            {"input": ..., "output": ...} or as a dictionary of them by model name.
+            The OpenAI prices are used for the models not listed.
+
+    Returns:
+        Optional[float]: The cost, or None if the price of the model is unknown.
+    """
+
+    prices = None
+    if pricing:
+        prices = pricing if "input" in pricing else pricing.get(model_name)
+
+    if prices is not None:
+        return (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1e6
+
+    try:
+        return (get_openai_token_cost_for_model(model_name, prompt_tokens)
+                + get_openai_token_cost_for_model(model_name, completion_tokens, is_completion=True))
+    except ValueError:
+        return None
+
+
+def estimate_graph(graph_instance, expected_output_tokens: int = 256,
+                   pricing: Optional[dict] = None, first_token_latency: float = 1.0,
+                   tokens_per_second: float = 50.0) -> Dict[str, Any]:
+    """
+    Estimates the language model usage of a graph with a dry run: the content is fetched
+    and parsed for real, while the prompts of the language model calls are only counted.
+
+    Calls of the same level run concurrently, so the latency is the time of the dry run
+    plus the slowest call of every level. The figures are an upper bound for the number
+    of calls, since every call that could be skipped (e.g. by an early exit or a
+    deterministic merge) is counted, and every model of a cascade is assumed to be tried.
+
+    Args:
+        graph_instance (AbstractGraph): The graph to estimate.
+        expected_output_tokens (int): The expected number of tokens of every answer.
+        pricing (Optional[dict]): The prices in USD per million tokens, see get_call_cost.
+        first_token_latency (float): The expected seconds before the first token of an answer.
+        tokens_per_second (float): The expected generation speed of the models.
+
+    Returns:
+        Dict[str, Any]: The estimate, with the keys "llm_calls", "prompt_tokens",
+        "completion_tokens", "total_tokens", "max_prompt_tokens", "cost_USD" (None if
+        the price of a model is unknown), "latency" in seconds and "calls".
+    """
+
+    # the dry run records the calls on private copies of the models, the graphs
+    # sharing them keep getting real answers meanwhile
+    dry_run = _dry_run_graph(graph_instance, {})
+
+    recorders = []
+    for model in iter_graph_models(dry_run):
+        recorder = CallRecorder(model, expected_output_tokens)
+        recorders.append(recorder)
+        model.cache = recorder
+
+    start_time = time.time()
+    dry_run.run()
+    dry_run_time = time.time() - start_time
+
+    calls = [call for recorder in recorders for call in recorder.calls]
+
+    costs = [get_call_cost(call["model"], call["prompt_tokens"], call["completion_tokens"], pricing)
+             for call in calls]
+
+    call_latency = first_token_latency + expected_output_tokens / tokens_per_second
+    levels = {call["level"] for call in calls}
+
+    prompt_tokens = sum(call["prompt_tokens"] for call in calls)
+    completion_tokens = sum(call["completion_tokens"] for call in calls)
+
+    return {
+        "llm_calls": len(calls),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "max_prompt_tokens": max((call["prompt_tokens"] for call in calls), default=0),
+        "cost_USD": None if None in costs else sum(costs),
+        "latency": dry_run_time + len(levels) * call_latency,
+        "calls": sorted(calls, key=lambda call: call["level"]),
+    }
@@ -0,0 +1,114 @@
+"""
+Module for running the same graph on many sources concurrently, with pooled instances
+that do not share their mutable state
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from ..graphs.abstract_graph import AbstractGraph
+
+
+class GraphPool:
+    """
+    A pool of isolated instances of a template graph, to run the same graph on many
+    sources concurrently. The nodes of the template are built once: every instance
+    is a clone with its own nodes and state, sharing the configuration and the model
+    clients of the template. Released instances are reset to the state of the template
+    and handed out again, so the number of instances never exceeds the number of
+    concurrent runs.
+
+    Attributes:
+        template (AbstractGraph): The graph the instances are cloned from.
+        created (int): The number of instances created so far.
+
+    Args:
+        template (AbstractGraph): The graph the instances are cloned from.
+        max_idle (Optional[int]): The maximum number of released instances kept for
+            reuse, unlimited by default.
+
+    Example:
+        >>> pool = GraphPool(SmartScraperGraph("List the prices", "https://example.com", config))
+        >>> with pool.instance() as graph:
+        ...     graph.source = "https://example.com/page"
+        ...     result = graph.run()
+    """
+
+    def __init__(self, template: "AbstractGraph", max_idle: Optional[int] = None):
+        self.template = template
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle: List["AbstractGraph"] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "AbstractGraph":
+        """
+        Returns an instance that no other run is using, reusing a released one if any.
+
+        Returns:
+            AbstractGraph: The instance, in the state of the template.
+        """
+
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+
+        return self.template.clone()
+
+    def release(self, instance: "AbstractGraph") -> None:
+        """
+        Gives an instance back to the pool once its run and its results are no longer used.
+
+        Args:
+            instance (AbstractGraph): The instance returned by acquire.
+        """
+
+        if not self._reset(instance):
+            return
+
+        with self._lock:
+            if self.max_idle is None or len(self._idle) < self.max_idle:
+                self._idle.append(instance)
+
+    @contextmanager
+    def instance(self) -> Iterator["AbstractGraph"]:
+        """
+        Context manager acquiring an instance and releasing it on exit.
+
+        Yields:
+            AbstractGraph: The instance.
+        """
+
+        graph = self.acquire()
+        try:
+            yield graph
+        finally:
+            self.release(graph)
+
+    def _reset(self, instance: "AbstractGraph") -> bool:
+        """
+        Restores the attributes of an instance and of its nodes to the ones of the template.
+
+        Returns:
+            bool: False if the topology of the template changed, the instance is then dropped.
+        """
+
+        graph = instance.graph
+        template_nodes = self.template.graph.nodes
+        if len(graph.nodes) != len(template_nodes):
+            return False
+
+        for node, template_node in zip(graph.nodes, template_nodes):
+            vars(node).clear()
+            vars(node).update(vars(template_node))
+        graph.initial_state = {}
+
+        vars(instance).clear()
+        vars(instance).update(vars(self.template))
+        instance.graph = graph
+        instance.final_state = None
+        instance.execution_info = None
+        return True
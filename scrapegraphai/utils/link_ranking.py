@@ -0,0 +1,242 @@
+"""
+Module for ranking the links of a page by their relevance to the user prompt, from
+their anchor text, the tokens of their URL and the text around them, with BM25 or
+with cached embeddings
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from .crawl_frontier import canonicalize_url
+
+HTML_LINK_PATTERN = re.compile(r"<a\s[^>]*?href=[\"']([^\"']+)[\"'][^>]*>(.*?)</a>",
+                               flags=re.IGNORECASE | re.DOTALL)
+MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\(([^)\s]+)")
+BARE_LINK_PATTERN = re.compile(r"(?<![\"'(])https?://[^\s\"'<>\])]+")
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# the context of a link stops at the blocks around it, and excludes the other links
+_BLOCK_PATTERN = re.compile(
+    r"\n\s*\n|</?(?:p|div|li|ul|ol|tr|td|th|h[1-6]|nav|section|article|header|footer|br)\b[^>]*>",
+    flags=re.IGNORECASE)
+_OTHER_LINKS_PATTERN = re.compile(
+    "|".join(pattern.pattern for pattern in (HTML_LINK_PATTERN, MARKDOWN_LINK_PATTERN,
+                                             BARE_LINK_PATTERN)),
+    flags=re.IGNORECASE | re.DOTALL)
+
+
+class LinkCandidate(NamedTuple):
+    """
+    A link of a page with the texts describing it.
+    """
+
+    url: str
+    anchor_text: str
+    context: str
+
+    def describe(self) -> str:
+        """
+        Returns the text the link is ranked on: its anchor text, the tokens of its URL
+        path and query, and the text around it, the anchor text weighing three times
+        and the URL twice as much as the context.
+        """
+
+        parsed = urlsplit(self.url)
+        url_tokens = re.sub(r"[^0-9A-Za-z]+", " ", unquote(f"{parsed.path} {parsed.query}"))
+        return " ".join([self.anchor_text] * 3 + [url_tokens] * 2 + [self.context])
+
+
+def _clean(text: str) -> str:
+    return " ".join(_TAG_PATTERN.sub(" ", text).split())
+
+
+def _context(before: str, after: str) -> str:
+    before = _BLOCK_PATTERN.split(before)[-1]
+    after = _BLOCK_PATTERN.split(after)[0]
+    return _clean(_OTHER_LINKS_PATTERN.sub(" ", f"{before} {after}"))
+
+
+def collect_links(content: str, base_url: str = "", context_chars: int = 100) -> List[LinkCandidate]:
+    """
+    Collects the HTTP links of a page, in HTML or Markdown, deduplicated on their
+    canonical form, with their anchor text and the text around them.
+
+    Args:
+        content (str): The content of the page.
+        base_url (str): The URL of the page, to resolve the relative links.
+        context_chars (int): The maximum number of characters kept on each side of a link,
+            within the block of the link.
+
+    Returns:
+        List[LinkCandidate]: The links in the order they first appear.
+    """
+
+    links: Dict[str, List[str]] = {}
+    urls: Dict[str, str] = {}
+
+    matches = [(match, 1, 2) for match in HTML_LINK_PATTERN.finditer(content)]
+    matches += [(match, 2, 1) for match in MARKDOWN_LINK_PATTERN.finditer(content)]
+    matches += [(match, 0, None) for match in BARE_LINK_PATTERN.finditer(content)]
+    matches.sort(key=lambda match: match[0].start())
+
+    for match, href_group, text_group in matches:
+        href = match.group(href_group).strip()
+        url = urljoin(base_url, href) if base_url.startswith("http") else href
+        if not url.startswith("http"):
+            continue
+
+        key = canonicalize_url(url)
+        urls.setdefault(key, url)
+        anchors, contexts = links.setdefault(key, ["", ""])
+        if text_group is not None:
+            anchors = f"{anchors} {_clean(match.group(text_group))}"
+        context = _context(content[max(0, match.start() - context_chars):match.start()],
+                           content[match.end():match.end() + context_chars])
+        links[key] = [anchors.strip(), f"{contexts} {context}".strip()]
+
+    return [LinkCandidate(urls[key], anchor_text, context)
+            for key, (anchor_text, context) in links.items()]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a text in lowercase terms of at least 2 characters.
+    """
+
+    return re.findall(r"[^\W_]{2,}", text.lower())
+
+
+def bm25_scores(query: str, documents: Sequence[str],
+                k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """
+    Scores documents against a query with Okapi BM25, the document frequencies being
+    computed on the given documents.
+
+    Args:
+        query (str): The query.
+        documents (Sequence[str]): The documents.
+        k1 (float): The term frequency saturation.
+        b (float): The document length normalization.
+
+    Returns:
+        List[float]: The score of every document.
+    """
+
+    tokenized = [tokenize(document) for document in documents]
+    terms = set(tokenize(query))
+    if not tokenized or not terms:
+        return [0.0] * len(documents)
+
+    average_length = sum(len(tokens) for tokens in tokenized) / len(tokenized) or 1.0
+    frequencies = Counter(term for tokens in tokenized for term in set(tokens) if term in terms)
+    idf = {term: math.log(1 + (len(tokenized) - count + 0.5) / (count + 0.5))
+           for term, count in frequencies.items()}
+
+    scores = []
+    for tokens in tokenized:
+        counts = Counter(tokens)
+        norm = k1 * (1 - b + b * len(tokens) / average_length)
+        scores.append(sum(
+            weight * counts[term] * (k1 + 1) / (counts[term] + norm)
+            for term, weight in idf.items() if counts[term]
+        ))
+    return scores
+
+
+class EmbeddingCache:
+    """
+    A bounded in-memory cache of the embeddings of texts, keyed by embedding model,
+    so that the links and prompts seen on several pages are embedded once.
+
+    Args:
+        max_entries (int): The maximum number of embeddings, the least recently used
+            ones are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, embedder: Any, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Returns the embeddings of the texts, computing the missing ones in one call.
+        """
+
+        model = f"{type(embedder).__name__}:{getattr(embedder, 'model', '')}"
+        with self._lock:
+            missing = [text for text in dict.fromkeys(texts) if (model, text) not in self._entries]
+
+        if missing:
+            embeddings = embedder.embed_documents(missing)
+            with self._lock:
+                for text, embedding in zip(missing, embeddings):
+                    self._entries[(model, text)] = embedding
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        with self._lock:
+            result = []
+            for text in texts:
+                key = (model, text)
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                result.append(embedding)
+
+        # the embeddings evicted meanwhile by a concurrent call are computed again
+        return [embedding if embedding is not None else embedder.embed_documents([text])[0]
+                for text, embedding in zip(texts, result)]
+
+
+_embedding_cache = EmbeddingCache()
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+
+def rank_links(prompt: str, links: Sequence[LinkCandidate], top_k: Optional[int] = None,
+               threshold: float = 0.0, embedder: Any = None,
+               raw_scores: bool = False) -> List[Tuple[str, float]]:
+    """
+    Ranks links by relevance to the prompt, with BM25 or, given an embedding model,
+    with the cosine similarity of the cached embeddings. The BM25 scores are divided
+    by the best one, so that the scores of both methods are between 0 and 1.
+
+    Args:
+        prompt (str): The user prompt.
+        links (Sequence[LinkCandidate]): The links to rank.
+        top_k (Optional[int]): The maximum number of links returned, None for all.
+        threshold (float): The minimum score of the links returned.
+        embedder (Any): The embedding model, None to use BM25.
+        raw_scores (bool): Whether the selected links are returned with their BM25 score
+            undivided, to compare them with the links of other pages.
+
+    Returns:
+        List[Tuple[str, float]]: The URLs with their score, the most relevant first.
+        Links with equal scores keep their order, e.g. all of them for an empty prompt.
+    """
+
+    documents = [link.describe() for link in links]
+
+    if embedder is not None and prompt.strip() and documents:
+        prompt_embedding, *embeddings = _embedding_cache.embed(embedder, [prompt, *documents])
+        scores = [max(0.0, _cosine(prompt_embedding, embedding)) for embedding in embeddings]
+        returned = scores
+    else:
+        returned = bm25_scores(prompt, documents)
+        best = max(returned, default=0.0)
+        scores = [score / best for score in returned] if best > 0 else returned
+        if not raw_scores:
+            returned = scores
+
+    ranked = sorted(zip(links, scores, returned), key=lambda link: -link[1])
+    ranked = [(link.url, score) for link, normalized, score in ranked if normalized >= threshold]
+    return ranked[:top_k] if top_k is not None else ranked
@@ -0,0 +1,250 @@
+"""
+Module for caching the responses of the language models across graph runs
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Union
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+DEFAULT_CACHE_PATH = ".scrapegraphai_llm_cache.db"
+
+_cache_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_cache_stats", default=None)
+
+_caches: Dict[str, "SQLiteLLMCache"] = {}
+_caches_lock = threading.Lock()
+_stats_lock = threading.Lock()
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _record(event: str) -> None:
+    stats = _cache_stats.get()
+    if stats is not None:
+        with _stats_lock:
+            stats[event] += 1
+
+
+@contextmanager
+def llm_cache_stats():
+    """
+    Context manager collecting the cache hits and misses of the language model
+    calls made within its scope, including the ones made by worker threads
+    that inherit the context. Nested scopes add their counts to the outer one on exit.
+
+    Example:
+        >>> with llm_cache_stats() as stats:
+        ...     chain.invoke({"question": "..."})
+        >>> stats
+        {'cache_hits': 1, 'cache_misses': 0}
+    """
+
+    parent = _cache_stats.get()
+    stats = {"cache_hits": 0, "cache_misses": 0}
+    token = _cache_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _cache_stats.reset(token)
+        if parent is not None:
+            with _stats_lock:
+                for event, count in stats.items():
+                    parent[event] += count
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    A persistent LLM response cache backed by sqlite. Entries are keyed by the hash
+    of the model configuration (model id and generation parameters) and the hash of
+    the fully rendered prompt.
+
+    Attributes:
+        database_path (str): The path of the sqlite database.
+        ttl (Optional[float]): The number of seconds after which an entry expires.
+        max_entries (Optional[int]): The maximum number of entries, the least recently
+            used ones are evicted first.
+        hits (int): The total number of cache hits.
+        misses (int): The total number of cache misses.
+
+    Args:
+        database_path (str): The path of the sqlite database.
+        ttl (Optional[float]): The time to live of the entries in seconds, None to never expire.
+        max_entries (Optional[int]): The maximum number of entries, None for no limit.
+    """
+
+    def __init__(self, database_path: str = DEFAULT_CACHE_PATH,
+                 ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.database_path = database_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        folder = os.path.dirname(os.path.abspath(database_path))
+        os.makedirs(folder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False,
+                                           timeout=30)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    llm_hash TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (llm_hash, prompt_hash)
+                )"""
+            )
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """
+        Looks up the cached response for a prompt and a model configuration.
+
+        Args:
+            prompt (str): The serialized prompt.
+            llm_string (str): The serialized model configuration.
+
+        Returns:
+            Optional[RETURN_VAL_TYPE]: The cached generations, or None on a miss.
+        """
+
+        key = (_hash(llm_string), _hash(prompt))
+        now = time.time()
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM llm_cache WHERE llm_hash = ? AND prompt_hash = ?",
+                key,
+            ).fetchone()
+
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._connection.execute(
+                    "DELETE FROM llm_cache WHERE llm_hash = ? AND prompt_hash = ?", key
+                )
+                row = None
+
+            if row is None:
+                self.misses += 1
+                _record("cache_misses")
+                return None
+
+            self._connection.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE llm_hash = ? AND prompt_hash = ?",
+                (now, *key),
+            )
+
+        self.hits += 1
+        _record("cache_hits")
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            generations = [loads(generation) for generation in json.loads(row[0])]
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            if message is not None:
+                # cached responses are free, do not report their usage again
+                if hasattr(message, "usage_metadata"):
+                    message.usage_metadata = None
+                message.response_metadata = {**message.response_metadata, "llm_cache_hit": True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """
+        Stores the response for a prompt and a model configuration, evicting
+        expired and least recently used entries if needed.
+
+        Args:
+            prompt (str): The serialized prompt.
+            llm_string (str): The serialized model configuration.
+            return_val (RETURN_VAL_TYPE): The generations to cache.
+        """
+
+        now = time.time()
+        response = json.dumps([dumps(generation) for generation in return_val])
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (_hash(llm_string), _hash(prompt), response, now, now),
+            )
+
+            if self.ttl is not None:
+                self._connection.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,)
+                )
+
+            if self.max_entries is not None:
+                self._connection.execute(
+                    """DELETE FROM llm_cache WHERE rowid IN (
+                        SELECT rowid FROM llm_cache ORDER BY accessed_at ASC
+                        LIMIT max(0, (SELECT COUNT(*) FROM llm_cache) - ?)
+                    )""",
+                    (self.max_entries,),
+                )
+
+    def clear(self, **kwargs: Any) -> None:
+        """
+        Removes every entry from the cache.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def size(self) -> int:
+        """
+        Returns the number of entries stored in the cache.
+        """
+
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def get_llm_cache(cache_config: Union[bool, dict, None]) -> Optional[SQLiteLLMCache]:
+    """
+    Returns the process-wide cache matching the configuration, so that every graph
+    using the same database shares a single connection.
+
+    Args:
+        cache_config (Union[bool, dict, None]): True to use the default settings, or a
+            dictionary with the optional keys "path", "ttl" and "max_entries".
+
+    Returns:
+        Optional[SQLiteLLMCache]: The cache, or None if caching is disabled.
+
+    Example:
+        >>> get_llm_cache({"path": "cache/llm.db", "ttl": 86400, "max_entries": 10000})
+    """
+
+    if not cache_config:
+        return None
+
+    if cache_config is True:
+        cache_config = {}
+
+    path = os.path.abspath(cache_config.get("path", DEFAULT_CACHE_PATH))
+
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = SQLiteLLMCache(path, ttl=cache_config.get("ttl"),
+                                   max_entries=cache_config.get("max_entries"))
+            _caches[path] = cache
+        else:
+            cache.ttl = cache_config.get("ttl", cache.ttl)
+            cache.max_entries = cache_config.get("max_entries", cache.max_entries)
+
+    return cache
@@ -0,0 +1,106 @@
+"""
+Module for answering with a cascade of language models, from the cheapest to the
+most capable, escalating only when the answer of a model cannot be used
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from .logging import get_logger
+
+_cascade_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("cascade_stats", default=None)
+_stats_lock = threading.Lock()
+
+
+@contextmanager
+def cascade_stats():
+    """
+    Context manager counting, for every tier of the cascade, the number of answers
+    it produced within its scope, including the ones of worker threads that inherit
+    the context. Nested scopes add their counts to the outer one on exit.
+
+    Example:
+        >>> with cascade_stats() as stats:
+        ...     chain.invoke({"question": "..."})
+        >>> stats
+        {'llama3': 3, 'gpt-4o': 1}
+    """
+
+    parent = _cascade_stats.get()
+    stats = {}
+    token = _cascade_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _cascade_stats.reset(token)
+        if parent is not None:
+            with _stats_lock:
+                for name, answers in stats.items():
+                    parent[name] = parent.get(name, 0) + answers
+
+
+def get_tier_name(llm_config: Any, index: int) -> str:
+    """
+    Returns the name identifying a tier of the cascade in the execution info.
+
+    Args:
+        llm_config (Any): The model name or the configuration of the tier.
+        index (int): The position of the tier in the cascade.
+
+    Returns:
+        str: The model name, or "tier<index>" for model instances.
+    """
+
+    if isinstance(llm_config, str):
+        return llm_config
+    if isinstance(llm_config, dict) and "model" in llm_config:
+        return llm_config["model"]
+    return f"tier{index}"
+
+
+class CascadeRunnable(Runnable):
+    """
+    A runnable trying the tiers of a cascade in order, escalating to the next one
+    when the output cannot be parsed or is rejected by the validator. The last tier
+    always answers.
+
+    Args:
+        tiers (List[Tuple[str, Runnable]]): The name and the chain (model and output
+            parser) of every tier, from the cheapest to the most capable.
+        validator (Optional[Callable[[Any], bool]]): Function checking if a parsed
+            output is good enough to stop the cascade.
+    """
+
+    def __init__(self, tiers: List[Tuple[str, Runnable]],
+                 validator: Optional[Callable[[Any], bool]] = None):
+        if not tiers:
+            raise ValueError("The cascade needs at least one model")
+        self.tiers = tiers
+        self.validator = validator
+        self.logger = get_logger()
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        last = len(self.tiers) - 1
+
+        for index, (name, chain) in enumerate(self.tiers):
+            try:
+                output = chain.invoke(input, config, **kwargs)
+            except OutputParserException:
+                if index == last:
+                    raise
+                self.logger.info(f"--- ({name} answer could not be parsed, escalating) ---")
+                continue
+
+            if index == last or self.validator is None or self.validator(output):
+                stats = _cascade_stats.get()
+                if stats is not None:
+                    with _stats_lock:
+                        stats[name] = stats.get(name, 0) + 1
+                return output
+
+            self.logger.info(f"--- ({name} answer does not fill the schema, escalating) ---")
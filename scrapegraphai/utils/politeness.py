@@ -0,0 +1,301 @@
+"""
+Module for scheduling the sources of the multi graphs politely, limiting the concurrent
+requests and their rate per host and interleaving the hosts
+"""
+
+import asyncio
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from .logging import get_logger
+
+
+def get_host(url: str) -> str:
+    """
+    Returns the host of a URL, or an empty string for the sources that are not URLs
+    (e.g. HTML documents or local files).
+    """
+
+    if not url.startswith("http"):
+        return ""
+    return urlparse(url).netloc.lower()
+
+
+def get_crawl_delay(url: str, user_agent: str = "*", timeout: float = 10.0) -> Optional[float]:
+    """
+    Reads the Crawl-delay set for a user agent by the robots.txt file of the site of a URL.
+
+    Args:
+        url (str): A URL of the site.
+        user_agent (str): The user agent the delay applies to.
+        timeout (float): The timeout of the robots.txt request in seconds.
+
+    Returns:
+        Optional[float]: The delay in seconds, None if not set or if the robots.txt file
+        cannot be read.
+    """
+
+    parsed_url = urlparse(url)
+    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+
+    try:
+        with urllib.request.urlopen(robots_url, timeout=timeout) as response:
+            lines = response.read().decode("utf-8", errors="ignore").splitlines()
+    except Exception as e:
+        get_logger().debug(f"robots.txt of {parsed_url.netloc} not read: {e}")
+        return None
+
+    parser = RobotFileParser()
+    parser.parse(lines)
+    delay = parser.crawl_delay(user_agent)
+    return float(delay) if delay is not None else None
+
+
+class _HostState:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active = 0
+        self.next_start = 0.0
+
+
+class HostSlot:
+    """
+    One of the concurrent requests allowed on a host, held from its acquisition until
+    released. Releasing it more than once has no effect.
+
+    Attributes:
+        host (str): The host of the slot.
+    """
+
+    def __init__(self, scheduler: "HostScheduler", host: str, state: _HostState):
+        self.host = host
+        self._scheduler = scheduler
+        self._state = state
+        self.released = False
+
+    def release(self) -> None:
+        """
+        Gives the slot back to its host.
+        """
+
+        with self._scheduler._condition:
+            if self.released:
+                return
+            self.released = True
+            self._state.active -= 1
+            self._scheduler._condition.notify_all()
+
+
+# the scheduler of the graph run, with the slot taken for its fetch if any
+_fetch_scheduler: ContextVar[Optional[Tuple["HostScheduler", Optional[HostSlot]]]] = \
+    ContextVar("fetch_scheduler", default=None)
+
+
+class HostScheduler:
+    """
+    A scheduler of the requests of concurrent graph runs: the sources are interleaved
+    round-robin across their hosts, and every host gets at most `max_per_host` concurrent
+    fetches, started at least `min_interval` seconds apart. With `respect_robots`, the
+    interval of a host is raised to the Crawl-delay of its robots.txt file. The slots
+    only cover the fetches, see fetch_scope, not the processing of the pages.
+
+    Args:
+        max_per_host (int): The maximum number of concurrent fetches per host.
+        min_interval (float): The minimum number of seconds between two fetches on a host.
+        respect_robots (bool): Whether to read the Crawl-delay of the robots.txt files.
+        user_agent (str): The user agent the Crawl-delay is read for.
+
+    Example:
+        >>> scheduler = HostScheduler(max_per_host=2, min_interval=1.0)
+        >>> for index in scheduler.order(urls):
+        ...     with scheduler.slot(urls[index]):
+        ...         fetch(urls[index])
+    """
+
+    def __init__(self, max_per_host: int = 2, min_interval: float = 0.0,
+                 respect_robots: bool = False, user_agent: str = "*"):
+        self.max_per_host = max(1, max_per_host)
+        self.min_interval = min_interval
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self._hosts: Dict[str, _HostState] = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: Union[bool, dict, None]) -> Optional["HostScheduler"]:
+        """
+        Creates the scheduler of a "politeness" configuration.
+
+        Args:
+            config (Union[bool, dict, None]): True for the default settings, False or None
+                to run the sources in their order without limits, or a dictionary like
+                {"max_per_host": 2, "min_interval": 1.0, "respect_robots": True}.
+
+        Returns:
+            Optional[HostScheduler]: The scheduler, or None without politeness.
+        """
+
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        return cls(**config)
+
+    def order(self, urls: List[str]) -> List[int]:
+        """
+        Returns the indexes of the sources interleaved round-robin across their hosts,
+        in the order the hosts first appear.
+        """
+
+        queues: Dict[str, List[int]] = {}
+        for index, url in enumerate(urls):
+            queues.setdefault(get_host(url), []).append(index)
+
+        order = []
+        iterators = [iter(queue) for queue in queues.values()]
+        while iterators:
+            remaining = []
+            for iterator in iterators:
+                index = next(iterator, None)
+                if index is not None:
+                    order.append(index)
+                    remaining.append(iterator)
+            iterators = remaining
+        return order
+
+    def _try_acquire(self, host: str, state: _HostState) -> Tuple[Optional[HostSlot], Optional[float]]:
+        # a slot, or the number of seconds to wait, None until another slot is released
+        wait = state.next_start - time.monotonic()
+        if state.active >= self.max_per_host:
+            return None, None
+        if wait > 0:
+            return None, wait
+        state.active += 1
+        state.next_start = time.monotonic() + state.interval
+        return HostSlot(self, host, state), None
+
+    def acquire(self, url: str) -> Optional[HostSlot]:
+        """
+        Waits until the host of a URL allows a new fetch and takes one of its slots.
+
+        Returns:
+            Optional[HostSlot]: The slot to release, None for the sources that are not URLs.
+        """
+
+        host = get_host(url)
+        if not host:
+            return None
+
+        state = self._get_state(host, url)
+        with self._condition:
+            while True:
+                slot, wait = self._try_acquire(host, state)
+                if slot is not None:
+                    return slot
+                self._condition.wait(timeout=wait)
+
+    async def aacquire(self, url: str, poll_interval: float = 0.05) -> Optional[HostSlot]:
+        """
+        Asynchronous version of acquire, waiting without blocking a thread.
+        """
+
+        host = get_host(url)
+        if not host:
+            return None
+
+        state = await asyncio.to_thread(self._get_state, host, url)
+        while True:
+            with self._condition:
+                slot, wait = self._try_acquire(host, state)
+            if slot is not None:
+                return slot
+            await asyncio.sleep(poll_interval if wait is None else wait)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """
+        Context manager waiting until the host of a URL allows a new fetch, holding one
+        of its slots until exited. Sources that are not URLs are not limited.
+        """
+
+        slot = self.acquire(url)
+        try:
+            yield
+        finally:
+            if slot is not None:
+                slot.release()
+
+    def _get_state(self, host: str, url: str) -> _HostState:
+        with self._condition:
+            state = self._hosts.get(host)
+        if state is not None:
+            return state
+
+        # the robots.txt file is read outside of the lock, not to block the other hosts
+        interval = self.min_interval
+        if self.respect_robots:
+            interval = max(interval, get_crawl_delay(url, self.user_agent) or 0.0)
+
+        with self._condition:
+            return self._hosts.setdefault(host, _HostState(interval))
+
+
+@contextmanager
+def fetch_scope(scheduler: Optional[HostScheduler],
+                slot: Optional[HostSlot] = None) -> Iterator[None]:
+    """
+    Context manager setting the scheduler the fetches of a graph run wait for, see
+    fetch_slot. A slot taken beforehand is used by the first fetch on its host, and
+    released on exit if the run did not fetch.
+
+    Args:
+        scheduler (Optional[HostScheduler]): The scheduler, None without politeness.
+        slot (Optional[HostSlot]): The slot already taken for the source of the run.
+    """
+
+    if scheduler is None:
+        yield
+        return
+
+    token = _fetch_scheduler.set((scheduler, slot))
+    try:
+        yield
+    finally:
+        _fetch_scheduler.reset(token)
+        if slot is not None:
+            slot.release()
+
+
+@contextmanager
+def fetch_slot(url: str) -> Iterator[None]:
+    """
+    Context manager holding a slot of the host of a URL during a fetch, when the graph
+    runs within a fetch_scope. Meant to wrap the network requests only, so that the
+    processing of the pages does not hold the host.
+
+    Example:
+        >>> with fetch_slot(url):
+        ...     response = requests.get(url)
+    """
+
+    scope = _fetch_scheduler.get()
+    if scope is None:
+        yield
+        return
+
+    scheduler, slot = scope
+    if slot is None or slot.released or slot.host != get_host(url):
+        with scheduler.slot(url):
+            yield
+        return
+
+    try:
+        yield
+    finally:
+        slot.release()
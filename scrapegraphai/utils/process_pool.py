@@ -0,0 +1,104 @@
+"""
+Module for running the CPU-bound steps of the nodes (HTML conversion, chunking, PDF text
+extraction) in a pool of processes, so that concurrent graphs are not serialized by the GIL
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, TypeVar, Union
+
+T = TypeVar("T")
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_max_workers(pool_config: Union[bool, int, dict]) -> int:
+    """
+    Returns the number of worker processes of a "process_pool" configuration.
+
+    Args:
+        pool_config (Union[bool, int, dict]): True, the number of workers, or a dictionary
+            like {"max_workers": 8}. The number of CPUs is used by default.
+
+    Returns:
+        int: The number of worker processes.
+    """
+
+    if isinstance(pool_config, dict):
+        pool_config = pool_config.get("max_workers", True)
+    if pool_config is True:
+        return os.cpu_count() or 1
+    return max(1, int(pool_config))
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the process pool of the given size shared by every graph of the process,
+    creating it the first time. The workers are spawned, not forked, since forking a
+    process running threads is not safe.
+
+    Args:
+        max_workers (int): The number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+
+    with _lock:
+        if max_workers not in _pools:
+            _pools[max_workers] = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[max_workers]
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """
+    Stops the worker processes of the shared pools, new pools are created when needed.
+    """
+
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_process_pool)
+
+
+def run_in_process_pool(pool_config: Union[bool, int, dict, None],
+                        fn: Callable[..., T], *args: Any) -> T:
+    """
+    Runs a function in the shared process pool, or in the calling thread when the pool
+    is disabled. The function and its arguments are pickled, so the function must be
+    defined at the top level of a module.
+
+    Args:
+        pool_config (Union[bool, int, dict, None]): The "process_pool" configuration,
+            False or None to run the function in the calling thread.
+        fn (Callable[..., T]): The function to run.
+        *args (Any): The arguments of the function.
+
+    Returns:
+        T: The result of the function.
+
+    Example:
+        >>> run_in_process_pool({"max_workers": 8}, convert_to_md, html, url)
+    """
+
+    if not pool_config:
+        return fn(*args)
+
+    pool = get_process_pool(get_max_workers(pool_config))
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # a worker died (e.g. killed for its memory usage), the next call starts a new pool
+        shutdown_process_pool(wait=False)
+        raise
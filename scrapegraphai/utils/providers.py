@@ -0,0 +1,87 @@
+"""
+Module resolving the classes of the model providers lazily, so that importing
+scrapegraphai only imports the provider SDKs actually configured
+"""
+
+import importlib
+import sys
+import threading
+from typing import Any, Dict
+
+PROVIDER_CLASSES: Dict[str, str] = {
+    "ChatOpenAI": "langchain_openai:ChatOpenAI",
+    "AzureChatOpenAI": "langchain_openai:AzureChatOpenAI",
+    "OpenAIEmbeddings": "langchain_openai:OpenAIEmbeddings",
+    "AzureOpenAIEmbeddings": "langchain_openai:AzureOpenAIEmbeddings",
+    "ChatOllama": "langchain_community.chat_models.ollama:ChatOllama",
+    "OllamaEmbeddings": "langchain_community.embeddings.ollama:OllamaEmbeddings",
+    "ErnieBotChat": "langchain_community.chat_models.ernie:ErnieBotChat",
+    "ChatBedrock": "langchain_aws:ChatBedrock",
+    "BedrockEmbeddings": "langchain_aws:BedrockEmbeddings",
+    "ChatHuggingFace": "langchain_huggingface:ChatHuggingFace",
+    "HuggingFaceEmbeddings": "langchain_huggingface:HuggingFaceEmbeddings",
+    "ChatGoogleGenerativeAI": "langchain_google_genai:ChatGoogleGenerativeAI",
+    "GoogleGenerativeAIEmbeddings": "langchain_google_genai:GoogleGenerativeAIEmbeddings",
+    "ChatVertexAI": "langchain_google_vertexai:ChatVertexAI",
+    "VertexAIEmbeddings": "langchain_google_vertexai:VertexAIEmbeddings",
+    "ChatFireworks": "langchain_fireworks:ChatFireworks",
+    "FireworksEmbeddings": "langchain_fireworks:FireworksEmbeddings",
+    "ChatNVIDIA": "langchain_nvidia_ai_endpoints:ChatNVIDIA",
+    "NVIDIAEmbeddings": "langchain_nvidia_ai_endpoints:NVIDIAEmbeddings",
+    "DeepSeek": "scrapegraphai.models.deepseek:DeepSeek",
+    "OneApi": "scrapegraphai.models.oneapi:OneApi",
+    "OpenAIImageToText": "scrapegraphai.models.openai_itt:OpenAIImageToText",
+    "OpenAITextToSpeech": "scrapegraphai.models.openai_tts:OpenAITextToSpeech",
+}
+
+_resolved: Dict[str, type] = {}
+_lock = threading.Lock()
+
+
+def get_provider_class(name: str) -> type:
+    """
+    Returns a provider class, importing its module the first time it is needed.
+
+    Args:
+        name (str): The name of the class in PROVIDER_CLASSES, e.g. "ChatOpenAI".
+
+    Returns:
+        type: The provider class.
+
+    Raises:
+        KeyError: If the class is not registered.
+        ImportError: If the package of the provider is not installed.
+    """
+
+    if name in _resolved:
+        return _resolved[name]
+
+    module_name, class_name = PROVIDER_CLASSES[name].split(":")
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as exc:
+        raise ImportError(f"The {name} provider needs the {module_name.split('.')[0]} "
+                          "package, install it to use this model") from exc
+
+    with _lock:
+        _resolved[name] = getattr(module, class_name)
+    return _resolved[name]
+
+
+def is_provider_instance(obj: Any, name: str) -> bool:
+    """
+    Checks if an object is an instance of a provider class, without importing the
+    provider: an object cannot be an instance of a class whose module was never imported.
+
+    Args:
+        obj (Any): The object to check, usually a model instance.
+        name (str): The name of the class in PROVIDER_CLASSES, e.g. "ChatOllama".
+
+    Returns:
+        bool: True if the object is an instance of the class or of a subclass.
+    """
+
+    module_name = PROVIDER_CLASSES[name].split(":")[0]
+    if module_name not in sys.modules:
+        return False
+    return isinstance(obj, get_provider_class(name))
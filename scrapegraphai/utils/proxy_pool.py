@@ -0,0 +1,396 @@
+"""
+Module for a pool of free proxy servers validated in the background, every request
+getting the healthiest proxy and the failing ones being evicted
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fp.errors import FreeProxyException
+from fp.fp import FreeProxy
+
+from .logging import get_logger
+from .proxy_rotation import Proxy, ProxyBrokerCriteria, ProxySettings, check_proxy_server
+
+logger = get_logger("proxy-pool")
+
+
+def list_proxy_candidates(criteria: ProxyBrokerCriteria) -> List[str]:
+    """lists the free proxy servers matching the broker criteria, unchecked
+
+    Args:
+        criteria: The broker criteria.
+
+    Returns:
+        The proxy server URLs, shuffled.
+    """
+    proxybroker = FreeProxy(
+        anonym=criteria.get("anonymous", True),
+        country_id=criteria.get("countryset"),
+        elite=True,
+        https=criteria.get("secure", False),
+        timeout=criteria.get("timeout", 5.0),
+    )
+
+    addresses = []
+    try:
+        addresses = proxybroker.get_proxy_list(False)
+    except FreeProxyException as e:
+        logger.warning(f"proxy list not fetched: {e}")
+
+    if criteria.get("search_outside_if_empty", True):
+        proxybroker.country_id = None
+        try:
+            addresses += proxybroker.get_proxy_list(True)
+        except FreeProxyException as e:
+            logger.warning(f"proxy list not fetched: {e}")
+
+    candidates = list(dict.fromkeys(f"http://{address}" for address in addresses))
+    random.shuffle(candidates)
+    return candidates
+
+
+class ProxyHealth:
+    """
+    The health of a proxy server: its success rate, its latency on the health checks
+    and its latency on the requests, as exponential moving averages, and its number
+    of consecutive failures. The two latencies are kept apart, a health check being
+    much shorter than a page fetch.
+    """
+
+    def __init__(self, server: str, latency: float):
+        self.server = server
+        self.check_latency = latency
+        self.fetch_latency: Optional[float] = None
+        self.success = 1.0
+        self.failures = 0
+        self.in_use = 0
+
+    def score(self, check_reference: float = 1.0,
+              fetch_reference: Optional[float] = None) -> float:
+        """
+        The preference for the proxy, the successful and fast ones first, the load being
+        spread over the proxies of similar health. Each latency is divided by the mean
+        one of the pool for its kind of traffic before they are averaged.
+
+        Args:
+            check_reference (float): The mean health check latency of the pool.
+            fetch_reference (Optional[float]): The mean request latency of the pool,
+                None if no request was measured.
+        """
+
+        latencies = [self.check_latency / max(check_reference, 1e-6)]
+        if self.fetch_latency is not None and fetch_reference:
+            latencies.append(self.fetch_latency / max(fetch_reference, 1e-6))
+        latency = sum(latencies) / len(latencies)
+        return self.success / max(latency, 0.05) / (1 + self.in_use)
+
+
+class ProxyPool:
+    """
+    A pool of proxy servers matching broker criteria, discovered and checked
+    concurrently by a background thread, so that the scraping does not wait for the
+    whole search. Every request takes the healthiest proxy and reports its outcome;
+    a proxy failing `max_failures` times in a row, or whose success rate falls under
+    `min_success`, is evicted and the pool is refilled below `min_size` proxies.
+
+    Attributes:
+        criteria (ProxyBrokerCriteria): The broker criteria of the proxies.
+        min_size (int): The number of healthy proxies under which the pool is refilled.
+        max_size (int): The maximum number of proxies.
+        decay (float): The weight of the last request in the moving averages.
+
+    Args:
+        criteria (Optional[ProxyBrokerCriteria]): The broker criteria of the proxies.
+        min_size (int): The number of healthy proxies under which the pool is refilled.
+        max_size (int): The maximum number of proxies.
+        decay (float): The weight of the last request in the moving averages.
+        max_failures (int): The number of consecutive failures evicting a proxy.
+        min_success (float): The success rate under which a proxy is evicted.
+        refresh_interval (float): The number of seconds between two checks of the pool.
+        check_workers (int): The number of candidates checked concurrently.
+        discover (Optional[Callable]): The function listing the candidates of criteria,
+            list_proxy_candidates by default.
+        check (Optional[Callable]): The function returning the latency of a working
+            candidate or None, check_proxy_server by default.
+
+    Example:
+        >>> pool = ProxyPool({"anonymous": True, "countryset": {"US"}}).start()
+        >>> with pool.proxy() as proxy:
+        ...     browser = await p.chromium.launch(proxy=proxy)
+    """
+
+    def __init__(self, criteria: Optional[ProxyBrokerCriteria] = None, min_size: int = 3,
+                 max_size: int = 10, decay: float = 0.3, max_failures: int = 3,
+                 min_success: float = 0.3, refresh_interval: float = 300.0,
+                 check_workers: int = 16,
+                 discover: Optional[Callable[[ProxyBrokerCriteria], List[str]]] = None,
+                 check: Optional[Callable[[str, bool, float], Optional[float]]] = None):
+        self.criteria = dict(criteria or {})
+        self.criteria.pop("max_shape", None)
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.decay = decay
+        self.max_failures = max_failures
+        self.min_success = min_success
+        self.refresh_interval = refresh_interval
+        self.check_workers = check_workers
+        self.discover = discover or list_proxy_candidates
+        self.check = check or check_proxy_server
+
+        self._proxies: Dict[str, ProxyHealth] = {}
+        self._evicted = set()
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._refilling = False
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_proxy(cls, proxy: Proxy) -> "ProxyPool":
+        """
+        Creates the pool of a broker proxy configuration, the "pool" key holding the
+        arguments of the pool and the "max_shape" criteria its minimum size.
+        """
+
+        criteria = dict(proxy.get("criteria", {}))
+        kwargs = {"min_size": criteria.get("max_shape", 3), **proxy.get("pool", {})}
+        return cls(criteria, **kwargs)
+
+    def start(self) -> "ProxyPool":
+        """
+        Starts the background discovery and validation of the proxies.
+        """
+
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._maintain, name="proxy-pool",
+                                                daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the background thread.
+        """
+
+        self._stopped.set()
+        self._wake.set()
+
+    def healthy(self) -> List[str]:
+        """
+        The proxy servers of the pool, the healthiest first.
+        """
+
+        with self._condition:
+            references = self._references()
+            ranked = sorted(self._proxies.values(), key=lambda health: -health.score(*references))
+            return [health.server for health in ranked]
+
+    def _references(self) -> Tuple[float, Optional[float]]:
+        # the mean latencies of the pool, each kind of traffic scored against its own
+        checks = [health.check_latency for health in self._proxies.values()]
+        fetches = [health.fetch_latency for health in self._proxies.values()
+                   if health.fetch_latency is not None]
+        return (sum(checks) / len(checks) if checks else 1.0,
+                sum(fetches) / len(fetches) if fetches else None)
+
+    def acquire(self, timeout: Optional[float] = None,
+                exclude: Iterable[str] = ()) -> ProxySettings:
+        """
+        Takes the healthiest proxy, waiting for the first one to be validated.
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait, None to
+                wait as long as proxies are being searched.
+            exclude (Iterable[str]): The proxy servers not to take, e.g. the ones that
+                already failed on the request, unless there is no other one.
+
+        Returns:
+            ProxySettings: The 'playwright' compliant proxy configuration.
+
+        Raises:
+            FreeProxyException: If no proxy was found in time.
+        """
+
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            generation = self._generation
+            if not self._proxies and not self._refilling:
+                self._wake.set()
+
+            while not self._proxies:
+                # a search started before or for this request ended without proxies
+                searched = self._generation > generation and not self._refilling
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if searched or self._stopped.is_set() or (remaining is not None and remaining <= 0):
+                    raise FreeProxyException("missing proxy servers for criteria")
+                self._condition.wait(remaining)
+
+            exclude = set(exclude)
+            candidates = [health for server, health in self._proxies.items()
+                          if server not in exclude] or list(self._proxies.values())
+            references = self._references()
+            health = max(candidates, key=lambda health: health.score(*references))
+            health.in_use += 1
+            return {"server": health.server}
+
+    def report(self, server: str, success: bool, latency: Optional[float] = None) -> None:
+        """
+        Records the outcome of a request through a proxy, and evicts it if unhealthy.
+
+        Args:
+            server (str): The proxy server.
+            success (bool): Whether the request succeeded.
+            latency (Optional[float]): The duration of the successful request in seconds.
+        """
+
+        with self._condition:
+            health = self._proxies.get(server)
+            if health is None:
+                return
+
+            health.in_use = max(0, health.in_use - 1)
+            health.success = (1 - self.decay) * health.success + self.decay * float(success)
+            if success:
+                health.failures = 0
+                if latency is not None:
+                    health.fetch_latency = latency if health.fetch_latency is None else (
+                        (1 - self.decay) * health.fetch_latency + self.decay * latency)
+            else:
+                health.failures += 1
+
+            if health.failures >= self.max_failures or health.success < self.min_success:
+                logger.info(f"proxy {server} evicted")
+                del self._proxies[server]
+                self._evicted.add(server)
+                if len(self._proxies) < self.min_size:
+                    self._wake.set()
+
+    def release(self, server: str) -> None:
+        """
+        Returns a proxy without recording an outcome.
+        """
+
+        with self._condition:
+            health = self._proxies.get(server)
+            if health is not None:
+                health.in_use = max(0, health.in_use - 1)
+
+    @contextmanager
+    def proxy(self, timeout: Optional[float] = None) -> Iterator[ProxySettings]:
+        """
+        Context manager taking the healthiest proxy for a request, recording a failure
+        if the block raises and a success with its duration otherwise.
+        """
+
+        settings = self.acquire(timeout)
+        start = time.perf_counter()
+        try:
+            yield settings
+        except BaseException:
+            self.report(settings["server"], False)
+            raise
+        self.report(settings["server"], True, time.perf_counter() - start)
+
+    def _maintain(self) -> None:
+        last_refresh = 0.0
+        while not self._stopped.is_set():
+            # the wake-ups during a refill start the next one
+            self._wake.clear()
+            with self._condition:
+                missing = len(self._proxies) < self.min_size
+            if missing or time.monotonic() - last_refresh >= self.refresh_interval:
+                self._refill()
+                last_refresh = time.monotonic()
+            self._wake.wait(self.refresh_interval)
+
+    def _refill(self) -> None:
+        with self._condition:
+            self._refilling = True
+        try:
+            try:
+                candidates = self.discover(self.criteria)
+            except Exception as e:
+                logger.warning(f"proxy discovery failed: {e}")
+                candidates = []
+
+            with self._condition:
+                candidates = [server for server in candidates
+                              if server not in self._proxies and server not in self._evicted]
+            self._check_all(candidates)
+        finally:
+            with self._condition:
+                self._refilling = False
+                self._generation += 1
+                self._condition.notify_all()
+
+    def _check_all(self, candidates: List[str]) -> None:
+        secure = self.criteria.get("secure", False)
+        timeout = self.criteria.get("timeout", 5.0)
+        candidates = iter(candidates)
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.check_workers) as executor:
+            while True:
+                with self._condition:
+                    full = len(self._proxies) >= self.max_size
+                while not full and not self._stopped.is_set() and len(futures) < self.check_workers:
+                    server = next(candidates, None)
+                    if server is None:
+                        break
+                    futures[executor.submit(self.check, server, secure, timeout)] = server
+                if not futures:
+                    return
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    server = futures.pop(future)
+                    try:
+                        latency = future.result()
+                    except Exception:
+                        latency = None
+                    if latency is None:
+                        continue
+                    with self._condition:
+                        if len(self._proxies) < self.max_size:
+                            self._proxies[server] = ProxyHealth(server, latency)
+                            # the waiting requests take the proxy right away
+                            self._condition.notify_all()
+
+
+_pools: Dict[tuple, ProxyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_proxy_pool(proxy: Proxy) -> ProxyPool:
+    """
+    Returns the started pool of a broker proxy configuration, shared by the loaders
+    with the same configuration.
+
+    Args:
+        proxy (Proxy): The proxy configuration, with "server" set to "broker".
+
+    Returns:
+        ProxyPool: The pool.
+    """
+
+    def _freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+        if isinstance(value, (set, list, tuple)):
+            return tuple(sorted(map(str, value)))
+        return value
+
+    key = (_freeze(proxy.get("criteria", {})), _freeze(proxy.get("pool", {})))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ProxyPool.from_proxy(proxy)
+        return pool.start()
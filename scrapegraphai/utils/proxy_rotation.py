@@ -5,7 +5,10 @@ Module for rotating proxies
 import ipaddress
 import random
 import re
-from typing import List, Optional, Set, TypedDict
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple, TypedDict
 import requests
 from fp.errors import FreeProxyException
 from fp.fp import FreeProxy
@@ -36,6 +39,76 @@ class Proxy(ProxySettings):
     criteria: ProxyBrokerCriteria
 
 
+def check_proxy_server(server: str, secure: bool = False,
+                       timeout: float = 5.0) -> Optional[float]:
+    """checks that a proxy server forwards requests, as FreeProxy does
+
+    Args:
+        server: The proxy server URL, e.g. 'http://103.10.63.135:8080'.
+        secure: whether the proxy server should support HTTPS.
+        timeout: The maximum timeout for the proxy response.
+
+    Returns:
+        The latency of the proxy server in seconds, None if it does not work.
+    """
+    proxybroker = FreeProxy(https=secure, timeout=timeout)
+    setting = {proxybroker.schema: server}
+
+    start = time.perf_counter()
+    try:
+        if not proxybroker._FreeProxy__check_if_proxy_is_working(setting):
+            return None
+    except (requests.exceptions.RequestException, AttributeError, IndexError, OSError):
+        return None
+    return time.perf_counter() - start
+
+
+class ProxyCheckCache:
+    """caches the outcome of the proxy checks, working or not, for a TTL
+
+    Args:
+        ttl: The number of seconds a working proxy is trusted.
+        negative_ttl: The number of seconds a failing proxy is skipped.
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 600.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[Tuple[str, bool], Tuple[float, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, server: str, secure: bool) -> Tuple[bool, Optional[float]]:
+        """returns whether the check of a proxy is cached, and its latency"""
+        with self._lock:
+            entry = self._entries.get((server, secure))
+            if entry is None or entry[0] < time.monotonic():
+                return False, None
+            return True, entry[1]
+
+    def set(self, server: str, secure: bool, latency: Optional[float]) -> None:
+        """caches the latency of a proxy, None if it failed"""
+        ttl = self.ttl if latency is not None else self.negative_ttl
+        with self._lock:
+            self._entries[(server, secure)] = (time.monotonic() + ttl, latency)
+
+    def clear(self) -> None:
+        """removes the cached checks"""
+        with self._lock:
+            self._entries.clear()
+
+
+proxy_check_cache = ProxyCheckCache()
+
+
+def _check_proxy_cached(server: str, secure: bool,
+                        timeout: float) -> Tuple[str, Optional[float]]:
+    cached, latency = proxy_check_cache.get(server, secure)
+    if not cached:
+        latency = check_proxy_server(server, secure, timeout)
+        proxy_check_cache.set(server, secure, latency)
+    return server, latency
+
+
 def search_proxy_servers(
     anonymous: bool = True,
     countryset: Optional[Set[str]] = None,
@@ -43,6 +116,7 @@ def search_proxy_servers(
     timeout: float = 5.0,
     max_shape: int = 5,
     search_outside_if_empty: bool = True,
+    max_workers: int = 16,
 ) -> List[str]:
     """search for proxy servers that match the specified broker criteria
 
@@ -53,6 +127,7 @@ def search_proxy_servers(
         timeout: The maximum timeout for proxy responses; defaults to 5.0 seconds.
         max_shape: The maximum number of proxy servers to return; defaults to 5.
         search_outside_if_empty: whether countryset should be extended if empty.
+        max_workers: The maximum number of candidates checked concurrently.
 
     Returns:
         A list of proxy server URLs matching the criteria.
@@ -82,26 +157,31 @@ def search_proxy_servers(
         candidateset = proxybroker.get_proxy_list(search_outside)
         random.shuffle(candidateset)
 
+        candidates = iter(f"http://{address}" for address in candidateset)
         positive = set()
-
-        for address in candidateset:
-            setting = {proxybroker.schema: f"http://{address}"}
-
-            try:
-                server = proxybroker._FreeProxy__check_if_proxy_is_working(setting)
-
-                if not server:
-                    continue
-
-                positive.add(server)
-
-                if len(positive) < k:
-                    continue
-
-                return list(positive)
-
-            except requests.exceptions.RequestException:
-                continue
+        futures = set()
+
+        # the candidates are checked concurrently, the search ends with the k-th working
+        # one and the checks not started yet are cancelled
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while len(positive) < k:
+                while len(futures) < max_workers:
+                    server = next(candidates, None)
+                    if server is None:
+                        break
+                    futures.add(executor.submit(_check_proxy_cached, server, secure, timeout))
+
+                if not futures:
+                    break
+
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    server, latency = future.result()
+                    if latency is not None and len(positive) < k:
+                        positive.add(server)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         n = len(positive)
 
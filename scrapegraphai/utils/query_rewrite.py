@@ -0,0 +1,248 @@
+"""
+Module for reusing the search queries generated from the user prompts: a cache of the
+rewrites, matching the prompts exactly or after normalization, and a fast path using
+the short keyword-like prompts as they are
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# the words marking a prompt as a question or an instruction, to be rewritten
+INSTRUCTION_WORDS = {
+    "what", "which", "who", "whom", "whose", "when", "where", "why", "how",
+    "is", "are", "was", "were", "do", "does", "did", "can", "could", "should", "would",
+    "list", "find", "give", "tell", "show", "extract", "search", "get", "return",
+    "describe", "explain", "summarize", "compare", "please", "me", "i", "you",
+}
+
+_WORD_PATTERN = re.compile(r"[^\W_]+(?:['.\-][^\W_]+)*")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Returns the normalized form of a prompt, so that prompts differing only by case,
+    punctuation or spacing share their search query.
+
+    Example:
+        >>> normalize_prompt("  What is the capital of FRANCE?? ")
+        'what is the capital of france'
+    """
+
+    return " ".join(_WORD_PATTERN.findall(prompt.lower()))
+
+
+def keyword_query(prompt: str, max_words: int = 6) -> Optional[str]:
+    """
+    Returns the prompt itself as search query if it is already keyword-like: a few
+    words, on a single line, without question or instruction words.
+
+    Args:
+        prompt (str): The user prompt.
+        max_words (int): The maximum number of words of a keyword-like prompt.
+
+    Returns:
+        Optional[str]: The search query, or None if the prompt has to be rewritten.
+
+    Example:
+        >>> keyword_query("Chioggia  famous landmarks")
+        'Chioggia famous landmarks'
+        >>> keyword_query("What is Chioggia famous for?") is None
+        True
+    """
+
+    words = prompt.split()
+    if not words or len(words) > max_words or "\n" in prompt.strip():
+        return None
+    if re.search(r"[?!;:{}]", prompt) or re.search(r"[.]\s*$", prompt):
+        return None
+    if any(word.lower() in INSTRUCTION_WORDS for word in _WORD_PATTERN.findall(prompt)):
+        return None
+    return " ".join(words)
+
+
+def _substitute(prompt: List[str], cached_prompt: List[str], cached_query: str,
+                original: List[str]) -> Optional[str]:
+    # the prompts of a template share a prefix and a suffix, the entity in between
+    # is replaced in the cached query, if it appears there
+    prefix = 0
+    while (prefix < min(len(prompt), len(cached_prompt))
+           and prompt[prefix] == cached_prompt[prefix]):
+        prefix += 1
+    suffix = 0
+    while (suffix < min(len(prompt), len(cached_prompt)) - prefix
+           and prompt[-1 - suffix] == cached_prompt[-1 - suffix]):
+        suffix += 1
+
+    shared = prefix + suffix
+    if shared < 2 or shared < 0.5 * max(len(prompt), len(cached_prompt)):
+        return None
+
+    old = " ".join(cached_prompt[prefix:len(cached_prompt) - suffix])
+    new = " ".join(original[prefix:len(prompt) - suffix])
+    if not old or not new:
+        return None
+
+    pattern = re.compile(r"(?<![^\W_])" + r"\W+".join(map(re.escape, old.split()))
+                         + r"(?![^\W_])", flags=re.IGNORECASE)
+    if len(pattern.findall(cached_query)) != 1:
+        return None
+    return pattern.sub(lambda _: new, cached_query)
+
+
+def _index_keys(words: List[str]) -> List[Tuple[str, ...]]:
+    # a prompt sharing at least two words with a cached one, at its start or its end,
+    # shares its first two words, its last two words, or its first and last words
+    if len(words) < 2:
+        return []
+    return [("^",) + tuple(words[:2]), ("$",) + tuple(words[-2:]), (words[0], words[-1])]
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class QueryRewriteCache:
+    """
+    A bounded in-memory cache of the search queries generated from the user prompts,
+    keyed by language model. With the "normalized" match, the prompts are also matched
+    after normalization, and a prompt differing from a cached one only by an entity,
+    e.g. a prompt template filled with another company name, gets the cached query
+    with the entity replaced, if the query contains it.
+
+    Attributes:
+        match (str): "exact" or "normalized".
+        max_entries (int): The maximum number of queries, the least recently used ones
+            are evicted first.
+        hits (int): The number of prompts answered from the cache.
+        misses (int): The number of prompts rewritten by the language model.
+
+    Args:
+        match (str): How prompts are matched, "exact" or "normalized".
+        max_entries (int): The maximum number of queries.
+
+    Example:
+        >>> cache = QueryRewriteCache(match="normalized")
+        >>> cache.set("model", "Who founded Acme Corp?", "Acme Corp founder")
+        >>> cache.get("model", "who founded Globex Inc")
+        'Globex Inc founder'
+    """
+
+    def __init__(self, match: str = "exact", max_entries: int = 1000):
+        if match not in ("exact", "normalized"):
+            raise ValueError(f"unknown query match {match}, use 'exact' or 'normalized'")
+
+        self.match = match
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, str]]" = OrderedDict()
+        # the normalized prompts of every model by first and last words, the candidates
+        # of a template substitution
+        self._index: Dict[Tuple[str, Tuple[str, ...]], Dict[Tuple[str, str], None]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Union[bool, str, dict, None]) -> Optional["QueryRewriteCache"]:
+        """
+        Returns the shared cache of a "cache" configuration of the query rewrite.
+
+        Args:
+            config (Union[bool, str, dict, None]): True for exact matching, "exact" or
+                "normalized", or a dictionary like {"match": "normalized", "max_entries": 1000}.
+
+        Returns:
+            Optional[QueryRewriteCache]: The cache, None if disabled.
+        """
+
+        if not config:
+            return None
+        if config is True:
+            config = {}
+        if isinstance(config, str):
+            config = {"match": config}
+
+        key = (config.get("match", "exact"), config.get("max_entries", 1000))
+        with _caches_lock:
+            if key not in _caches:
+                _caches[key] = cls(*key)
+            return _caches[key]
+
+    def _key(self, model: str, prompt: str) -> Tuple[str, str]:
+        return model, normalize_prompt(prompt) if self.match == "normalized" else prompt
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        """
+        Returns the cached search query of a prompt, None if missing.
+        """
+
+        key = self._key(model, prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if self.match == "normalized":
+                words = key[1].split()
+                original = _WORD_PATTERN.findall(prompt)
+                if len(original) != len(words):
+                    original = words
+                # the cached prompts sharing the first or last words, the latest first
+                candidates = {}
+                for index_key in _index_keys(words):
+                    bucket = self._index.get((model, index_key), {})
+                    candidates.update(dict.fromkeys(reversed(bucket)))
+                for candidate in candidates:
+                    query = self._entries[candidate][1]
+                    substituted = _substitute(words, candidate[1].split(), query, original)
+                    if substituted is not None:
+                        self.hits += 1
+                        return substituted
+
+            self.misses += 1
+            return None
+
+    def set(self, model: str, prompt: str, query: str) -> None:
+        """
+        Caches the search query generated from a prompt.
+        """
+
+        key = self._key(model, prompt)
+        with self._lock:
+            if key not in self._entries and self.match == "normalized":
+                for index_key in _index_keys(key[1].split()):
+                    self._index.setdefault((model, index_key), {})[key] = None
+            self._entries[key] = (prompt, query)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._unindex(evicted)
+
+    def _unindex(self, key: Tuple[str, str]) -> None:
+        for index_key in _index_keys(key[1].split()):
+            bucket = self._index.get((key[0], index_key))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._index[(key[0], index_key)]
+
+    def clear(self) -> None:
+        """
+        Removes all the cached queries.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+
+def model_key(llm_model: Any) -> str:
+    """
+    Returns the identifier of a language model the cached queries are keyed by.
+    """
+
+    name = getattr(llm_model, "model_name", None) or getattr(llm_model, "model", "")
+    return f"{type(llm_model).__name__}:{name}"
@@ -1,74 +1,298 @@
 """
 Research_web module
 """
-import re
-from typing import List
-from langchain_community.tools import DuckDuckGoSearchResults
-from googlesearch import search as google_search
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from googlesearch import USER_AGENT as GOOGLE_USER_AGENT, filter_result
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
-def search_on_web(query: str, search_engine: str = "Google", 
-                  max_results: int = 10, port: int = 8080) -> List[str]:
+from .crawl_frontier import canonicalize_url
+
+DEFAULT_SEARCH_TIMEOUT = 10.0
+
+BING_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(engine: str) -> requests.Session:
+    """
+    Returns the session of an engine, shared by the searches so that their
+    connections are reused.
+    """
+
+    with _sessions_lock:
+        session = _sessions.get(engine)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[engine] = session
+        return session
+
+
+def _search_google(query: str, max_results: int, port: int, timeout: float) -> List[str]:
+    # a single page of results, requested like googlesearch does but with a timeout
+    response = _get_session("google").get(
+        "https://www.google.com/search",
+        params={"q": query, "num": min(max_results, 100), "hl": "en"},
+        headers={"User-Agent": GOOGLE_USER_AGENT}, timeout=timeout)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+
+    results = soup.find(id="search") or soup
+    search_results = []
+    for anchor in results.find_all("a", href=True):
+        link = filter_result(anchor["href"])
+        if link and link not in search_results:
+            search_results.append(link)
+            if len(search_results) >= max_results:
+                break
+    return search_results
+
+
+def _search_duckduckgo(query: str, max_results: int, port: int, timeout: float) -> List[str]:
+    from duckduckgo_search import DDGS
+
+    with DDGS(timeout=timeout) as ddgs:
+        return [result["href"] for result in ddgs.text(query, max_results=max_results) or []
+                if result.get("href")]
+
+
+def _search_bing(query: str, max_results: int, port: int, timeout: float) -> List[str]:
+    response = _get_session("bing").get("https://www.bing.com/search", params={"q": query},
+                                        headers=BING_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+
+    search_results = []
+    for result in soup.find_all('li', class_='b_algo', limit=max_results):
+        link = result.find('a')
+        if link is not None and link.get('href'):
+            search_results.append(link['href'])
+    return search_results
+
+
+def _search_searxng(query: str, max_results: int, port: int, timeout: float) -> List[str]:
+    response = _get_session("searxng").get(f"http://localhost:{port}",
+                                           params={"q": query, "format": "json"},
+                                           timeout=timeout)
+    response.raise_for_status()
+
+    # Parse the response and limit to the specified max_results
+    data = response.json()
+    return [result["url"] for result in data["results"][:max_results] if result.get("url")]
+
+
+SEARCH_ENGINES: Dict[str, Callable[[str, int, int, float], List[str]]] = {
+    "google": _search_google,
+    "duckduckgo": _search_duckduckgo,
+    "bing": _search_bing,
+    "searxng": _search_searxng,
+}
+
+
+class SearchCache:
+    """
+    A bounded in-memory cache of search results expiring after `ttl` seconds, keyed
+    by engine, query and number of results.
+
+    Args:
+        ttl (float): The number of seconds the results are kept.
+        max_entries (int): The maximum number of entries, the least recently used ones
+            are evicted first.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[List[str]]:
+        """
+        Returns the cached results of a search, None if missing or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(entry[1])
+
+    def set(self, key: Tuple[str, str, int], results: List[str]) -> None:
+        """
+        Caches the results of a search.
+        """
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all the cached results.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+
+search_cache = SearchCache()
+
+
+def _search_engine(engine: str, query: str, max_results: int, port: int,
+                   timeout: float, cache: bool) -> List[str]:
+    # SearXNG instances on different ports are different engines
+    key = (engine if engine != "searxng" else f"searxng:{port}", query, max_results)
+    if cache:
+        results = search_cache.get(key)
+        if results is not None:
+            return results
+
+    results = SEARCH_ENGINES[engine](query, max_results, port, timeout)
+    # an empty page is more often a block than a lack of results, it is not cached
+    if cache and results:
+        search_cache.set(key, results)
+    return results
+
+
+def fuse_results(rankings: Sequence[List[str]], max_results: int, k: int = 60) -> List[str]:
+    """
+    Merges the results of several engines with reciprocal rank fusion: every URL scores
+    the sum of 1 / (k + rank) over the engines returning it, the URLs being deduplicated
+    on their canonical form.
+
+    Args:
+        rankings (Sequence[List[str]]): The results of every engine, best first.
+        max_results (int): The maximum number of URLs returned.
+        k (int): The constant damping the weight of the first ranks.
+
+    Returns:
+        List[str]: The URLs by decreasing score, as returned by the first engine
+        finding them, ties broken by engine order.
+    """
+
+    scores: Dict[str, float] = {}
+    urls: Dict[str, str] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, url in enumerate(ranking, start=1):
+            key = canonicalize_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            urls.setdefault(key, url)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+    ranked = sorted(urls, key=lambda key: -scores[key])
+    return [urls[key] for key in ranked[:max_results]]
+
+
+def _engines(search_engine: Union[str, Sequence[str]]) -> List[str]:
+    names = [search_engine] if isinstance(search_engine, str) else list(search_engine)
+    engines = list(dict.fromkeys(name.lower() for name in names))
+    if not engines or any(engine not in SEARCH_ENGINES for engine in engines):
+        raise ValueError("The only search engines available are DuckDuckGo, Google, Bing, or SearXNG")
+    return engines
+
+
+def _search_engines(engines: List[str], query: str, max_results: int, port: int,
+                    timeout: float, cache: bool) -> List:
+    # the engines run on their own threads, an engine still running after the timeout
+    # is left behind instead of being waited for
+    executor = ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix="search")
+    try:
+        futures = [executor.submit(_search_engine, engine, query, max_results, port,
+                                   timeout, cache) for engine in engines]
+        wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    outcomes = []
+    for engine, future in zip(engines, futures):
+        if not future.done():
+            outcomes.append(TimeoutError(f"{engine} did not answer within {timeout} seconds"))
+        elif future.exception() is not None:
+            outcomes.append(future.exception())
+        else:
+            outcomes.append(future.result())
+    return outcomes
+
+
+async def asearch_on_web(query: str, search_engine: Union[str, Sequence[str]] = "Google",
+                         max_results: int = 10, port: int = 8080,
+                         timeout: float = DEFAULT_SEARCH_TIMEOUT,
+                         cache: bool = True) -> List[str]:
+    """
+    Asynchronous version of search_on_web, the search running on a thread.
     """
-    Searches the web for a given query using specified search engine options.
+
+    return await asyncio.to_thread(search_on_web, query, search_engine, max_results, port,
+                                   timeout, cache)
+
+
+def search_on_web(query: str, search_engine: Union[str, Sequence[str]] = "Google",
+                  max_results: int = 10, port: int = 8080,
+                  timeout: float = DEFAULT_SEARCH_TIMEOUT, cache: bool = True) -> List[str]:
+    """
+    Searches the web for a given query on one or several search engines concurrently,
+    merging the results of several engines with reciprocal rank fusion. The results
+    are cached for an hour, see search_cache. The engines still running after the
+    timeout are not waited for.
 
     Args:
         query (str): The search query to find on the internet.
-        search_engine (str, optional): Specifies the search engine to use, 
-        options include 'Google', 'DuckDuckGo', 'Bing', or 'SearXNG'. Default is 'Google'.
+        search_engine (Union[str, Sequence[str]], optional): Specifies the search engine
+            to use, options include 'Google', 'DuckDuckGo', 'Bing', or 'SearXNG', or a list
+            of engines queried concurrently. Default is 'Google'.
         max_results (int, optional): The maximum number of search results to return.
         port (int, optional): The port number to use when searching with 'SearXNG'. Default is 8080.
+        timeout (float, optional): The number of seconds every engine gets to answer.
+        cache (bool, optional): Whether to use the cached results.
 
     Returns:
         List[str]: A list of URLs as strings that are the search results.
 
     Raises:
         ValueError: If the search engine specified is not supported.
+        Exception: The error of the engine if there is a single one, or of the first
+            engine if all of them failed or timed out.
 
     Example:
         >>> search_on_web("example query", search_engine="Google", max_results=5)
         ['http://example.com', 'http://example.org', ...]
+        >>> search_on_web("example query", search_engine=["Google", "Bing"], max_results=5)
+        ['http://example.com', 'http://example.net', ...]
     """
 
-    if search_engine.lower() == "google":
-        res = []
-        for url in google_search(query, stop=max_results):
-            res.append(url)
-        return res
-
-    elif search_engine.lower() == "duckduckgo":
-        research = DuckDuckGoSearchResults(max_results=max_results)
-        res = research.run(query)
-        links = re.findall(r'https?://[^\s,\]]+', res)
-        return links
-
-    elif search_engine.lower() == "bing":
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        search_url = f"https://www.bing.com/search?q={query}"
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        search_results = []
-        for result in soup.find_all('li', class_='b_algo', limit=max_results):
-            link = result.find('a')['href']
-            search_results.append(link)
-        return search_results
-
-    elif search_engine.lower() == "searxng":
-        url = f"http://localhost:{port}"
-        params = {"q": query, "format": "json"}
+    engines = _engines(search_engine)
+    outcomes = _search_engines(engines, query, max_results, port, timeout, cache)
 
-        # Send the GET request to the server
-        response = requests.get(url, params=params)
+    rankings = []
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            if len(engines) == 1 or all(isinstance(o, BaseException) for o in outcomes):
+                raise outcome
+            continue
+        rankings.append(outcome)
 
-        # Parse the response and limit to the specified max_results
-        data = response.json()
-        limited_results = data["results"][:max_results]
-        return limited_results
-
-    else:
-        raise ValueError("The only search engines available are DuckDuckGo, Google, Bing, or SearXNG")
+    if len(rankings) == 1:
+        return rankings[0][:max_results]
+    return fuse_results(rankings, max_results)
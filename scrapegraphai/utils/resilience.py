@@ -0,0 +1,347 @@
+"""
+Module for making the language model calls resilient to transient provider errors
+and slow responses, with retries, timeouts and hedged requests
+"""
+
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, Iterator, Optional, Union
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from .logging import get_logger
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# the providers whose clients retry and time out on their own, by init_chat_model name
+PROVIDERS_WITH_RETRIES = {
+    "openai", "azure_openai", "anthropic", "fireworks", "groq", "mistralai",
+    "google_genai", "google_vertexai",
+}
+PROVIDERS_WITH_TIMEOUT = {
+    "openai", "azure_openai", "anthropic", "fireworks", "groq", "mistralai",
+    "google_genai", "ollama",
+}
+
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailableError", "OverloadedError", "ConnectError", "ConnectTimeout",
+    "ReadTimeout", "RemoteProtocolError", "ThrottlingException",
+}
+
+
+def _get_status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classifies an error raised by a language model call as transient or not.
+
+    Args:
+        error (BaseException): The error raised by the call.
+
+    Returns:
+        bool: True for timeouts, connection errors, rate limits and server errors,
+        False for errors that would fail again, such as invalid requests.
+    """
+
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+
+    status = _get_status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """
+    Reads the delay requested by the provider through the Retry-After headers.
+
+    Args:
+        error (BaseException): The error raised by the call.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, None if not specified.
+    """
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    def header(name):
+        return headers.get(name) or headers.get(name.title())
+
+    value = header("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = header("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Computes the exponential backoff delay with full jitter for a retry attempt.
+
+    Args:
+        attempt (int): The number of the retry, starting from 0.
+        base_delay (float): The delay of the first retry in seconds.
+        max_delay (float): The maximum delay in seconds.
+
+    Returns:
+        float: A random delay between 0 and the capped exponential delay.
+    """
+
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class ResiliencePolicy:
+    """
+    The retry, timeout and hedging policy applied to the language model calls of a graph.
+    The latencies of the successful calls are tracked to compute the hedging threshold.
+
+    Attributes:
+        max_retries (int): The maximum number of retries of a failed call.
+        base_delay (float): The delay of the first retry in seconds.
+        max_delay (float): The maximum delay between two retries in seconds.
+        timeout (Optional[float]): The maximum duration of a call in seconds.
+        hedge_percentile (Optional[float]): The latency percentile after which a duplicate
+            request is sent, None to disable hedging.
+        hedge_min_samples (int): The number of calls to observe before hedging.
+
+    Args:
+        max_retries (int): The maximum number of retries of a failed call.
+        base_delay (float): The delay of the first retry in seconds.
+        max_delay (float): The maximum delay between two retries in seconds.
+        timeout (Optional[float]): The maximum duration of a call in seconds, None for no limit.
+        hedge (Union[bool, dict, None]): True to send a hedged request after the p95 latency,
+            or a dictionary with the optional keys "percentile" and "min_samples".
+        history (int): The number of latencies kept to compute the percentile.
+    """
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 1.0, max_delay: float = 30.0,
+                 timeout: Optional[float] = None, hedge: Union[bool, dict, None] = None,
+                 history: int = 100):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        hedge = {} if hedge is True else hedge
+        self.hedge_percentile = hedge.get("percentile", 95) if hedge else None
+        self.hedge_min_samples = hedge.get("min_samples", 10) if hedge else 0
+
+        self.logger = get_logger()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=history)
+
+    @classmethod
+    def from_config(cls, config: Union[bool, dict, None]) -> Optional["ResiliencePolicy"]:
+        """
+        Creates the policy from the "resilience" entry of the graph configuration.
+
+        Args:
+            config (Union[bool, dict, None]): None or False to leave the calls to the
+                provider client, True to use the defaults, or a dictionary with the
+                arguments of the policy.
+
+        Returns:
+            Optional[ResiliencePolicy]: The policy, or None if disabled.
+        """
+
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        return cls(**config)
+
+    def provider_params(self, provider: str) -> dict:
+        """
+        Returns the parameters of a provider client replacing its own retries by the
+        ones of the policy, so that they do not multiply, and making its requests end
+        at the timeout of the policy instead of running on in the background.
+
+        Args:
+            provider (str): The provider name, as given to init_chat_model.
+
+        Returns:
+            dict: The parameters to create the client with.
+        """
+
+        params = {}
+        if provider in PROVIDERS_WITH_RETRIES:
+            params["max_retries"] = 0
+        if self.timeout is not None and provider in PROVIDERS_WITH_TIMEOUT:
+            params["timeout"] = self.timeout
+        return params
+
+    def record_latency(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Returns the number of seconds after which a hedged request is sent,
+        None if hedging is disabled or not enough calls were observed.
+        """
+
+        if self.hedge_percentile is None:
+            return None
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies or len(latencies) < self.hedge_min_samples:
+            return None
+
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))
+        return latencies[index]
+
+    def retry_delay(self, error: BaseException, attempt: int) -> float:
+        delay = get_retry_after(error)
+        if delay is None:
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        return delay
+
+    def wrap(self, llm_model: Runnable) -> "ResilientRunnable":
+        """
+        Wraps a language model so that its calls follow the policy.
+
+        Args:
+            llm_model (Runnable): The language model.
+
+        Returns:
+            ResilientRunnable: The runnable to use in place of the model when composing chains.
+        """
+
+        return ResilientRunnable(llm_model, self)
+
+
+class ResilientRunnable(Runnable):
+    """
+    A runnable invoking a language model according to a resilience policy.
+
+    Args:
+        bound (Runnable): The language model.
+        policy (ResiliencePolicy): The policy applied to the calls.
+    """
+
+    def __init__(self, bound: Runnable, policy: ResiliencePolicy):
+        self.bound = bound
+        self.policy = policy
+
+    @property
+    def InputType(self):
+        return self.bound.InputType
+
+    @property
+    def OutputType(self):
+        return self.bound.OutputType
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return self._invoke_once(input, config, **kwargs)
+            except Exception as error:
+                if attempt >= self.policy.max_retries or not is_retryable(error):
+                    raise
+                delay = self.policy.retry_delay(error, attempt)
+                self.policy.logger.warning(
+                    f"LLM call failed with {type(error).__name__}, "
+                    f"retrying in {delay:.1f}s ({attempt + 1}/{self.policy.max_retries})"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None,
+               **kwargs: Any) -> Iterator[Any]:
+        # a stream can only be retried until its first chunk is yielded
+        attempt = 0
+        while True:
+            started = False
+            try:
+                for chunk in self.bound.stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as error:
+                if started or attempt >= self.policy.max_retries or not is_retryable(error):
+                    raise
+                time.sleep(self.policy.retry_delay(error, attempt))
+                attempt += 1
+
+    def _timed_invoke(self, input: Any, config: Optional[RunnableConfig], **kwargs: Any) -> Any:
+        start_time = time.time()
+        output = self.bound.invoke(input, config, **kwargs)
+        self.policy.record_latency(time.time() - start_time)
+        return output
+
+    def _invoke_once(self, input: Any, config: Optional[RunnableConfig], **kwargs: Any) -> Any:
+        hedge_delay = self.policy.hedge_delay()
+        timeout = self.policy.timeout
+
+        if hedge_delay is None and timeout is None:
+            return self._timed_invoke(input, config, **kwargs)
+
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=2)
+
+        def submit():
+            return executor.submit(copy_context().run, self._timed_invoke, input, config, **kwargs)
+
+        pending = {submit()}
+        hedged = hedge_delay is None
+        error = None
+
+        try:
+            while pending:
+                elapsed = time.time() - start_time
+                wait_for = None if timeout is None else max(0.0, timeout - elapsed)
+                if not hedged:
+                    wait_for = max(0.0, hedge_delay - elapsed) if wait_for is None \
+                        else min(wait_for, max(0.0, hedge_delay - elapsed))
+
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+
+                if not done:
+                    if not hedged and time.time() - start_time >= hedge_delay:
+                        self.policy.logger.info(
+                            f"LLM call slower than {hedge_delay:.1f}s, sending a hedged request"
+                        )
+                        pending.add(submit())
+                        hedged = True
+                    elif timeout is not None and time.time() - start_time >= timeout:
+                        raise TimeoutError(f"LLM call timed out after {timeout}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        raise error
@@ -0,0 +1,198 @@
+"""
+Module for merging partial answers deterministically using the output schema
+"""
+
+import json
+from typing import Any, List, Optional, Union, get_args, get_origin
+
+EMPTY_VALUES = ("", "na", "n/a", "none", "null")
+
+
+def is_empty_value(value: Any) -> bool:
+    """
+    Checks if a value extracted by the language model carries no information.
+
+    Args:
+        value (Any): The value to check.
+
+    Returns:
+        bool: True if the value is None, an empty container or a placeholder such as "NA".
+    """
+
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in EMPTY_VALUES
+    if isinstance(value, (list, dict, tuple, set)):
+        return len(value) == 0
+    return False
+
+
+def get_schema_fields(schema) -> dict:
+    """
+    Returns the fields of a pydantic schema as a mapping from name to annotation,
+    supporting both pydantic v1 and v2 models.
+
+    Args:
+        schema: The pydantic model class.
+
+    Returns:
+        dict: A dictionary mapping every field name to its type annotation.
+    """
+
+    if hasattr(schema, "model_fields"):
+        return {name: field.annotation for name, field in schema.model_fields.items()}
+    if hasattr(schema, "__fields__"):
+        return {name: field.outer_type_ for name, field in schema.__fields__.items()}
+    return {}
+
+
+def _is_list_annotation(annotation) -> bool:
+    """
+    Checks if a type annotation describes a list, unwrapping Optional[...] if needed.
+    """
+
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return len(args) == 1 and _is_list_annotation(args[0])
+    return origin in (list, List) or annotation is list
+
+
+def has_list_fields(schema) -> bool:
+    """
+    Checks if a pydantic schema has list fields, i.e. describes several entities
+    that can be spread over the whole content.
+
+    Args:
+        schema: The pydantic model class.
+
+    Returns:
+        bool: True if a field of the schema is a list.
+    """
+
+    return any(_is_list_annotation(annotation)
+               for annotation in get_schema_fields(schema).values())
+
+
+def _fingerprint(item: Any) -> str:
+    """
+    Builds a hashable representation of a JSON value, used for deduplication.
+    """
+
+    try:
+        return json.dumps(item, sort_keys=True, default=str)
+    except TypeError:
+        return repr(item)
+
+
+def deterministic_merge(results: List[Any], schema) -> Optional[dict]:
+    """
+    Merges partial answers without calling the language model when the schema allows it.
+
+    List fields are concatenated and deduplicated preserving their order; scalar fields
+    are merged only if all the non-empty values agree.
+
+    Args:
+        results (List[Any]): The partial answers, as parsed JSON objects.
+        schema: The pydantic model class describing the output.
+
+    Returns:
+        Optional[dict]: The merged answer, or None if an LLM merge is needed.
+
+    Example:
+        >>> deterministic_merge([{"items": ["a"]}, {"items": ["a", "b"]}], Items)
+        {'items': ['a', 'b']}
+    """
+
+    if schema is None or not results:
+        return None
+
+    if not all(isinstance(result, dict) for result in results):
+        return None
+
+    fields = get_schema_fields(schema)
+    if not fields:
+        return None
+
+    # answers with keys outside of the schema cannot be trusted
+    if any(set(result.keys()) - set(fields) for result in results):
+        return None
+
+    merged = {}
+    for name, annotation in fields.items():
+        values = [result[name] for result in results
+                  if name in result and not is_empty_value(result[name])]
+
+        if _is_list_annotation(annotation):
+            seen = set()
+            items = []
+            for value in values:
+                if not isinstance(value, list):
+                    return None
+                for item in value:
+                    key = _fingerprint(item)
+                    if key not in seen:
+                        seen.add(key)
+                        items.append(item)
+            merged[name] = items
+            continue
+
+        distinct = {_fingerprint(value) for value in values}
+        if len(distinct) > 1:
+            return None
+        merged[name] = values[0] if values else "NA"
+
+    return merged
+
+
+def get_required_fields(schema) -> List[str]:
+    """
+    Returns the names of the required fields of a pydantic schema, or of every
+    field if none of them is required.
+
+    Args:
+        schema: The pydantic model class.
+
+    Returns:
+        List[str]: The names of the fields that must be filled.
+    """
+
+    if hasattr(schema, "model_fields"):
+        fields = schema.model_fields
+        required = [name for name, field in fields.items() if field.is_required()]
+    elif hasattr(schema, "__fields__"):
+        fields = schema.__fields__
+        required = [name for name, field in fields.items() if field.required]
+    else:
+        return []
+
+    return required or list(fields)
+
+
+def is_schema_satisfied(answer: Any, schema) -> bool:
+    """
+    Checks if an answer is valid for the schema and fills every required field
+    with a non-empty value.
+
+    Args:
+        answer (Any): The answer, as a parsed JSON object.
+        schema: The pydantic model class describing the output.
+
+    Returns:
+        bool: True if no further content is needed to answer.
+    """
+
+    if schema is None or not isinstance(answer, dict):
+        return False
+
+    try:
+        if hasattr(schema, "model_validate"):
+            schema.model_validate(answer)
+        else:
+            schema.parse_obj(answer)
+    except Exception:
+        return False
+
+    required = get_required_fields(schema)
+    return bool(required) and all(not is_empty_value(answer.get(name)) for name in required)
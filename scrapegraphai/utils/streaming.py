@@ -0,0 +1,183 @@
+"""
+Module for streaming the execution events and the answer of a graph
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+
+class _StreamSession:
+    """
+    The streaming session of a graph run, holding the graph whose
+    events are streamed and the function receiving them.
+    """
+
+    def __init__(self, graph, emit: Callable[[dict], None]):
+        self.graph = graph
+        self.emit = emit
+
+
+_stream_session: ContextVar[Optional[_StreamSession]] = ContextVar("stream_session", default=None)
+_current_node: ContextVar[Optional[tuple]] = ContextVar("current_node", default=None)
+
+_DONE = object()
+
+
+@contextmanager
+def node_scope(graph, node):
+    """
+    Context manager marking the execution of a node, emitting its progress
+    events when the graph is being streamed.
+
+    Args:
+        graph (BaseGraph): The graph executing the node.
+        node (BaseNode): The node being executed.
+    """
+
+    token = _current_node.set((graph, node))
+    session = _stream_session.get()
+    streamed = session is not None and session.graph is graph
+    start_time = time.time()
+
+    if streamed:
+        session.emit({"event": "node_start", "node": node.node_name})
+
+    try:
+        yield
+    except Exception as e:
+        if streamed:
+            session.emit({"event": "node_error", "node": node.node_name, "error": str(e)})
+        raise
+    else:
+        if streamed:
+            session.emit({"event": "node_end", "node": node.node_name,
+                          "exec_time": time.time() - start_time})
+    finally:
+        _current_node.reset(token)
+
+
+def _streams_answer() -> bool:
+    """
+    Checks if the node being executed is the final node of the streamed graph.
+    """
+
+    session = _stream_session.get()
+    scope = _current_node.get()
+
+    if session is None or scope is None:
+        return False
+
+    graph, node = scope
+    return graph is session.graph and node.node_name not in graph.edges
+
+
+def invoke_chain(chain, inputs: dict) -> Any:
+    """
+    Invokes a chain, streaming its partial outputs when called by the final
+    node of a streamed graph.
+
+    With a JsonOutputParser every partial output is the JSON object parsed so far,
+    with a string parser every partial output is a new chunk of tokens.
+
+    Args:
+        chain (Runnable): The chain to invoke.
+        inputs (dict): The inputs of the chain.
+
+    Returns:
+        Any: The complete output of the chain.
+    """
+
+    if not _streams_answer():
+        return chain.invoke(inputs)
+
+    session = _stream_session.get()
+    node_name = _current_node.get()[1].node_name
+
+    answer = None
+    for partial in chain.stream(inputs):
+        session.emit({"event": "partial_answer", "node": node_name, "data": partial})
+        if isinstance(partial, str) and isinstance(answer, str):
+            answer += partial
+        else:
+            answer = partial
+
+    return answer
+
+
+def _start_run(graph_instance, emit: Callable[[Any], None]) -> threading.Thread:
+    """
+    Runs the graph in a background thread, sending the streamed events to emit.
+    """
+
+    def _run():
+        _stream_session.set(_StreamSession(graph_instance.graph, emit))
+        try:
+            answer = graph_instance.run()
+            emit({"event": "end", "answer": answer,
+                  "exec_info": graph_instance.get_execution_info()})
+        except Exception as e:
+            emit({"event": "error", "error": e})
+        finally:
+            emit(_DONE)
+
+    thread = threading.Thread(target=copy_context().run, args=(_run,), daemon=True)
+    thread.start()
+    return thread
+
+
+def stream_graph(graph_instance) -> Iterator[dict]:
+    """
+    Runs a graph yielding its events as soon as they happen: the start and end of
+    every node, the partial answers of the final node and the final answer.
+
+    Args:
+        graph_instance (AbstractGraph): The graph to run.
+
+    Yields:
+        dict: The events, with an "event" key among "node_start", "node_end",
+        "node_error", "partial_answer" and "end".
+
+    Raises:
+        Exception: Any exception raised while running the graph.
+    """
+
+    events = queue.Queue()
+    _start_run(graph_instance, events.put)
+
+    while True:
+        event = events.get()
+        if event is _DONE:
+            break
+        if event["event"] == "error":
+            raise event["error"]
+        yield event
+
+
+async def astream_graph(graph_instance) -> AsyncIterator[dict]:
+    """
+    Asynchronous version of stream_graph, the graph runs in a worker thread
+    so that the event loop is never blocked.
+
+    Args:
+        graph_instance (AbstractGraph): The graph to run.
+
+    Yields:
+        dict: The events of the graph run.
+    """
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    _start_run(graph_instance, lambda event: loop.call_soon_threadsafe(events.put_nowait, event))
+
+    while True:
+        event = await events.get()
+        if event is _DONE:
+            break
+        if event["event"] == "error":
+            raise event["error"]
+        yield event
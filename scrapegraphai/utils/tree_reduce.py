@@ -0,0 +1,109 @@
+"""
+Module for merging many partial answers hierarchically within a token budget
+"""
+
+import json
+from typing import Any, Callable, List, Optional
+
+
+def count_tokens(item: Any) -> int:
+    """
+    Approximates the number of tokens of a partial answer, using the same
+    word based counting applied when the documents are chunked.
+
+    Args:
+        item (Any): The partial answer, either a string or a JSON object.
+
+    Returns:
+        int: The approximate number of tokens.
+    """
+
+    text = item if isinstance(item, str) else json.dumps(item, default=str)
+    return len(text.split())
+
+
+def group_by_token_budget(items: List[Any], token_budget: int,
+                          token_counter: Callable[[Any], int] = count_tokens) -> List[List[Any]]:
+    """
+    Splits the items in consecutive groups whose total size fits the token budget.
+
+    Args:
+        items (List[Any]): The items to group.
+        token_budget (int): The maximum number of tokens for each group.
+        token_counter (Callable[[Any], int]): The function used to count the tokens of an item.
+
+    Returns:
+        List[List[Any]]: The groups, in the same order as the items. An item larger
+        than the budget is placed in a group on its own.
+
+    Example:
+        >>> group_by_token_budget(["a b", "c d", "e"], 4)
+        [['a b', 'c d'], ['e']]
+    """
+
+    groups = []
+    current = []
+    current_tokens = 0
+
+    for item in items:
+        tokens = token_counter(item)
+        if current and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += tokens
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def tree_reduce(results: List[Any], merge_fn: Callable[[List[List[Any]]], List[Any]],
+                token_budget: int,
+                token_counter: Callable[[Any], int] = count_tokens,
+                final_merge_fn: Optional[Callable[[List[Any]], Any]] = None) -> Any:
+    """
+    Reduces a list of partial answers to a single one, merging them level by level
+    in groups that fit the token budget until only one answer remains.
+
+    Args:
+        results (List[Any]): The partial answers to merge.
+        merge_fn (Callable[[List[List[Any]]], List[Any]]): Function merging every group
+            of a level, returning one answer for each group. It is meant to run the
+            groups in parallel.
+        token_budget (int): The maximum number of tokens for a single merge call.
+        token_counter (Callable[[Any], int]): The function used to count the tokens of an answer.
+        final_merge_fn (Optional[Callable[[List[Any]], Any]]): Function merging the last
+            group into the final answer, defaults to merge_fn.
+
+    Returns:
+        Any: The final merged answer.
+    """
+
+    if not results:
+        return {}
+
+    if final_merge_fn is None:
+        final_merge_fn = lambda group: merge_fn([group])[0]
+
+    level = list(results)
+
+    if len(level) == 1:
+        return final_merge_fn(level)
+
+    while len(level) > 1:
+        groups = group_by_token_budget(level, token_budget, token_counter)
+
+        # every answer exceeds the budget on its own, fall back to pairwise merges
+        if len(groups) == len(level):
+            groups = [level[i:i + 2] for i in range(0, len(level), 2)]
+
+        if len(groups) == 1:
+            return final_merge_fn(groups[0])
+
+        merged = iter(merge_fn([group for group in groups if len(group) > 1]))
+        level = [next(merged) if len(group) > 1 else group[0] for group in groups]
+
+    return level[0]
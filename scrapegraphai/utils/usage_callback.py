@@ -0,0 +1,203 @@
+"""
+Module for collecting usage information reported by the language model providers
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, Tuple
+
+from langchain_community.callbacks.openai_info import (
+    MODEL_COST_PER_1K_TOKENS,
+    get_openai_token_cost_for_model,
+    standardize_model_name,
+)
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+
+def get_cached_prompt_tokens(message: Any, llm_output: Optional[dict] = None) -> int:
+    """
+    Extracts the number of prompt tokens served from the provider-side prompt cache.
+
+    Supports the OpenAI format ("prompt_tokens_details.cached_tokens"), the Anthropic
+    format ("cache_read_input_tokens"), the DeepSeek format ("prompt_cache_hit_tokens")
+    and the standard "input_token_details.cache_read" usage metadata.
+
+    Args:
+        message (Any): The message returned by the chat model.
+        llm_output (Optional[dict]): The raw output of the model call, if any.
+
+    Returns:
+        int: The number of cached prompt tokens, 0 if the provider does not report them.
+    """
+
+    usage_metadata = getattr(message, "usage_metadata", None) or {}
+    details = usage_metadata.get("input_token_details") or {}
+    if details.get("cache_read"):
+        return details["cache_read"]
+
+    metadata = {**(llm_output or {}), **(getattr(message, "response_metadata", None) or {})}
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    if not isinstance(usage, dict):
+        return 0
+
+    prompt_details = usage.get("prompt_tokens_details") or {}
+    return (prompt_details.get("cached_tokens")
+            or usage.get("cache_read_input_tokens")
+            or usage.get("prompt_cache_hit_tokens")
+            or 0)
+
+
+def get_token_usage(message: Any, llm_output: Optional[dict] = None) -> Tuple[int, int]:
+    """
+    Extracts the number of prompt and completion tokens of a model call, whatever
+    the provider.
+
+    The standard usage metadata of the LangChain messages is used when available,
+    otherwise the raw usage reported by the provider: OpenAI compatible ("prompt_tokens"),
+    Anthropic and Bedrock ("input_tokens"), Gemini ("prompt_token_count"), Ollama
+    ("prompt_eval_count") and the Bedrock invocation metrics ("inputTokenCount").
+
+    Args:
+        message (Any): The message returned by the chat model, None for text models.
+        llm_output (Optional[dict]): The raw output of the model call, if any.
+
+    Returns:
+        Tuple[int, int]: The number of prompt tokens and of completion tokens.
+    """
+
+    usage_metadata = getattr(message, "usage_metadata", None)
+    if usage_metadata:
+        return usage_metadata.get("input_tokens", 0), usage_metadata.get("output_tokens", 0)
+
+    metadata = {**(llm_output or {}), **(getattr(message, "response_metadata", None) or {})}
+
+    for key in ("token_usage", "usage", "usage_metadata", "amazon-bedrock-invocationMetrics"):
+        usage = metadata.get(key)
+        if not isinstance(usage, dict):
+            continue
+        for prompt_key, completion_key in (("prompt_tokens", "completion_tokens"),
+                                           ("input_tokens", "output_tokens"),
+                                           ("prompt_token_count", "candidates_token_count"),
+                                           ("inputTokenCount", "outputTokenCount")):
+            if prompt_key in usage or completion_key in usage:
+                return usage.get(prompt_key) or 0, usage.get(completion_key) or 0
+
+    if "prompt_eval_count" in metadata or "eval_count" in metadata:
+        return metadata.get("prompt_eval_count") or 0, metadata.get("eval_count") or 0
+
+    return 0, 0
+
+
+def get_model_name(message: Any, llm_output: Optional[dict] = None) -> str:
+    metadata = {**(llm_output or {}), **(getattr(message, "response_metadata", None) or {})}
+    return metadata.get("model_name") or metadata.get("model") or metadata.get("model_id") or ""
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler collecting the token usage of any chat model, the prompt tokens
+    served from the provider-side prompt cache and the cost of the OpenAI models.
+    The responses served by the local LLM cache are not counted.
+
+    Attributes:
+        total_tokens (int): The total number of tokens.
+        prompt_tokens (int): The number of prompt tokens.
+        completion_tokens (int): The number of completion tokens.
+        cached_prompt_tokens (int): The number of prompt tokens read from the prompt cache.
+        successful_requests (int): The number of model calls.
+        total_cost (float): The cost in USD, for the models with a known price.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.total_tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.successful_requests = 0
+        self.total_cost = 0.0
+
+    @property
+    def always_verbose(self) -> bool:
+        return True
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0,
+                 "successful_requests": 0, "total_cost": 0.0}
+
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None and message.response_metadata.get("llm_cache_hit"):
+                    continue
+
+                prompt_tokens, completion_tokens = get_token_usage(message, response.llm_output)
+                usage["prompt_tokens"] += prompt_tokens
+                usage["completion_tokens"] += completion_tokens
+                usage["cached_prompt_tokens"] += get_cached_prompt_tokens(message, response.llm_output)
+                usage["successful_requests"] += 1
+
+                model_name = standardize_model_name(get_model_name(message, response.llm_output))
+                if model_name in MODEL_COST_PER_1K_TOKENS:
+                    usage["total_cost"] += (
+                        get_openai_token_cost_for_model(model_name, prompt_tokens)
+                        + get_openai_token_cost_for_model(model_name, completion_tokens,
+                                                          is_completion=True)
+                    )
+
+        self.add(usage)
+
+    def add(self, usage: Any) -> None:
+        """
+        Adds the usage of another handler, or a dictionary with the same keys.
+        """
+
+        if isinstance(usage, UsageCallbackHandler):
+            usage = {key: getattr(usage, key) for key in ("prompt_tokens", "completion_tokens",
+                                                          "cached_prompt_tokens",
+                                                          "successful_requests", "total_cost")}
+
+        with self._lock:
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.completion_tokens += usage["completion_tokens"]
+            self.total_tokens += usage["prompt_tokens"] + usage["completion_tokens"]
+            self.cached_prompt_tokens += usage["cached_prompt_tokens"]
+            self.successful_requests += usage["successful_requests"]
+            self.total_cost += usage["total_cost"]
+
+
+usage_callback_var: ContextVar[Optional[UsageCallbackHandler]] = ContextVar(
+    "usage_callback", default=None
+)
+
+register_configure_hook(usage_callback_var, True)
+
+
+@contextmanager
+def get_usage_callback():
+    """
+    Context manager collecting the usage of every language model call made within its
+    scope, including the ones made by worker threads that inherit the context. When
+    nested, for example by a sub-graph running inside a node, the usage of the inner
+    scope is added to the outer one on exit.
+
+    Example:
+        >>> with get_usage_callback() as cb:
+        ...     chain.invoke({"question": "..."})
+        >>> cb.total_tokens
+        1024
+    """
+
+    parent = usage_callback_var.get()
+    cb = UsageCallbackHandler()
+    token = usage_callback_var.set(cb)
+    try:
+        yield cb
+    finally:
+        usage_callback_var.reset(token)
+        if parent is not None:
+            parent.add(cb)
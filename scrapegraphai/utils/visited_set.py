@@ -0,0 +1,331 @@
+"""
+Module for the compact sets of visited URLs of the large crawls, storing 64-bit
+fingerprints of the canonical URLs, or bits of a scalable Bloom filter
+"""
+
+import hashlib
+import math
+import struct
+from array import array
+from typing import List, Union
+
+from .crawl_frontier import canonicalize_url
+
+_FINGERPRINT_MAGIC = b"SGFP"
+_BLOOM_MAGIC = b"SGBF"
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    Returns the 64-bit fingerprint of the canonical form of a URL, never 0.
+
+    Example:
+        >>> url_fingerprint("https://example.com/a#top") == url_fingerprint("https://EXAMPLE.com/a")
+        True
+    """
+
+    digest = hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class FingerprintSet:
+    """
+    A set of URLs storing their 64-bit fingerprints in an open addressing hash table
+    backed by an array, i.e. 8 to 16 bytes per URL instead of the hundred bytes of a
+    URL string. Two URLs share a fingerprint with a negligible probability (about
+    n² / 2^65 for n URLs).
+
+    Args:
+        capacity (int): The expected number of URLs, the table grows as needed.
+
+    Example:
+        >>> visited = FingerprintSet()
+        >>> visited.add("https://example.com/a")
+        True
+        >>> "https://example.com/a#top" in visited
+        True
+    """
+
+    max_load = 0.75
+
+    def __init__(self, capacity: int = 1024):
+        size = 16
+        while size * self.max_load < capacity:
+            size *= 2
+        self._slots = array("Q", bytes(8 * size))
+        self._count = 0
+
+    def add(self, url: str) -> bool:
+        """
+        Adds a URL to the set.
+
+        Returns:
+            bool: True if the URL was not in the set.
+        """
+
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def add_fingerprint(self, fingerprint: int) -> bool:
+        """
+        Adds the fingerprint of a URL to the set.
+
+        Returns:
+            bool: True if the fingerprint was not in the set.
+        """
+
+        index = self._find(fingerprint)
+        if self._slots[index] == fingerprint:
+            return False
+
+        self._slots[index] = fingerprint
+        self._count += 1
+        if self._count > len(self._slots) * self.max_load:
+            self._grow()
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = url_fingerprint(url)
+        return self._slots[self._find(fingerprint)] == fingerprint
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the table in bytes.
+        """
+
+        return len(self._slots) * self._slots.itemsize
+
+    def save(self, path: str) -> None:
+        """
+        Writes the set to a file, to be loaded when resuming the crawl.
+        """
+
+        with open(path, "wb") as file:
+            file.write(_FINGERPRINT_MAGIC + struct.pack("<QQ", len(self._slots), self._count))
+            file.write(self._slots.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintSet":
+        """
+        Reads a set written by save.
+        """
+
+        with open(path, "rb") as file:
+            if file.read(4) != _FINGERPRINT_MAGIC:
+                raise ValueError(f"{path} is not a fingerprint set file")
+            size, count = struct.unpack("<QQ", file.read(16))
+            visited = cls.__new__(cls)
+            visited._slots = array("Q")
+            visited._slots.frombytes(file.read(8 * size))
+            visited._count = count
+        return visited
+
+    def _find(self, fingerprint: int) -> int:
+        # linear probing, the fingerprints are uniformly distributed
+        slots = self._slots
+        mask = len(slots) - 1
+        index = fingerprint & mask
+        while slots[index] not in (0, fingerprint):
+            index = (index + 1) & mask
+        return index
+
+    def _grow(self) -> None:
+        # rehashed straight from the old table, without an intermediate list
+        slots = self._slots
+        self._slots = array("Q", bytes(16 * len(slots)))
+        for fingerprint in slots:
+            if fingerprint:
+                self._slots[self._find(fingerprint)] = fingerprint
+
+
+class BloomFilter:
+    """
+    A Bloom filter of URL fingerprints for a fixed capacity and false positive rate,
+    with the positions of the bits derived by double hashing of the fingerprints.
+
+    Args:
+        capacity (int): The number of URLs the error rate holds for.
+        error_rate (float): The probability of reporting a new URL as visited.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def add_fingerprint(self, fingerprint: int) -> bool:
+        """
+        Sets the bits of a fingerprint.
+
+        Returns:
+            bool: True if one of the bits was not set, i.e. the fingerprint is new.
+        """
+
+        added = False
+        for position in self._positions(fingerprint):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def contains_fingerprint(self, fingerprint: int) -> bool:
+        """
+        Checks if the bits of a fingerprint are set.
+        """
+
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(fingerprint))
+
+    def _positions(self, fingerprint: int):
+        low, high = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        return ((low + i * high) % self.num_bits for i in range(self.num_hashes))
+
+
+class ScalableBloomFilter:
+    """
+    A set of URLs backed by Bloom filters of growing capacity, so that the false
+    positive rate stays below `error_rate` however many URLs are added: a new filter,
+    `growth` times larger and with an error rate `tightening` times smaller, is added
+    when the last one is full. It takes about 1.44 * log2(1 / error_rate) bits per URL,
+    i.e. under 2 bytes for a 0.1% error rate, but a new URL can be reported as visited
+    and skipped with that probability.
+
+    Args:
+        error_rate (float): The maximum false positive rate.
+        capacity (int): The capacity of the first filter.
+        growth (int): The capacity ratio of two consecutive filters.
+        tightening (float): The error rate ratio of two consecutive filters.
+
+    Example:
+        >>> visited = ScalableBloomFilter(error_rate=0.001)
+        >>> visited.add("https://example.com/a")
+        True
+    """
+
+    def __init__(self, error_rate: float = 0.001, capacity: int = 100_000,
+                 growth: int = 2, tightening: float = 0.5):
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+
+    def add(self, url: str) -> bool:
+        """
+        Adds a URL to the set.
+
+        Returns:
+            bool: True if the URL was not in the set.
+        """
+
+        fingerprint = url_fingerprint(url)
+        if any(bloom.contains_fingerprint(fingerprint) for bloom in self.filters):
+            return False
+
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            # the error rates of the filters sum to at most the error rate of the set
+            index = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.capacity * self.growth ** index,
+                self.error_rate * (1 - self.tightening) * self.tightening ** index,
+            ))
+        return self.filters[-1].add_fingerprint(fingerprint)
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = url_fingerprint(url)
+        return any(bloom.contains_fingerprint(fingerprint) for bloom in self.filters)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the filters in bytes.
+        """
+
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the filters to a file, to be loaded when resuming the crawl.
+        """
+
+        with open(path, "wb") as file:
+            file.write(_BLOOM_MAGIC + struct.pack("<dQQdQ", self.error_rate, self.capacity,
+                                                  self.growth, self.tightening, len(self.filters)))
+            for bloom in self.filters:
+                file.write(struct.pack("<QdQ", bloom.capacity, bloom.error_rate, bloom.count))
+                file.write(bloom.bits)
+
+    @classmethod
+    def load(cls, path: str) -> "ScalableBloomFilter":
+        """
+        Reads filters written by save.
+        """
+
+        with open(path, "rb") as file:
+            if file.read(4) != _BLOOM_MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            error_rate, capacity, growth, tightening, size = struct.unpack("<dQQdQ", file.read(40))
+            visited = cls(error_rate, capacity, growth, tightening)
+            for _ in range(size):
+                capacity, error_rate, count = struct.unpack("<QdQ", file.read(24))
+                bloom = BloomFilter(capacity, error_rate)
+                bloom.count = count
+                bloom.bits = bytearray(file.read(len(bloom.bits)))
+                visited.filters.append(bloom)
+        return visited
+
+
+def create_visited_set(config: Union[str, dict, None] = None) -> Union[FingerprintSet,
+                                                                      ScalableBloomFilter]:
+    """
+    Creates the visited set of a "visited_set" configuration.
+
+    Args:
+        config (Union[str, dict, None]): "fingerprint" (the default) for an exact set of
+            fingerprints, "bloom" for a scalable Bloom filter, or a dictionary like
+            {"type": "bloom", "error_rate": 0.001, "capacity": 100000}.
+
+    Returns:
+        Union[FingerprintSet, ScalableBloomFilter]: The empty set.
+    """
+
+    if not isinstance(config, dict):
+        config = {"type": config or "fingerprint"}
+    config = dict(config)
+    kind = config.pop("type", "fingerprint")
+
+    if kind == "fingerprint":
+        return FingerprintSet(**config)
+    if kind == "bloom":
+        return ScalableBloomFilter(**config)
+    raise ValueError(f"unknown visited set type {kind}, use 'fingerprint' or 'bloom'")
+
+
+def load_visited_set(path: str) -> Union[FingerprintSet, ScalableBloomFilter]:
+    """
+    Reads a visited set written by the save method of FingerprintSet or ScalableBloomFilter.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        Union[FingerprintSet, ScalableBloomFilter]: The set.
+    """
+
+    with open(path, "rb") as file:
+        magic = file.read(4)
+    if magic == _BLOOM_MAGIC:
+        return ScalableBloomFilter.load(path)
+    return FingerprintSet.load(path)
@@ -0,0 +1,31 @@
+"""
+Module for testing the streaming of the smart scraper class
+"""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.graphs import SmartScraperGraph
+
+
+@pytest.fixture
+def smart_scraper_graph():
+    """Smart scraper graph running on a local page with a fake model"""
+    llm_model = FakeListChatModel(responses=['{"products": ["shoes", "hat"]}'])
+    return SmartScraperGraph(
+        prompt="List me all the products.",
+        source="<html><body><p>shoes</p><p>hat</p></body></html>",
+        config={"llm": {"model_instance": llm_model, "model_tokens": 1000}},
+    )
+
+
+def test_stream(smart_scraper_graph):
+    """Test the events yielded while streaming the graph"""
+    events = list(smart_scraper_graph.stream())
+
+    assert events[0] == {"event": "node_start", "node": "Fetch"}
+    assert events[-1]["event"] == "end"
+    assert events[-1]["answer"] == {"products": ["shoes", "hat"]}
+
+    partial_answers = [event["data"] for event in events if event["event"] == "partial_answer"]
+    assert len(partial_answers) > 1
+    assert partial_answers[-1] == events[-1]["answer"]
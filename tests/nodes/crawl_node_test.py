@@ -0,0 +1,142 @@
+"""
+CrawlNode test module
+"""
+import re
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from scrapegraphai.graphs import DeepScraperGraph, SmartScraperGraph
+from scrapegraphai.nodes import CrawlNode
+from scrapegraphai.utils.crawl_frontier import CrawlFrontier
+
+SITE = {
+    "https://example.com/": '<a href="/jobs">Jobs</a> <a href="/about">About</a>',
+    "https://example.com/jobs": '<a href="/jobs/1">Job 1</a> <a href="/">Home</a>',
+    "https://example.com/about": '<a href="https://other.com/">Other</a>',
+    "https://example.com/jobs/1": "Engineer",
+}
+
+
+class PriceModel(BaseChatModel):
+    """Chat model answering with the prices found in the prompt."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prices = [int(price) for price in re.findall(r"Price (\d+)", messages[-1].content)]
+        message = AIMessage(content=f'{{"prices": {prices}}}')
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @property
+    def _llm_type(self) -> str:
+        return "price"
+
+
+def make_node(**node_config):
+    graph = SmartScraperGraph("", "", {"llm": {"model_instance": PriceModel(), "model_tokens": 1000}})
+    node = CrawlNode(input="user_prompt & url", output=["results"],
+                     node_config={"graph_instance": graph, **node_config})
+    node._crawl_page = lambda pool, scheduler, limiter, url: (url, [], SITE[url])
+    return node
+
+
+def test_crawl_visits_every_page_once():
+    """Test that the crawl follows the links once, within the domain and the depth."""
+    node = make_node(max_depth=2)
+
+    state = node.execute({"user_prompt": "Which jobs?", "url": "https://example.com"})
+
+    assert state["visited_urls"][:2] == ["https://example.com/", "https://example.com/jobs"]
+    assert sorted(state["results"]) == sorted(SITE)
+    assert state["failed_sources"] == []
+
+
+def test_crawl_limits():
+    """Test the depth and page limits of the crawl."""
+    state = make_node(max_depth=1).execute({"user_prompt": "jobs", "url": "https://example.com/"})
+    assert "https://example.com/jobs/1" not in state["visited_urls"]
+
+    state = make_node(max_depth=2, max_pages=2).execute(
+        {"user_prompt": "jobs", "url": "https://example.com/"})
+    assert state["results"] == ["https://example.com/", "https://example.com/jobs"]
+
+
+def test_deep_scraper_graph():
+    """Test that the deep scraper merges the answers of the crawled pages."""
+    graph = DeepScraperGraph("Prices?", "<html><body><p>Price 7</p></body></html>", {
+        "llm": {"model_instance": PriceModel(), "model_tokens": 1000}, "max_depth": 0})
+
+    graph.run()
+
+    assert graph.final_state["results"] == [{"prices": [7]}]
+    assert len(graph.final_state["visited_urls"]) == 1
+
+
+def test_resume_crawl(tmp_path):
+    """Test that a resumed crawl only scrapes the pages not completed before."""
+    node = make_node(max_depth=2, crawl_store=str(tmp_path / "crawl.db"))
+    crawled, failing = [], {"https://example.com/jobs"}
+
+    def crawl_page(pool, scheduler, limiter, url):
+        crawled.append(url)
+        if url in failing:
+            raise TimeoutError("page timed out")
+        return url, [], SITE[url]
+
+    node._crawl_page = crawl_page
+
+    state = node.execute({"user_prompt": "jobs", "url": "https://example.com/"})
+    assert state["failed_sources"] == [{"source": "https://example.com/jobs",
+                                        "error": "page timed out"}]
+    assert (tmp_path / "crawl.db.visited").exists()
+
+    crawled.clear()
+    failing.clear()
+    state = node.execute({"user_prompt": "jobs", "url": "https://example.com/", "resume": True})
+
+    assert crawled == ["https://example.com/jobs", "https://example.com/jobs/1"]
+    assert sorted(state["results"]) == sorted(SITE)
+    assert state["failed_sources"] == []
+
+
+def test_links_per_page():
+    """Test that only the most relevant links of every page are followed."""
+    state = make_node(max_depth=1, links_per_page=1).execute(
+        {"user_prompt": "jobs", "url": "https://example.com/"})
+
+    assert state["visited_urls"] == ["https://example.com/", "https://example.com/jobs"]
+
+
+def test_frontier_priority_is_the_link_rank(monkeypatch):
+    """Test that the links enter the frontier with the score that ranked them."""
+    added = []
+    add = CrawlFrontier.add
+    monkeypatch.setattr(CrawlFrontier, "add", lambda self, url, depth=0, score=1.0: (
+        added.append((url, score)), add(self, url, depth, score))[1])
+
+    make_node(max_depth=1).execute({"user_prompt": "jobs", "url": "https://example.com/"})
+
+    assert [url for url, _ in added[1:3]] == ["https://example.com/jobs", "https://example.com/about"]
+    assert added[1][1] > 0 and added[2][1] == 0.0
+
+
+def test_links_of_a_relevant_page_come_first(monkeypatch):
+    """Test that the best link of a weak page does not tie with the best link of a strong page."""
+    site = {
+        "https://example.com/": '<a href="/weak">Weak</a> <a href="/strong">Strong</a>',
+        "https://example.com/weak": ('<a href="/archive">Old jobs</a> <a href="/contact">Contact</a> '
+                                     '<a href="/team">Team</a>'),
+        "https://example.com/strong": ('<a href="/jobs/openings">Jobs openings</a> '
+                                       '<a href="/contact">Contact</a>'),
+        "https://example.com/jobs/openings": "", "https://example.com/archive": "",
+    }
+    added = {}
+    add = CrawlFrontier.add
+    monkeypatch.setattr(CrawlFrontier, "add", lambda self, url, depth=0, score=1.0: (
+        added.setdefault(url, score), add(self, url, depth, score))[1])
+    node = make_node(max_depth=2)
+    node._crawl_page = lambda pool, scheduler, limiter, url: (url, [], site.get(url, ""))
+
+    node.execute({"user_prompt": "jobs openings", "url": "https://example.com/"})
+
+    # both links are the best of their page, the one matching the whole prompt goes first
+    assert added["https://example.com/jobs/openings"] > added["https://example.com/archive"] > 0
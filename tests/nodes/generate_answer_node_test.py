@@ -0,0 +1,55 @@
+"""
+GenerateAnswerNode test module
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.nodes import GenerateAnswerNode
+
+
+class Company(BaseModel):
+    name: str
+    founded: Optional[int] = None
+
+
+class Catalog(BaseModel):
+    products: List[str]
+
+
+def test_early_exit_skips_remaining_chunks():
+    """Test that the remaining chunks are not processed once the schema is satisfied."""
+    llm = FakeListChatModel(responses=['{"name": "Acme", "founded": 1990}'] * 4)
+    node = GenerateAnswerNode(
+        input="user_prompt & doc",
+        output=["answer"],
+        node_config={"llm_model": llm, "schema": Company, "early_exit": {"window": 1}},
+    )
+
+    state = node.execute({"user_prompt": "Company?", "doc": ["c1", "c2", "c3", "c4"]})
+
+    assert state["answer"] == {"name": "Acme", "founded": 1990}
+    assert llm.i == 1
+
+
+def test_early_exit_keeps_list_schemas_complete():
+    """Test that every chunk is processed for a schema with list fields, unless allowed."""
+    responses = ['{"products": ["a"]}', '{"products": ["b"]}', '{"products": ["c"]}']
+    calls = []
+
+    for early_exit, expected in [({"window": 1}, ["a", "b", "c"]),
+                                 ({"window": 1, "allow_lists": True}, ["a"])]:
+        llm = FakeListChatModel(responses=responses)
+        node = GenerateAnswerNode(
+            input="user_prompt & doc",
+            output=["answer"],
+            node_config={"llm_model": llm, "schema": Catalog, "early_exit": early_exit},
+        )
+        original = llm._call
+        object.__setattr__(llm, "_call", lambda *args, **kwargs: calls.append(1) or
+                           original(*args, **kwargs))
+
+        state = node.execute({"user_prompt": "Products?", "doc": ["c1", "c2", "c3"]})
+
+        assert len(calls) == len(expected)
+        assert sorted(state["answer"]["products"]) == expected
+        calls.clear()
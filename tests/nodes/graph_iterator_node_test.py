@@ -0,0 +1,142 @@
+"""
+GraphIteratorNode test module
+"""
+import re
+import threading
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from scrapegraphai.graphs import SmartScraperMultiGraph
+from scrapegraphai.nodes import GraphIteratorNode
+
+
+class PriceModel(BaseChatModel):
+    """Chat model answering with the prices found in the prompt, failing on price 3."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        prices = [int(price) for price in re.findall(r"Price (\d+)", messages[-1].content)]
+        if prices == [3]:
+            raise ValueError("unreadable page")
+        message = AIMessage(content=f'{{"prices": {prices}}}')
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @property
+    def _llm_type(self) -> str:
+        return "price"
+
+
+SOURCES = [f"<html><body><p>Price {i}</p></body></html>" for i in range(6)]
+
+
+def make_graph(**config):
+    return SmartScraperMultiGraph("Prices?", SOURCES, {
+        "llm": {"model_instance": PriceModel(), "model_tokens": 1000}, **config})
+
+
+def test_as_completed_reports_failed_sources():
+    """Test that a failed source is reported while the other answers are kept."""
+    results = []
+    graph = make_graph(on_result=results.append)
+
+    graph.run()
+
+    assert graph.final_state["results"] == [{"prices": [i]} for i in range(6) if i != 3]
+    assert graph.final_state["failed_sources"] == [{"source": SOURCES[3], "error": "unreadable page"}]
+    assert sorted(result.source for result in results) == sorted(SOURCES)
+    assert all(result.exec_info for result in results if result.error is None)
+
+
+def test_on_result_stops_early():
+    """Test that the callback can stop the node once it has enough answers."""
+    graph = make_graph(on_result=lambda result: False)
+    graph.graph.nodes[0].node_config["batchsize"] = 1
+
+    graph.run()
+
+    assert len(graph.final_state["results"]) + len(graph.final_state["failed_sources"]) == 1
+
+
+def test_on_result_method_with_store(tmp_path):
+    """Test that a bound method callback is not copied and that an early stop keeps the store usable."""
+
+    class Collector:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.results = []
+
+        def on_result(self, result):
+            with self.lock:
+                self.results.append(result)
+            return False
+
+    collector = Collector()
+    graph = make_graph(on_result=collector.on_result, crawl_store={"path": str(tmp_path / "stop.db")})
+
+    graph.run()
+
+    assert len(collector.results) == 1
+    assert len(graph.final_state["results"]) + len(graph.final_state["failed_sources"]) == 1
+
+
+def test_run_iter_yields_every_source():
+    """Test that run_iter yields every source and merges the answers at the end."""
+    graph = make_graph()
+
+    results = list(graph.run_iter())
+
+    assert len(results) == 6
+    assert [result.source for result in results if result.error is not None] == [SOURCES[3]]
+    assert graph.final_state["results"] == [{"prices": [i]} for i in range(6) if i != 3]
+    assert "answer" in graph.final_state
+
+    for _ in graph.run_iter():
+        break
+    assert graph.graph.nodes[0].on_result is None
+    assert len(list(graph.run_iter())) == 6
+
+
+def test_adaptive_concurrency_in_exec_info():
+    """Test that the adaptive concurrency state is reported in the execution info."""
+    graph = make_graph(adaptive_concurrency={"initial": 1, "max": 4}, as_completed=True)
+
+    graph.run()
+
+    row = next(row for row in graph.get_execution_info()
+               if row["node_name"] == "GraphIterator")
+    assert row["concurrency"]["errors"] == 1
+    assert row["concurrency"]["peak"] > 1
+    total = graph.get_execution_info()[-1]
+    assert total["concurrency"] == {key: row["concurrency"][key]
+                                    for key in ("peak", "decreases", "errors")}
+    assert graph.final_state["results"] == [{"prices": [i]} for i in range(6) if i != 3]
+
+
+def test_resume_skips_completed_sources(tmp_path):
+    """Test that a resumed run does not scrape the completed sources again."""
+    graph = make_graph(crawl_store={"path": str(tmp_path / "multi.db")}, as_completed=True)
+    graph.run()
+    assert len(graph.final_state["failed_sources"]) == 1
+
+    calls = []
+    original = PriceModel._generate
+    PriceModel._generate = lambda self, messages, *args, **kwargs: (
+        calls.append(messages[-1].content), original(self, messages, *args, **kwargs))[1]
+    try:
+        graph.run(resume=True)
+    finally:
+        PriceModel._generate = original
+
+    assert len(calls) == 2  # the failed source, then the merge
+    assert graph.final_state["results"] == [{"prices": [i]} for i in range(6) if i != 3]
+
+
+def test_visited_set_skips_duplicate_sources():
+    """Test that the sources sharing their canonical URL are scraped once."""
+    node = GraphIteratorNode(input="user_prompt & urls", output=["results"],
+                             node_config={"visited_set": True})
+    urls = ["https://example.com/a", "https://EXAMPLE.com/a#top", "https://example.com/b",
+            SOURCES[0], SOURCES[0]]
+
+    assert node._unique_sources(urls) == [urls[0], urls[2], SOURCES[0], SOURCES[0]]
+    assert GraphIteratorNode("user_prompt & urls", ["results"])._unique_sources(urls) == urls
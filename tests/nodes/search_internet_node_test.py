@@ -56,3 +56,30 @@ class TestSearchInternetNode(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+def test_search_query_is_cached(monkeypatch):
+    """Test that the query of a repeated prompt is not asked to the model again."""
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from scrapegraphai.nodes import search_internet_node
+
+    queries = []
+    monkeypatch.setattr(search_internet_node, "search_on_web",
+                        lambda query, **kwargs: queries.append(query) or ["https://a.com"])
+    llm = FakeListChatModel(responses=["first query", "second query"])
+    node = SearchInternetNode(
+        input="user_prompt",
+        output=["urls"],
+        node_config={"llm_model": llm,
+                     "query_rewrite": {"cache": {"max_entries": 7}, "fast_path": True}},
+    )
+
+    for prompt in ["What is the capital of France?", "What is the capital of France?",
+                   "capital of France"]:
+        node.execute({"user_prompt": prompt})
+
+    assert queries == ["first query", "first query", "capital of France"]
+
+    default = SearchInternetNode(input="user_prompt", output=["urls"],
+                                 node_config={"llm_model": llm})
+    assert default.query_cache is None and not default.keyword_fast_path
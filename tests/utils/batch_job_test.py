@@ -0,0 +1,49 @@
+"""
+Batch job test module
+"""
+import json
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.graphs import SmartScraperMultiGraph
+from scrapegraphai.nodes import FetchNode
+
+SOURCES = [
+    "<html><body><p>Price 10</p></body></html>",
+    "<html><body><p>Price 20</p></body></html>",
+]
+
+
+def create_graph(job_dir, llm):
+    return SmartScraperMultiGraph("Prices?", SOURCES, {
+        "llm": {"model_instance": llm, "model_tokens": 1000},
+        "batch": {"job_dir": str(job_dir), "backend": "local"},
+    })
+
+
+def test_batch_job_rounds(tmp_path, monkeypatch):
+    """Test that the map and reduce phases are submitted as rounds and the answer persisted."""
+    llm = FakeListChatModel(responses=['{"prices": [10, 20]}'] * 3)
+    calls = []
+    original = llm._call
+    object.__setattr__(llm, "_call", lambda *args, **kwargs: calls.append(1) or
+                       original(*args, **kwargs))
+    fetches = []
+    fetch = FetchNode.execute
+    monkeypatch.setattr(FetchNode, "execute",
+                        lambda self, state: fetches.append(1) or fetch(self, state))
+    graph = create_graph(tmp_path, llm)
+
+    assert graph.run_batch() == {"prices": [10, 20]}
+
+    map_requests = (tmp_path / "requests_001.jsonl").read_text().splitlines()
+    reduce_requests = (tmp_path / "requests_002.jsonl").read_text().splitlines()
+    assert len(map_requests) == 2
+    assert len(reduce_requests) == 1
+    assert json.loads(map_requests[0])["body"]["messages"][0]["role"] == "user"
+    assert json.loads((tmp_path / "state.json").read_text())["status"] == "completed"
+    # the sources are fetched on the first round only, the calls all go through the backend
+    assert len(fetches) == len(SOURCES)
+    assert len(calls) == 3
+
+    resumed = create_graph(tmp_path, FakeListChatModel(responses=["{}"]))
+    assert resumed.run_batch() == {"prices": [10, 20]}
+    assert len(fetches) == len(SOURCES)
@@ -0,0 +1,88 @@
+"""
+Client registry test module
+"""
+import threading
+from langchain_core.caches import InMemoryCache
+from scrapegraphai.graphs import SmartScraperGraph
+from scrapegraphai.utils.client_registry import get_shared_client, make_client_key
+
+
+def test_get_shared_client_creates_once():
+    """Test that concurrent requests for the same parameters share one client."""
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(
+        get_shared_client("test", {"model": "m", "api_key": "k"}, factory))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+    assert get_shared_client("test", {"model": "m", "api_key": "other"}, factory) is not created[0]
+
+
+def test_make_client_key_hides_credentials():
+    """Test that keys hash the credentials and that model instances are not shared."""
+    key = make_client_key("llm", {"model": "gpt-4o-mini", "api_key": "sk-secret"})
+    assert "sk-secret" not in key
+    assert make_client_key("llm", {"model_instance": object()}) is None
+
+
+def test_graphs_share_the_language_model():
+    """Test that graphs with the same configuration reuse the same HTTP client."""
+    config = {"llm": {"model": "gpt-4o-mini", "api_key": "sk-test"}}
+    first = SmartScraperGraph("What?", "<html></html>", config)
+    second = SmartScraperGraph("Who?", "<html></html>", config)
+    other = SmartScraperGraph("What?", "<html></html>",
+                              {"llm": {"model": "gpt-4o-mini", "api_key": "sk-other"}})
+
+    assert first.llm_model.client is second.llm_model.client
+    assert first.model_token == second.model_token
+    assert first.llm_model.client is not other.llm_model.client
+
+
+def test_graphs_do_not_share_the_model_settings():
+    """Test that caching or estimating a graph does not change a graph with the same configuration."""
+    config = {"llm": {"model": "gpt-4o-mini", "api_key": "sk-test"}}
+    first = SmartScraperGraph("What?", "<html></html>", config)
+    second = SmartScraperGraph("Who?", "<html></html>", config)
+
+    first.llm_model.cache = InMemoryCache()
+    first.estimate()
+
+    assert second.llm_model is not first.llm_model
+    assert second.llm_model.cache is None
+    assert all(node.llm_model is second.llm_model
+               for node in second.graph.nodes if hasattr(node, "llm_model"))
+
+
+def test_rag_nodes_share_the_default_embedder():
+    """Test that the default embedder is shared by the graphs with the same model configuration."""
+    from scrapegraphai.nodes import RAGNode
+    from scrapegraphai.utils import client_registry
+
+    config = {"llm": {"model": "gpt-4o-mini", "api_key": "sk-embed"}}
+    graphs = [SmartScraperGraph("What?", "<html></html>", config) for _ in range(3)]
+    entries = len(client_registry._clients)
+    nodes = []
+    for graph in graphs:
+        node = RAGNode("user_prompt & doc", ["relevant_chunks"],
+                       {"llm_model": graph.llm_model, "embeddings": True})
+        node.update_config({"llm_config": graph.config["llm"]})
+        nodes.append(node)
+
+    embedders = [node._get_embeddings() for node in nodes]
+
+    assert embedders[0] is embedders[1] is embedders[2]
+    assert len(client_registry._clients) == entries + 1
+    alone = RAGNode("user_prompt & doc", ["relevant_chunks"],
+                    {"llm_model": graphs[0].llm_model, "embeddings": True})
+    assert alone._get_embeddings() is not embedders[0]
+    assert len(client_registry._clients) == entries + 1
@@ -0,0 +1,92 @@
+"""
+Adaptive concurrency test module
+"""
+import time
+import pytest
+from scrapegraphai.utils.concurrency import AIMDLimiter, concurrency_stats
+
+
+def test_from_config():
+    """Test the parsing of the adaptive concurrency configuration."""
+    assert AIMDLimiter.from_config(False) is None
+    assert AIMDLimiter.from_config(True, initial=1).limit == 1
+    limiter = AIMDLimiter.from_config({"initial": 8, "max": 16, "decrease": 0.25})
+    assert (limiter.limit, limiter.max_limit, limiter.decrease) == (8, 16, 0.25)
+
+
+def test_additive_increase():
+    """Test that the limit grows by one after a round of successful runs."""
+    limiter = AIMDLimiter(initial=2, latency_factor=None)
+
+    for _ in range(5):
+        limiter.run(lambda: None)
+
+    assert 3.5 < limiter.limit < 4
+    assert limiter.peak == limiter.limit
+
+
+def test_burst_of_rate_limits_cuts_once():
+    """Test that concurrent rate limit errors only halve the limit once."""
+    limiter = AIMDLimiter(initial=8, latency_factor=None)
+    starts = [limiter.acquire() for _ in range(4)]
+
+    for start in starts:
+        limiter.release(start, TimeoutError("rate limited"))
+    limiter.release(limiter.acquire(), ValueError("not retryable"))
+
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 1
+    assert limiter.stats()["errors"] == 5
+
+    with pytest.raises(TimeoutError):
+        limiter.run(lambda: (_ for _ in ()).throw(TimeoutError()))
+    assert limiter.limit == 2
+
+
+def test_latency_rise_cuts_the_limit():
+    """Test that a rising 95th percentile latency is handled as congestion."""
+    limiter = AIMDLimiter(initial=4, window=4, latency_factor=2.0)
+
+    for _ in range(4):
+        limiter.run(time.sleep, 0.01)
+    limit = limiter.limit
+    for _ in range(4):
+        limiter.run(time.sleep, 0.05)
+
+    assert limiter.decreases >= 1
+    assert limiter.limit < limit
+
+
+def test_fast_outlier_does_not_keep_cutting(monkeypatch):
+    """Test that one fast window does not make a stable latency look like congestion."""
+    from scrapegraphai.utils import concurrency
+
+    clock = [0.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: clock[0])
+    limiter = AIMDLimiter(initial=8, window=4, latency_factor=2.0)
+
+    def run(latency):
+        start = limiter.acquire()
+        clock[0] += latency
+        limiter.release(start)
+
+    for _ in range(4):
+        run(0.01)
+    for _ in range(40):
+        run(0.03)
+
+    assert limiter.decreases == 1
+    assert limiter.limit > 4
+
+
+def test_report_in_scope():
+    """Test that the controller state is written in the current scope only."""
+    limiter = AIMDLimiter(initial=2)
+    limiter.report()
+
+    with concurrency_stats() as stats:
+        limiter.run(lambda: None)
+        limiter.report()
+
+    assert stats["limit"] == 2.5
+    assert stats["errors"] == 0
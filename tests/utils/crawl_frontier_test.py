@@ -0,0 +1,32 @@
+"""
+Crawl frontier test module
+"""
+from scrapegraphai.utils.crawl_frontier import CrawlFrontier, canonicalize_url
+
+
+def test_canonicalize_url():
+    """Test that the variants of a URL have the same canonical form."""
+    assert canonicalize_url("HTTPS://Example.com:443//a?b=2&a=1&utm_source=x#top") == \
+        "https://example.com/a?a=1&b=2"
+    assert canonicalize_url("http://example.com:8080") == "http://example.com:8080/"
+    assert canonicalize_url("<html></html>") == "<html></html>"
+
+
+def test_frontier_rules_and_priority():
+    """Test the deduplication, the crawl rules and the order of the frontier."""
+    frontier = CrawlFrontier(max_depth=1, max_pages=3, exclude_patterns=[r"\.pdf$"])
+
+    assert frontier.add("https://www.example.com/")
+    assert frontier.pop().url == "https://www.example.com/"
+    for link, score in [("https://example.com/about", 0.0),
+                        ("https://example.com/jobs/openings", 1.0),
+                        ("https://example.com/about#team", 0.0),
+                        ("https://other.com/jobs", 1.0),
+                        ("https://example.com/jobs.pdf", 1.0)]:
+        frontier.add(link, 1, score)
+
+    assert len(frontier) == 2
+    assert not frontier.add("https://example.com/jobs/x", 2)
+    assert frontier.pop().url == "https://example.com/jobs/openings"
+    assert frontier.pop().url == "https://example.com/about"
+    assert frontier.pop() is None
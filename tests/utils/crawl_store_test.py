@@ -0,0 +1,52 @@
+"""
+Crawl store test module
+"""
+import time
+from scrapegraphai.utils.crawl_store import SQLiteCrawlFrontier, SQLiteCrawlStore
+
+
+def test_frontier_counters_survive_reopening(tmp_path):
+    """Test that the insertion and visit counters are kept without listing the URLs."""
+    path = str(tmp_path / "crawl.db")
+    store = SQLiteCrawlStore(path)
+    store.visited = None  # the frontier must not list the visited URLs to count them
+    frontier = SQLiteCrawlFrontier(store, max_depth=1, max_pages=2)
+    frontier.add("https://example.com/")
+    frontier.add("https://example.com/a", 1, 0.5)
+    frontier.add("https://example.com/b", 1, 0.5)
+
+    assert [frontier.pop().order for _ in range(2)] == [0, 1]
+    assert frontier.pop() is None
+    store.close()
+
+    reopened = SQLiteCrawlStore(path)
+    assert reopened.visited_count() == 2
+    assert reopened.add("https://example.com/c", 1, 0.5)
+    assert reopened.take().url == "https://example.com/b"
+    assert reopened.take().url == "https://example.com/c"
+    assert reopened.visited() == ["https://example.com/", "https://example.com/a",
+                                  "https://example.com/b", "https://example.com/c"]
+    reopened.close()
+
+
+def test_page_outliving_its_lease_is_not_taken_twice(tmp_path):
+    """Test that a slow page of the run is not leased again, unlike one of an interrupted run."""
+    path = str(tmp_path / "crawl.db")
+    store = SQLiteCrawlStore(path, lease=0.01)
+    store.add("https://example.com/", 0, 1.0)
+    store.add("https://example.com/a", 1, 0.5)
+
+    assert store.take().url == "https://example.com/"
+    time.sleep(0.05)
+    assert store.take().url == "https://example.com/a"
+    assert store.take() is None
+    assert store.take("https://example.com/") is None
+    store.close()
+
+    # the pages left in flight by a crashed run are leased again once expired
+    time.sleep(0.05)
+    other = SQLiteCrawlStore(path, lease=0.01)
+    assert other.take().url == "https://example.com/"
+    other.complete("https://example.com/", "answer")
+    assert other.visited_count() == 2
+    other.close()
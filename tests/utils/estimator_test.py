@@ -0,0 +1,36 @@
+"""
+Estimator test module
+"""
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.graphs import SmartScraperGraph
+from scrapegraphai.utils.estimator import CallRecorder
+
+SOURCE = "<html><body>" + " ".join(f"<p>word{i}</p>" for i in range(600)) + "</body></html>"
+
+
+def test_estimate_does_not_call_the_model(monkeypatch):
+    """Test that the map and merge calls are counted without calling the model."""
+    llm = FakeListChatModel(responses=['{"a": 1}'] * 2)
+    calls = []
+    original = llm._call
+    object.__setattr__(llm, "_call", lambda *args, **kwargs: calls.append(1) or
+                       original(*args, **kwargs))
+    # the model given to the graph keeps its cache while the calls are recorded
+    caches = []
+    lookup = CallRecorder.lookup
+    monkeypatch.setattr(CallRecorder, "lookup",
+                        lambda self, *args: caches.append(llm.cache) or lookup(self, *args))
+    graph = SmartScraperGraph("What?", SOURCE, {"llm": {"model_instance": llm, "model_tokens": 500}})
+
+    estimate = graph.estimate(expected_output_tokens=100, pricing={"input": 1, "output": 2})
+
+    chunks = len([call for call in estimate["calls"] if call["level"] == 1])
+    assert chunks > 1
+    assert estimate["llm_calls"] == chunks + 1
+    assert estimate["calls"][-1]["level"] == 2
+    assert estimate["completion_tokens"] == estimate["llm_calls"] * 100
+    assert estimate["cost_USD"] == (estimate["prompt_tokens"] + 2 * estimate["completion_tokens"]) / 1e6
+    assert not calls
+    assert len(caches) == estimate["llm_calls"]
+    assert all(cache is None for cache in caches)
+    assert graph.get_execution_info() is None
@@ -0,0 +1,87 @@
+"""
+Graph pool test module
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from scrapegraphai.graphs import GraphPool, SmartScraperGraph, SmartScraperMultiGraph
+
+
+class PriceModel(BaseChatModel):
+    """Chat model answering with the prices found in the prompt, after a short delay."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(0.01)
+        prices = [int(price) for price in re.findall(r"Price (\d+)", messages[-1].content)]
+        message = AIMessage(content=f'{{"prices": {prices}}}')
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @property
+    def _llm_type(self) -> str:
+        return "price"
+
+
+CONFIG = {"llm": {"model_instance": PriceModel(), "model_tokens": 1000}}
+
+
+def test_clone_isolates_nodes():
+    """Test that a clone has its own nodes and shares the configuration and the model."""
+    template = SmartScraperGraph("Prices?", "<p>Price 1</p>", CONFIG)
+    instance = template.clone()
+
+    for node, template_node in zip(instance.graph.nodes, template.graph.nodes):
+        assert node is not template_node
+        assert node.node_config is template_node.node_config
+    assert instance.llm_model is template.llm_model
+    assert instance.graph.raw_edges[0][0] is instance.graph.nodes[0]
+
+    instance.graph.nodes[0].embedder_model = "changed"
+    assert not hasattr(template.graph.nodes[0], "embedder_model")
+
+
+def test_pool_reuses_and_resets_instances():
+    """Test that released instances are reused in the state of the template."""
+    pool = GraphPool(SmartScraperGraph("Prices?", "<p>Price 1</p>", CONFIG))
+
+    with pool.instance() as first:
+        first.source = "<p>Price 2</p>"
+        first.graph.nodes[0].run_state = "dirty"
+
+    with pool.instance() as second:
+        assert second is first
+        assert second.source == "<p>Price 1</p>"
+        assert not hasattr(second.graph.nodes[0], "run_state")
+
+    assert pool.created == 1
+
+
+def test_pool_concurrent_runs_are_isolated():
+    """Test that concurrent runs never see the state of each other."""
+    pool = GraphPool(SmartScraperGraph("Prices?", "<p>Price 1</p>", CONFIG))
+
+    def run(value):
+        with pool.instance() as graph:
+            for node in graph.graph.nodes:
+                node.run_state = value
+            time.sleep(0.005)
+            return all(node.run_state == value for node in graph.graph.nodes)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(run, range(200)))
+
+    assert pool.created <= 8
+
+
+def test_graph_iterator_runs_every_source():
+    """Test that the graph iterator answers every source with its own content."""
+    sources = [f"<html><body><p>Price {i}</p></body></html>" for i in range(40)]
+    graph = SmartScraperMultiGraph("Prices?", sources, CONFIG)
+    graph.graph.nodes[0].node_config["batchsize"] = 8
+
+    graph.run()
+
+    assert graph.final_state["results"] == [{"prices": [i]} for i in range(40)]
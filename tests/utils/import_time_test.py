@@ -0,0 +1,66 @@
+"""
+Import time benchmark, guarding against provider SDKs imported at startup
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from scrapegraphai.utils.providers import (
+    PROVIDER_CLASSES,
+    get_provider_class,
+    is_provider_instance,
+)
+
+# the import of scrapegraphai.graphs took 4.5 seconds when every provider was imported
+IMPORT_TIME_BUDGET = float(os.environ.get("SCRAPEGRAPHAI_IMPORT_BUDGET", "3.5"))
+
+PROVIDER_PACKAGES = sorted({
+    path.split(":")[0].split(".")[0] for path in PROVIDER_CLASSES.values()
+} - {"langchain_community", "scrapegraphai"} | {"openai"})
+
+BENCHMARK = """
+import json, sys, time
+start = time.perf_counter()
+import scrapegraphai.graphs
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_graphs() -> dict:
+    output = subprocess.run([sys.executable, "-c", BENCHMARK], capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def benchmark():
+    # the best of several runs, the first one also compiles the bytecode
+    return min((import_graphs() for _ in range(3)), key=lambda run: run["seconds"])
+
+
+def test_import_does_not_load_providers(benchmark):
+    loaded = {module.split(".")[0] for module in benchmark["modules"]}
+
+    assert not loaded & set(PROVIDER_PACKAGES)
+
+
+def test_import_time_budget(benchmark):
+    assert benchmark["seconds"] < IMPORT_TIME_BUDGET
+
+
+def test_provider_check_does_not_import():
+    code = ("import sys\n"
+            "from scrapegraphai.utils.providers import is_provider_instance\n"
+            "assert not is_provider_instance(object(), 'ChatVertexAI')\n"
+            "assert 'langchain_google_vertexai' not in sys.modules\n")
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    assert not is_provider_instance(object(), "ChatOllama")
+
+    chat_ollama = get_provider_class("ChatOllama")
+    assert is_provider_instance(chat_ollama(model="llama3"), "ChatOllama")
@@ -0,0 +1,94 @@
+"""
+Link ranking test module
+"""
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from scrapegraphai.nodes import SearchLinkNode
+from scrapegraphai.utils.link_ranking import LinkCandidate, bm25_scores, collect_links, rank_links
+
+PAGE = """
+<nav><a href="/about">About us</a> <a href="/blog">Blog</a></nav>
+<p>We are hiring! See the <a href="/careers/openings?utm_source=nav">open positions</a>
+for software engineers.</p>
+<p>Read our [privacy policy](https://example.com/legal/privacy) and
+https://example.com/careers/openings#top</p>
+"""
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeddings counting a few keywords, recording the embedded texts."""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts += texts
+        return [[text.lower().count(word) for word in ("job", "engineer", "privacy")] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_collect_links():
+    """Test that the links are deduplicated with their anchor text and context."""
+    links = collect_links(PAGE, "https://example.com/")
+
+    assert [link.url for link in links] == [
+        "https://example.com/about", "https://example.com/blog",
+        "https://example.com/careers/openings?utm_source=nav", "https://example.com/legal/privacy"]
+    assert links[2].anchor_text == "open positions"
+    assert "hiring" in links[2].context and "engineers" in links[2].context
+
+
+def test_collect_links_formats():
+    """Test that the HTML, Markdown and bare links are extracted and resolved."""
+    content = ('<a class="x" href="/jobs">Open <b>jobs</b></a> [Team](https://example.com/team) '
+               'see https://other.com/page and <a href="mailto:a@example.com">mail</a>')
+
+    links = collect_links(content, "https://example.com/about")
+
+    assert [(link.url, link.anchor_text) for link in links] == [
+        ("https://example.com/jobs", "Open jobs"), ("https://example.com/team", "Team"),
+        ("https://other.com/page", "")]
+
+
+def test_bm25_ranking():
+    """Test the BM25 scores, the top-k and the threshold."""
+    links = collect_links(PAGE, "https://example.com/")
+
+    ranked = rank_links("open positions for engineers", links, top_k=2)
+
+    assert ranked[0] == ("https://example.com/careers/openings?utm_source=nav", 1.0)
+    assert len(ranked) == 2
+    assert len(rank_links("open positions", links, threshold=0.5)) == 1
+    assert [url for url, _ in rank_links("", links)] == [link.url for link in links]
+    assert bm25_scores("cat", ["cat cat dog", "dog"])[1] == 0
+    raw = rank_links("open positions for engineers", links, top_k=2, raw_scores=True)
+    assert [url for url, _ in raw] == [url for url, _ in ranked] and raw[0][1] > 1.0
+
+
+def test_embedding_ranking_is_cached():
+    """Test that the embeddings rank the links and are computed once per text."""
+    embedder = KeywordEmbeddings()
+    links = [LinkCandidate("https://example.com/jobs", "Jobs for engineers", ""),
+             LinkCandidate("https://example.com/privacy", "Privacy", "")]
+
+    ranked = rank_links("engineer jobs", links, embedder=embedder)
+    rank_links("engineer jobs", links, embedder=embedder)
+
+    assert ranked[0][0] == "https://example.com/jobs"
+    assert len(embedder.texts) == 3
+
+
+def test_search_link_node_ranks_links():
+    """Test that the node returns the ranked, deduplicated links with their scores."""
+    node = SearchLinkNode(input="doc", output=["relevant_links"],
+                          node_config={"llm_model": None, "top_k": 3})
+    state = {"user_prompt": "list the open positions", "url": "https://example.com/",
+             "doc": [Document(page_content=PAGE), Document(page_content=PAGE)]}
+
+    state = node.execute(state)
+
+    assert state["relevant_links"][0] == "https://example.com/careers/openings?utm_source=nav"
+    assert len(state["relevant_links"]) == 3
+    assert state["scored_links"][0]["score"] == 1.0
@@ -0,0 +1,46 @@
+"""
+LLM cache test module
+"""
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.utils.llm_cache import SQLiteLLMCache, llm_cache_stats
+
+
+def test_cache_persists_responses(tmp_path):
+    """Test that a response is served from the cache on a new connection."""
+    path = str(tmp_path / "llm.db")
+
+    llm_model = FakeListChatModel(responses=["first", "second"])
+    llm_model.cache = SQLiteLLMCache(path)
+    assert llm_model.invoke("question").content == "first"
+
+    llm_model = FakeListChatModel(responses=["first", "second"])
+    llm_model.cache = SQLiteLLMCache(path)
+    llm_model.invoke("another question")
+    with llm_cache_stats() as stats:
+        answer = llm_model.invoke("question")
+
+    assert answer.content == "first"
+    assert answer.response_metadata["llm_cache_hit"] is True
+    assert stats == {"cache_hits": 1, "cache_misses": 0}
+
+
+def test_cache_ttl(tmp_path):
+    """Test that expired entries are not returned."""
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), ttl=-1)
+    llm_model = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    llm_model.invoke("question")
+    with llm_cache_stats() as stats:
+        assert llm_model.invoke("question").content == "second"
+    assert stats["cache_misses"] == 1
+
+
+def test_cache_max_entries(tmp_path):
+    """Test that the least recently used entries are evicted."""
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), max_entries=2)
+    llm_model = FakeListChatModel(responses=["a", "b", "c"], cache=cache)
+
+    for question in ["one", "two", "three"]:
+        llm_model.invoke(question)
+
+    assert cache.size() == 2
@@ -0,0 +1,41 @@
+"""
+Model cascade test module
+"""
+from typing import List
+from pydantic import BaseModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from scrapegraphai.graphs import SmartScraperGraph
+
+
+class Prices(BaseModel):
+    prices: List[int]
+
+
+SOURCE = "<html><body><p>Price 10</p></body></html>"
+
+
+def test_cascade_escalates_on_parse_failure():
+    """Test that the next tier answers when the answer of the first cannot be parsed."""
+    cheap = FakeListChatModel(responses=["not json"])
+    strong = FakeListChatModel(responses=['{"prices": [10]}'])
+    graph = SmartScraperGraph("Prices?", SOURCE, {"llm": {"cascade": [
+        {"model_instance": cheap, "model_tokens": 1000},
+        {"model_instance": strong, "model_tokens": 1000},
+    ]}})
+
+    assert graph.run() == {"prices": [10]}
+    assert graph.get_execution_info()[-1]["answered_by"] == {"tier1": 1}
+
+
+def test_cascade_escalates_on_empty_required_fields():
+    """Test that answers not filling the schema are escalated, and good ones are not."""
+    cheap = FakeListChatModel(responses=['{"prices": []}', '{"prices": [10]}'])
+    strong = FakeListChatModel(responses=['{"prices": [10]}'])
+    graph = SmartScraperGraph("Prices?", SOURCE, {"llm": {"cascade": [
+        {"model_instance": cheap, "model_tokens": 1000},
+        {"model_instance": strong, "model_tokens": 1000},
+    ]}}, schema=Prices)
+
+    assert graph.run() == {"prices": [10]}
+    assert graph.run() == {"prices": [10]}
+    assert graph.get_execution_info()[-1]["answered_by"] == {"tier0": 1}
@@ -0,0 +1,89 @@
+"""
+Politeness scheduler test module
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from scrapegraphai.utils import politeness
+from scrapegraphai.utils.politeness import HostScheduler, fetch_scope, fetch_slot, get_host
+
+URLS = ["https://a.com/1", "https://a.com/2", "https://a.com/3",
+        "https://b.com/1", "https://c.com/1", "https://b.com/2"]
+
+
+def test_order_interleaves_hosts():
+    """Test that the sources are interleaved round-robin across their hosts."""
+    scheduler = HostScheduler()
+
+    order = scheduler.order(URLS)
+
+    assert [URLS[index] for index in order] == [
+        "https://a.com/1", "https://b.com/1", "https://c.com/1",
+        "https://a.com/2", "https://b.com/2", "https://a.com/3"]
+    assert get_host("<html></html>") == ""
+    assert HostScheduler.from_config(False) is None
+
+
+def test_max_per_host():
+    """Test that a host never gets more concurrent runs than allowed."""
+    scheduler = HostScheduler(max_per_host=2)
+    active, peak = {}, {}
+    lock = threading.Lock()
+
+    def run(url):
+        with scheduler.slot(url):
+            host = get_host(url)
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(run, [f"https://a.com/{i}" for i in range(6)] + ["https://b.com/1"]))
+
+    assert peak == {"a.com": 2, "b.com": 1}
+
+
+def test_min_interval_and_crawl_delay(monkeypatch):
+    """Test that the runs on a host are spaced by the interval or the robots.txt delay."""
+    monkeypatch.setattr(politeness, "get_crawl_delay",
+                        lambda url, user_agent: 0.1 if "b.com" in url else None)
+    scheduler = HostScheduler.from_config({"min_interval": 0.05, "respect_robots": True})
+    starts = {}
+
+    def run(url):
+        with scheduler.slot(url):
+            starts.setdefault(get_host(url), []).append(time.monotonic())
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(run, URLS))
+
+    a, b = sorted(starts["a.com"]), sorted(starts["b.com"])
+    assert min(later - earlier for earlier, later in zip(a, a[1:])) >= 0.045
+    assert b[1] - b[0] >= 0.095
+
+
+def test_slot_released_after_fetch():
+    """Test that a run holds its host during the fetch only, and that waiting does not block."""
+    scheduler = HostScheduler(max_per_host=1)
+
+    slot = scheduler.acquire("https://a.com/1")
+    with fetch_scope(scheduler, slot):
+        with fetch_slot("https://a.com/1"):
+            assert not slot.released
+        # the page is processed without holding its host
+        assert slot.released
+        scheduler.acquire("https://a.com/2").release()
+
+    async def acquire_both():
+        first = await scheduler.aacquire("https://a.com/1")
+        second = asyncio.ensure_future(scheduler.aacquire("https://a.com/2"))
+        await asyncio.sleep(0.1)
+        assert not second.done()
+        first.release()
+        (await asyncio.wait_for(second, 1)).release()
+
+    asyncio.run(acquire_both())
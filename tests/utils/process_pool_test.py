@@ -0,0 +1,50 @@
+"""
+Process pool test module
+"""
+import os
+import pytest
+from langchain_core.documents import Document
+from scrapegraphai.nodes import ParseNode
+from scrapegraphai.utils.convert_to_md import convert_to_md
+from scrapegraphai.utils.process_pool import (
+    get_max_workers,
+    run_in_process_pool,
+    shutdown_process_pool,
+)
+
+HTML = "<html><body>" + "".join(f"<p>Paragraph {i} of the page.</p>" for i in range(300)) + "</body></html>"
+
+
+@pytest.fixture(autouse=True)
+def stop_workers():
+    yield
+    shutdown_process_pool()
+
+
+def test_get_max_workers():
+    """Test the parsing of the process pool configuration."""
+    assert get_max_workers(True) == (os.cpu_count() or 1)
+    assert get_max_workers(3) == 3
+    assert get_max_workers({"max_workers": 2}) == 2
+
+
+def test_run_in_process_pool():
+    """Test that the function runs in a worker process only when the pool is enabled."""
+    assert run_in_process_pool(False, os.getpid) == os.getpid()
+    assert run_in_process_pool({"max_workers": 1}, os.getpid) != os.getpid()
+    assert run_in_process_pool(1, convert_to_md, HTML) == convert_to_md(HTML)
+
+
+def test_parse_node_in_process_pool():
+    """Test that the parse node gives the same chunks in the process pool."""
+    state = {"doc": [Document(page_content=HTML)]}
+
+    def parse(node_config):
+        node = ParseNode(input="doc", output=["parsed_doc"],
+                         node_config={"chunk_size": 400, **node_config})
+        return node.execute(dict(state))["parsed_doc"]
+
+    chunks = parse({})
+
+    assert len(chunks) > 1
+    assert parse({"process_pool": {"max_workers": 2}}) == chunks
@@ -0,0 +1,117 @@
+"""
+Proxy pool test module
+"""
+import asyncio
+import threading
+import time
+import pytest
+from fp.errors import FreeProxyException
+from scrapegraphai.docloaders import chromium
+from scrapegraphai.docloaders.chromium import ChromiumLoader
+from scrapegraphai.utils.proxy_pool import ProxyHealth, ProxyPool
+
+LATENCIES = {"http://1.1.1.1:80": 0.3, "http://2.2.2.2:80": 0.1,
+             "http://3.3.3.3:80": None, "http://4.4.4.4:80": 0.2}
+
+
+def make_pool(latencies=None, **kwargs):
+    latencies = LATENCIES if latencies is None else latencies
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def check(server, secure, timeout):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return latencies[server]
+
+    pool = ProxyPool({"max_shape": 2}, discover=lambda criteria: list(latencies),
+                     check=check, **kwargs)
+    return pool, peak
+
+
+def test_candidates_are_checked_concurrently():
+    """Test that the candidates are validated concurrently and the fastest proxy is taken."""
+    pool, peak = make_pool(max_size=3)
+    try:
+        with pool.proxy(timeout=5) as proxy:
+            pass
+        time.sleep(0.2)
+
+        assert peak[0] > 1
+        assert pool.healthy() == ["http://2.2.2.2:80", "http://4.4.4.4:80", "http://1.1.1.1:80"]
+        assert ProxyPool.from_proxy({"server": "broker", "criteria": {"max_shape": 2}}).min_size == 2
+    finally:
+        pool.stop()
+
+
+def test_failing_proxy_is_evicted():
+    """Test that a proxy failing in a row is evicted and the next best one is taken."""
+    pool, _ = make_pool(max_failures=2, min_size=1)
+    try:
+        pool.release(pool.acquire(timeout=5)["server"])
+        time.sleep(0.2)
+        for _ in range(2):
+            proxy = pool.acquire()
+            assert proxy == {"server": "http://2.2.2.2:80"}
+            pool.report(proxy["server"], False)
+
+        assert pool.acquire() == {"server": "http://4.4.4.4:80"}
+        assert "http://2.2.2.2:80" not in pool.healthy()
+    finally:
+        pool.stop()
+
+
+def test_checks_and_fetches_are_scored_apart():
+    """Test that proxies of the same health score the same whatever their mix of traffic."""
+    pool = ProxyPool()
+    pool._proxies = {server: ProxyHealth(server, 0.2) for server in ("a", "b", "c")}
+    for _ in range(5):
+        pool.report("a", True, 2.0)
+    pool.report("b", True, 2.0)
+
+    references = pool._references()
+    scores = {server: health.score(*references) for server, health in pool._proxies.items()}
+
+    assert scores["a"] == pytest.approx(scores["b"]) == pytest.approx(scores["c"])
+    pool.report("b", True, 4.0)
+    assert pool.healthy()[-1] == "b"
+
+
+def test_no_proxy_found():
+    """Test that a request fails once the search ended without a working proxy."""
+    pool, _ = make_pool({"http://3.3.3.3:80": None})
+    try:
+        with pytest.raises(FreeProxyException):
+            pool.acquire(timeout=5)
+    finally:
+        pool.stop()
+
+
+def test_loader_retries_with_another_proxy(monkeypatch):
+    """Test that a page failing through a proxy is scraped again through the next one."""
+    pool, _ = make_pool()
+    # the working candidates are all validated before the page is scraped
+    pool.release(pool.acquire(timeout=5)["server"])
+    deadline = time.monotonic() + 5
+    while len(pool.healthy()) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    monkeypatch.setattr(chromium, "get_proxy_pool", lambda proxy: pool)
+    loader = ChromiumLoader(["https://example.com"], proxy={"server": "broker"})
+    used = []
+
+    async def scrape(url, proxy):
+        used.append(proxy["server"])
+        if proxy["server"] == "http://2.2.2.2:80":
+            return "", TimeoutError("proxy timeout")
+        return "<html>ok</html>", None
+
+    monkeypatch.setattr(loader, "_ascrape_playwright", scrape)
+    try:
+        assert asyncio.run(loader.ascrape_playwright("https://example.com")) == "<html>ok</html>"
+        assert used == ["http://2.2.2.2:80", "http://4.4.4.4:80"]
+    finally:
+        pool.stop()
@@ -0,0 +1,61 @@
+"""
+Search query rewrite cache test module
+"""
+from scrapegraphai.utils.query_rewrite import (
+    QueryRewriteCache,
+    keyword_query,
+    normalize_prompt,
+)
+
+
+def test_keyword_query():
+    """Test that only short keyword-like prompts skip the rewrite."""
+    assert keyword_query("  Chioggia famous   landmarks ") == "Chioggia famous landmarks"
+    assert keyword_query("What is Chioggia famous for?") is None
+    assert keyword_query("list the products of acme") is None
+    assert keyword_query("one two three four five six seven") is None
+
+
+def test_exact_and_normalized_matches():
+    """Test that the normalized match ignores case and punctuation, not the exact one."""
+    exact = QueryRewriteCache()
+    normalized = QueryRewriteCache(match="normalized")
+    for cache in (exact, normalized):
+        cache.set("model", "What is the capital of France?", "capital of France")
+
+    assert normalize_prompt("what is the capital  of FRANCE") == "what is the capital of france"
+    assert exact.get("model", "What is the capital of France?") == "capital of France"
+    assert exact.get("model", "what is the capital  of FRANCE") is None
+    assert exact.get("other model", "What is the capital of France?") is None
+    assert normalized.get("model", "what is the capital  of FRANCE") == "capital of France"
+    assert (exact.hits, exact.misses) == (1, 2)
+
+
+def test_template_prompts_reuse_the_query():
+    """Test that a prompt template filled with another entity reuses the cached query."""
+    cache = QueryRewriteCache(match="normalized")
+    cache.set("model", "Who are the founders of Acme Corp?", "Acme Corp founders")
+
+    assert cache.get("model", "Who are the founders of Globex Inc?") == "Globex Inc founders"
+    assert cache.get("model", "Who are the investors of Acme Corp?") == "Acme Corp investors"
+    # the differing words are not in the query, or the prompts share too little
+    assert cache.get("model", "Who were the founders of Acme Corp?") is None
+    assert cache.get("model", "Where is Acme Corp?") is None
+    assert QueryRewriteCache.from_config("normalized") is QueryRewriteCache.from_config(
+        {"match": "normalized"})
+    assert QueryRewriteCache.from_config(False) is None
+
+
+def test_normalized_lookup_is_indexed():
+    """Test that the evicted prompts leave the index and are not substituted anymore."""
+    cache = QueryRewriteCache(match="normalized", max_entries=2)
+    cache.set("model", "Who are the founders of Acme Corp?", "Acme Corp founders")
+    cache.set("model", "Where is Initech located?", "Initech location")
+    cache.set("model", "Where is Hooli located?", "Hooli location")
+
+    assert cache.get("model", "Who are the founders of Globex Inc?") is None
+    assert cache.get("model", "Where is Globex located?") == "Globex location"
+    assert all(("model", "who are the founders of acme corp") not in bucket
+               for bucket in cache._index.values())
+    cache.clear()
+    assert not cache._index
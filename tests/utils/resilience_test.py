@@ -0,0 +1,93 @@
+"""
+Resilience policy test module
+"""
+import time
+import pytest
+from langchain_core.runnables import RunnableLambda
+from scrapegraphai.utils.resilience import ResiliencePolicy, get_retry_after, is_retryable
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+def test_is_retryable():
+    """Test the classification of transient and permanent errors."""
+    assert is_retryable(RateLimitError())
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(ValueError("invalid request"))
+
+
+def test_get_retry_after():
+    """Test that the Retry-After headers are honored."""
+    assert get_retry_after(RateLimitError({"retry-after": "2"})) == 2
+    assert get_retry_after(RateLimitError({"retry-after-ms": "500"})) == 0.5
+    assert get_retry_after(RateLimitError()) is None
+
+
+def test_retries_transient_errors():
+    """Test that transient errors are retried and permanent ones are raised."""
+    calls = []
+
+    def flaky(prompt):
+        calls.append(prompt)
+        if len(calls) < 3:
+            raise RateLimitError({"retry-after": "0"})
+        return "ok"
+
+    policy = ResiliencePolicy(max_retries=3)
+    assert policy.wrap(RunnableLambda(flaky)).invoke("q") == "ok"
+    assert len(calls) == 3
+
+    def invalid(prompt):
+        raise ValueError("invalid request")
+
+    with pytest.raises(ValueError):
+        policy.wrap(RunnableLambda(invalid)).invoke("q")
+
+
+def test_timeout_and_hedging():
+    """Test that slow calls time out, or are raced against a hedged request."""
+    def slow(prompt):
+        time.sleep(1)
+        return "slow"
+
+    policy = ResiliencePolicy(max_retries=0, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        policy.wrap(RunnableLambda(slow)).invoke("q")
+
+    calls = []
+
+    def first_call_slow(prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    policy = ResiliencePolicy(hedge={"min_samples": 1})
+    policy.record_latency(0.05)
+    assert policy.wrap(RunnableLambda(first_call_slow)).invoke("q") == "fast"
+    assert len(calls) == 2
+
+
+def test_provider_retries_are_replaced():
+    """Test that the policy is off by default and replaces the client retries when set."""
+    from scrapegraphai.graphs import SmartScraperGraph
+
+    assert ResiliencePolicy.from_config(None) is None
+    assert ResiliencePolicy.from_config(False) is None
+
+    llm_config = {"model": "gpt-4o-mini", "api_key": "sk-test"}
+    default = SmartScraperGraph("prompt", "<html></html>", {"llm": llm_config})
+    resilient = SmartScraperGraph("prompt", "<html></html>",
+                                  {"llm": llm_config, "resilience": {"timeout": 30}})
+
+    assert default.llm_model.max_retries == 2
+    assert all(not getattr(node, "llm_resilience", False) for node in default.graph.nodes)
+    assert resilient.llm_model is not default.llm_model
+    assert resilient.llm_model.max_retries == 0
+    assert resilient.llm_model.request_timeout == 30
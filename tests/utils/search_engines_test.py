@@ -0,0 +1,116 @@
+"""
+Concurrent and cached web search test module
+"""
+import asyncio
+import threading
+import time
+import pytest
+from scrapegraphai.utils import research_web
+from scrapegraphai.utils.research_web import fuse_results, search_cache, search_on_web
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Replaces the search engines with fakes recording their calls."""
+    calls = []
+    lock = threading.Lock()
+    results = {
+        "google": ["https://a.com/", "https://b.com/", "https://c.com/"],
+        "bing": ["https://B.com/#top", "https://d.com/", "https://a.com"],
+    }
+
+    def fake(engine, delay=0.2):
+        def _search(query, max_results, port, timeout):
+            with lock:
+                calls.append(engine)
+            time.sleep(delay)
+            return results[engine][:max_results]
+        return _search
+
+    monkeypatch.setitem(research_web.SEARCH_ENGINES, "google", fake("google"))
+    monkeypatch.setitem(research_web.SEARCH_ENGINES, "bing", fake("bing"))
+    search_cache.clear()
+    yield calls
+    search_cache.clear()
+
+
+def test_engines_run_concurrently_and_results_are_fused(engines):
+    """Test that the engines are queried concurrently and their results merged."""
+    start = time.perf_counter()
+    results = search_on_web("query", search_engine=["Google", "Bing"], max_results=3)
+
+    assert time.perf_counter() - start < 0.35
+    assert sorted(engines) == ["bing", "google"]
+    # b.com and a.com are found by both engines, b.com at better ranks overall,
+    # and d.com ranks above c.com
+    assert results == ["https://b.com/", "https://a.com/", "https://d.com/"]
+
+
+def test_results_are_cached(engines):
+    """Test that a repeated search is answered from the cache."""
+    first = search_on_web("query", search_engine="google", max_results=2)
+    second = search_on_web("query", search_engine="google", max_results=2)
+    search_on_web("query", search_engine="google", max_results=3)
+
+    assert first == second == ["https://a.com/", "https://b.com/"]
+    assert engines == ["google", "google"]
+
+
+def test_slow_engine_is_skipped(engines, monkeypatch):
+    """Test that an engine timing out is skipped, and raises when it is the only one."""
+    def slow(query, max_results, port, timeout):
+        time.sleep(1.0)
+        return ["https://slow.com/"]
+
+    monkeypatch.setitem(research_web.SEARCH_ENGINES, "bing", slow)
+
+    results = search_on_web("query", search_engine=["google", "bing"], timeout=0.5)
+    assert results == ["https://a.com/", "https://b.com/", "https://c.com/"]
+
+    with pytest.raises(TimeoutError):
+        search_on_web("other", search_engine="bing", timeout=0.1)
+    with pytest.raises(ValueError):
+        search_on_web("query", search_engine=["google", "yahoo"])
+
+
+def test_slow_engine_does_not_block_the_caller(engines, monkeypatch):
+    """Test that the search returns after the timeout, not after the slowest engine."""
+    monkeypatch.setitem(research_web.SEARCH_ENGINES, "bing",
+                        lambda query, max_results, port, timeout: time.sleep(3.0) or [])
+
+    start = time.perf_counter()
+    results = search_on_web("query", search_engine=["google", "bing"], timeout=0.5)
+
+    assert time.perf_counter() - start < 1.0
+    assert results == ["https://a.com/", "https://b.com/", "https://c.com/"]
+
+
+def test_google_request_has_the_timeout(monkeypatch):
+    """Test that the Google search passes the timeout to its HTTP request."""
+    requests = []
+
+    class Response:
+        text = ('<div id="search"><a href="/url?q=https://a.com/&sa=U">A</a>'
+                '<a href="https://b.com/">B</a><a href="/search?q=x">More</a></div>')
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def get(self, url, **kwargs):
+            requests.append(kwargs)
+            return Response()
+
+    monkeypatch.setattr(research_web, "_get_session", lambda engine: Session())
+
+    assert research_web._search_google("query", 5, 8080, 2.5) == ["https://a.com/", "https://b.com/"]
+    assert requests[0]["timeout"] == 2.5
+
+
+def test_search_from_running_loop(engines):
+    """Test that the synchronous search works inside an event loop."""
+    async def main():
+        return search_on_web("query", search_engine="google", max_results=1)
+
+    assert asyncio.run(main()) == ["https://a.com/"]
+    assert fuse_results([["https://x.com/a"], ["https://X.com/a#b"]], 5) == ["https://x.com/a"]
@@ -1,5 +1,10 @@
+import time
+
 import pytest
 from fp.errors import FreeProxyException
+from fp.fp import FreeProxy
+
+from scrapegraphai.utils import proxy_rotation
 
 from scrapegraphai.utils.proxy_rotation import (
     Proxy,
@@ -7,6 +12,7 @@ from scrapegraphai.utils.proxy_rotation import (
     _search_proxy,
     is_ipv4_address,
     parse_or_search_proxy,
+    proxy_check_cache,
     search_proxy_servers,
 )
 
@@ -119,3 +125,32 @@ def test_parse_or_search_proxy_unknown_server():
         parse_or_search_proxy(proxy)
 
     assert "unknown proxy server" in str(error_info.value)
+
+
+def test_search_proxy_servers_checks_concurrently(monkeypatch):
+    addresses = [f"10.0.0.{i}:80" for i in range(12)]
+    working = {"http://10.0.0.3:80", "http://10.0.0.7:80", "http://10.0.0.11:80"}
+    checked = []
+
+    def check(server, secure, timeout):
+        checked.append(server)
+        time.sleep(timeout)
+        return 0.1 if server in working else None
+
+    monkeypatch.setattr(FreeProxy, "get_proxy_list", lambda self, repeat: list(addresses))
+    monkeypatch.setattr(proxy_rotation, "check_proxy_server", check)
+    proxy_check_cache.clear()
+
+    start = time.perf_counter()
+    servers = search_proxy_servers(timeout=0.2, max_shape=2, search_outside_if_empty=False)
+
+    # the candidates are checked at once instead of one timeout after the other
+    assert time.perf_counter() - start < 1.0
+    assert len(servers) == 2 and set(servers) <= working
+
+    # the outcome of the checks is cached, working or not
+    time.sleep(0.3)
+    count = len(checked)
+    search_proxy_servers(timeout=0.2, max_shape=3, search_outside_if_empty=False)
+    assert len(checked) == count
+    proxy_check_cache.clear()
@@ -0,0 +1,80 @@
+"""
+Tree reduce and schema merge test module
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+from scrapegraphai.utils.schema_merge import deterministic_merge, is_empty_value, is_schema_satisfied
+from scrapegraphai.utils.tree_reduce import group_by_token_budget, tree_reduce
+
+
+class Products(BaseModel):
+    products: List[str]
+    shop: Optional[str] = None
+
+
+def test_group_by_token_budget():
+    """Test that items are grouped without exceeding the budget."""
+    groups = group_by_token_budget(["a b", "c d", "e f g h i"], 4)
+    assert groups == [["a b", "c d"], ["e f g h i"]]
+
+
+def test_tree_reduce_levels():
+    """Test that answers are merged level by level until one remains."""
+    levels = []
+
+    def merge_fn(groups):
+        levels.append(len(groups))
+        return [" ".join(group) for group in groups]
+
+    answer = tree_reduce(["a", "b", "c", "d", "e"], merge_fn, token_budget=2)
+
+    assert answer.split() == ["a", "b", "c", "d", "e"]
+    assert levels == [2, 1, 1]
+
+
+def test_tree_reduce_single_group():
+    """Test that answers fitting the budget are merged in one call."""
+    calls = []
+
+    def merge_fn(groups):
+        calls.append(groups)
+        return ["merged" for _ in groups]
+
+    assert tree_reduce(["a", "b", "c"], merge_fn, token_budget=100) == "merged"
+    assert len(calls) == 1
+
+
+def test_deterministic_merge_lists():
+    """Test that list fields are concatenated and deduplicated."""
+    results = [
+        {"products": ["shoes", "hat"], "shop": "NA"},
+        {"products": ["hat", "shirt"], "shop": "Acme"},
+    ]
+    merged = deterministic_merge(results, Products)
+    assert merged == {"products": ["shoes", "hat", "shirt"], "shop": "Acme"}
+
+
+def test_deterministic_merge_conflict():
+    """Test that conflicting scalar values require the LLM."""
+    results = [
+        {"products": ["shoes"], "shop": "Acme"},
+        {"products": ["hat"], "shop": "Other"},
+    ]
+    assert deterministic_merge(results, Products) is None
+    assert deterministic_merge(results, None) is None
+
+
+def test_is_empty_value():
+    """Test the detection of empty values."""
+    assert is_empty_value("NA")
+    assert is_empty_value([])
+    assert not is_empty_value(0)
+    assert not is_empty_value("value")
+
+
+def test_is_schema_satisfied():
+    """Test that an answer satisfies the schema only when required fields are filled."""
+    assert is_schema_satisfied({"products": ["a"], "shop": "NA"}, Products)
+    assert not is_schema_satisfied({"products": [], "shop": "s"}, Products)
+    assert not is_schema_satisfied({"shop": "s"}, Products)
+    assert not is_schema_satisfied({"products": ["a"]}, None)
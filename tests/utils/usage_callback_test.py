@@ -0,0 +1,69 @@
+"""
+Usage callback test module
+"""
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from scrapegraphai.graphs import SmartScraperMultiGraph
+from scrapegraphai.utils.usage_callback import get_cached_prompt_tokens, get_token_usage
+
+
+class UsageReportingModel(BaseChatModel):
+    """Chat model answering with a fixed usage in the standard usage metadata."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = AIMessage(content='{"prices": [10]}', usage_metadata={
+            "input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @property
+    def _llm_type(self) -> str:
+        return "usage-reporting"
+
+
+def test_get_cached_prompt_tokens():
+    """Test the extraction of cached prompt tokens for different providers."""
+    openai_message = AIMessage(content="", response_metadata={
+        "token_usage": {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1536}}
+    })
+    anthropic_message = AIMessage(content="", response_metadata={
+        "usage": {"input_tokens": 50, "cache_read_input_tokens": 1800}
+    })
+
+    assert get_cached_prompt_tokens(openai_message) == 1536
+    assert get_cached_prompt_tokens(anthropic_message) == 1800
+    assert get_cached_prompt_tokens(AIMessage(content="")) == 0
+
+
+def test_get_token_usage():
+    """Test the extraction of the token usage for different providers."""
+    gemini_message = AIMessage(content="", response_metadata={
+        "usage_metadata": {"prompt_token_count": 30, "candidates_token_count": 5}
+    })
+    ollama_message = AIMessage(content="", response_metadata={
+        "prompt_eval_count": 40, "eval_count": 8
+    })
+    bedrock_message = AIMessage(content="", response_metadata={
+        "amazon-bedrock-invocationMetrics": {"inputTokenCount": 12, "outputTokenCount": 3}
+    })
+
+    assert get_token_usage(gemini_message) == (30, 5)
+    assert get_token_usage(ollama_message) == (40, 8)
+    assert get_token_usage(bedrock_message) == (12, 3)
+    assert get_token_usage(None, {"token_usage": {"prompt_tokens": 7, "completion_tokens": 2}}) == (7, 2)
+
+
+def test_sub_graph_usage_rolls_up():
+    """Test that the usage of the sub-graphs is reported by the node running them."""
+    graph = SmartScraperMultiGraph("Prices?", [
+        "<html><body><p>Price 10</p></body></html>",
+        "<html><body><p>Price 20</p></body></html>",
+    ], {"llm": {"model_instance": UsageReportingModel(), "model_tokens": 1000}})
+
+    graph.run()
+    exec_info = {row["node_name"]: row for row in graph.get_execution_info()}
+
+    assert exec_info["GraphIterator"]["total_tokens"] == 240
+    assert exec_info["GraphIterator"]["successful_requests"] == 2
+    assert exec_info["TOTAL RESULT"]["total_tokens"] == 360
@@ -0,0 +1,81 @@
+"""
+Visited set test module
+"""
+import pytest
+from scrapegraphai.utils.crawl_frontier import CrawlFrontier
+from scrapegraphai.utils.visited_set import (
+    FingerprintSet,
+    ScalableBloomFilter,
+    create_visited_set,
+    load_visited_set,
+    url_fingerprint,
+)
+
+URLS = [f"https://example.com/page/{i}?ref=x" for i in range(20000)]
+NEW_URLS = [f"https://example.com/other/{i}" for i in range(20000)]
+
+
+def test_fingerprint_set(tmp_path):
+    """Test the exact fingerprint set, its growth, its size and its serialization."""
+    visited = FingerprintSet(capacity=16)
+
+    assert all(visited.add(url) for url in URLS)
+    assert not visited.add("HTTPS://example.com/page/7#top")
+    assert len(visited) == len(URLS)
+    assert not any(url in visited for url in NEW_URLS)
+    assert visited.nbytes / len(visited) <= 22
+
+    visited.save(tmp_path / "visited.bin")
+    loaded = FingerprintSet.load(tmp_path / "visited.bin")
+    assert len(loaded) == len(URLS) and URLS[123] in loaded and NEW_URLS[0] not in loaded
+    assert url_fingerprint(URLS[0]) == url_fingerprint("https://EXAMPLE.com/page/0")
+
+
+def test_scalable_bloom_filter(tmp_path):
+    """Test that the Bloom filter scales within its error rate and a few bits per URL."""
+    visited = ScalableBloomFilter(error_rate=0.01, capacity=1000)
+
+    assert all(url in visited or visited.add(url) for url in URLS)
+    assert all(url in visited for url in URLS)
+    assert len(visited.filters) > 1
+    assert sum(url in visited for url in NEW_URLS) / len(NEW_URLS) < 0.01
+    assert visited.nbytes / len(URLS) < 4
+
+    visited.save(tmp_path / "visited.bin")
+    loaded = ScalableBloomFilter.load(tmp_path / "visited.bin")
+    assert all(url in loaded for url in URLS[:1000])
+    assert len(loaded) == len(visited)
+
+
+def test_frontier_with_visited_set():
+    """Test that the frontier deduplicates its URLs with a compact visited set."""
+    frontier = CrawlFrontier(visited_set=create_visited_set({"type": "bloom", "error_rate": 0.001}))
+
+    assert frontier.add("https://example.com/")
+    assert frontier.add("https://example.com/a", 1)
+    assert not frontier.add("https://example.com/a#top", 1)
+    with pytest.raises(ValueError):
+        create_visited_set("hash")
+
+
+def test_load_visited_set(tmp_path):
+    """Test that a saved set is read back whatever its type."""
+    for config in ("fingerprint", "bloom"):
+        visited = create_visited_set(config)
+        visited.add("https://example.com/a")
+        visited.save(tmp_path / config)
+
+        loaded = load_visited_set(tmp_path / config)
+        assert type(loaded) is type(visited)
+        assert "https://example.com/a" in loaded and "https://example.com/b" not in loaded
+
+
+def test_frontier_keeps_a_sample_of_visited_urls():
+    """Test that the frontier counts every visited URL but lists the first ones only."""
+    frontier = CrawlFrontier(visited_sample=1)
+    frontier.add("https://example.com/")
+    frontier.add("https://example.com/a", 1)
+
+    assert [frontier.pop().order for _ in range(2)] == [0, 1]
+    assert frontier.visited == ["https://example.com/"]
+    assert frontier.visited_count == 2